@@ -0,0 +1 @@
+"""Performance benchmarks for task_manager."""
@@ -0,0 +1,181 @@
+"""
+Completing many tasks one by one and with the bulk endpoint.
+
+Seeds a user with open tasks, then completes all of them twice through
+the real ASGI app, lifespan included: with a PATCH request per task,
+as clients looping over their tasks do, and with PATCH /api/tasks/bulk
+requests of at most 1000 ids. Tasks are reopened in between. Reports
+the time, tasks completed per second and SQL statements of both.
+
+Requires a running database, redis and rabbitmq aren't used.
+The database "<TASK_MANAGER_DB_BASE>_bench" is created and dropped by the run.
+
+Run with::
+
+    python -m benchmarks.bulk_update --tasks 1000
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+from typing import Any
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from benchmarks.task_api import SeededUser, seed
+from task_manager.settings import LogLevel, settings
+
+
+async def complete_one_by_one(
+    client: AsyncClient,
+    user: SeededUser,
+    concurrency: int,
+) -> None:
+    """
+    Complete every task with its own request.
+
+    :param client: client of the app.
+    :param user: seeded user.
+    :param concurrency: number of concurrent requests.
+    """
+    task_ids = iter(user.task_ids)
+
+    async def worker() -> None:
+        for task_id in task_ids:
+            response = await client.patch(
+                f"/api/tasks/{task_id}",
+                json={"completed": True},
+                headers={"Authorization": f"Bearer {user.token}"},
+            )
+            response.raise_for_status()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def complete_in_bulk(client: AsyncClient, user: SeededUser) -> None:
+    """
+    Complete every task with bulk requests.
+
+    :param client: client of the app.
+    :param user: seeded user.
+    """
+    from task_manager.web.api.task.schema import MAX_BULK_IDS
+
+    for start in range(0, len(user.task_ids), MAX_BULK_IDS):
+        response = await client.patch(
+            "/api/tasks/bulk",
+            json={
+                "ids": user.task_ids[start : start + MAX_BULK_IDS],
+                "changes": {"completed": True},
+            },
+            headers={"Authorization": f"Bearer {user.token}"},
+        )
+        response.raise_for_status()
+        assert not response.json()["not_found"]  # noqa: S101
+
+
+async def measure(engine: AsyncEngine, run: Any) -> dict[str, Any]:
+    """
+    Reopen all tasks, then time completing them.
+
+    :param engine: database engine of the app.
+    :param run: coroutine completing the tasks.
+    :returns: seconds and SQL statements.
+    """
+    async with engine.begin() as conn:
+        await conn.execute(text("UPDATE task SET completed = false"))
+
+    queries = itertools.count()
+
+    def count_query(*args: Any) -> None:
+        next(queries)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_query)
+    started = time.perf_counter()
+    try:
+        await run
+    finally:
+        elapsed = time.perf_counter() - started
+        event.remove(engine.sync_engine, "before_cursor_execute", count_query)
+
+    async with engine.connect() as conn:
+        result = await conn.execute(text("SELECT bool_and(completed) FROM task"))
+        assert result.scalar()  # noqa: S101
+    return {"seconds": round(elapsed, 3), "queries": next(queries)}
+
+
+async def benchmark(args: argparse.Namespace) -> dict[str, dict[str, Any]]:
+    """
+    Seed the database and complete tasks both ways.
+
+    :param args: command line arguments.
+    :returns: results of both ways.
+    """
+    from task_manager.db.meta import meta
+    from task_manager.db.models import load_all_models
+    from task_manager.db.utils import create_database, drop_database
+    from task_manager.web.application import get_app
+
+    load_all_models()
+    await create_database()
+    app: FastAPI = get_app()
+    results = {}
+    try:
+        async with app.router.lifespan_context(app):
+            engine: AsyncEngine = app.state.db_engine
+            async with engine.begin() as conn:
+                await conn.run_sync(meta.create_all)
+            (user,) = await seed(app.state.db_session_factory, 1, args.tasks)
+            transport = ASGITransport(app=app)  # type: ignore
+            async with AsyncClient(
+                transport=transport,
+                base_url="http://benchmark",
+            ) as client:
+                results["loop"] = await measure(
+                    engine,
+                    complete_one_by_one(client, user, args.concurrency),
+                )
+                results["bulk"] = await measure(
+                    engine,
+                    complete_in_bulk(client, user),
+                )
+    finally:
+        await drop_database()
+
+    for way, result in results.items():
+        result["tasks_per_s"] = round(args.tasks / result["seconds"])
+        print(way, result)  # noqa: T201
+    return results
+
+
+def main() -> None:
+    """Run the benchmark and compare both ways."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="concurrent requests of the loop",
+    )
+    args = parser.parse_args()
+
+    settings.db_base = f"{settings.db_base}_bench"
+    settings.db_echo = False
+    settings.rate_limit_enabled = False
+    settings.log_level = LogLevel.WARNING
+
+    results = asyncio.run(benchmark(args))
+    loop, bulk = results["loop"], results["bulk"]
+    print(  # noqa: T201
+        f"bulk is {loop['seconds'] / bulk['seconds']:.0f}x faster, "
+        f"{loop['queries']} -> {bulk['queries']} statements",
+    )
+
+
+if __name__ == "__main__":
+    main()
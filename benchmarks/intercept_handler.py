@@ -0,0 +1,125 @@
+"""
+Throughput of stdlib records bridged to loguru.
+
+Compares the previous InterceptHandler, which walked frames and
+looked up the level for every record, with the current one, with
+writing access logs straight to the sink and with sampling them.
+Records are written to a sink that discards them, so only the cost
+of the bridge is measured.
+
+Run with::
+
+    python -m benchmarks.intercept_handler --records 100000
+"""
+
+import argparse
+import logging
+import time
+from typing import Any, Union
+
+from loguru import logger
+
+from task_manager.log import (
+    AccessLogHandler,
+    InterceptHandler,
+    QueueSink,
+    SamplingFilter,
+    exception_formatter,
+)
+
+
+class FrameWalkingHandler(logging.Handler):
+    """InterceptHandler as it was before caching and caller info from records."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """
+        Propagates logs to loguru.
+
+        :param record: record to log.
+        """
+        try:
+            level: Union[str, int] = logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+
+        frame, depth = logging.currentframe(), 2
+        while frame.f_code.co_filename == logging.__file__:
+            frame = frame.f_back  # type: ignore
+            depth += 1
+
+        logger.opt(depth=depth, exception=record.exc_info).log(
+            level,
+            record.getMessage(),
+        )
+
+
+class NullStream:
+    """Stream that discards everything."""
+
+    def write(self, text: str) -> None:
+        """
+        Discard the text.
+
+        :param text: text to write.
+        """
+
+    def flush(self) -> None:
+        """Do nothing."""
+
+
+def run(name: str, handler: logging.Handler, records: int) -> dict[str, Any]:
+    """
+    Log access records through the handler.
+
+    :param name: name of the run.
+    :param handler: handler of the access logger.
+    :param records: number of records to log.
+    :returns: results of the run.
+    """
+    access_logger = logging.getLogger("benchmark.access")
+    access_logger.handlers = [handler]
+    access_logger.propagate = False
+    access_logger.setLevel(logging.INFO)
+    started = time.perf_counter()
+    for _ in range(records):
+        access_logger.info(
+            '%s - "%s %s HTTP/%s" %d',
+            "127.0.0.1:50000",
+            "GET",
+            "/api/tasks/",
+            "1.1",
+            200,
+        )
+    elapsed = time.perf_counter() - started
+    return {"handler": name, "records_per_second": round(records / elapsed)}
+
+
+def main() -> None:
+    """Run the benchmark and print results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    logger.remove()
+    sink = QueueSink(NullStream(), maxsize=args.records + 1)  # type: ignore
+    logger.add(
+        sink,
+        format=exception_formatter,  # type: ignore
+        colorize=False,
+        diagnose=False,
+    )
+    sampled = InterceptHandler()
+    sampled.addFilter(SamplingFilter(0.1))
+    handlers = {
+        "frame-walking": FrameWalkingHandler(),
+        "intercept": InterceptHandler(),
+        "direct": AccessLogHandler(sink, NullStream()),  # type: ignore
+        "intercept, sampled 10%": sampled,
+    }
+    for name, handler in handlers.items():
+        print(run(name, handler, args.records))  # noqa: T201
+    logger.remove()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Throughput of logging in the text and the JSON modes.
+
+Every mode logs the same records and reports how many records per
+second the logging calls sustain, i.e. how long the event loop would be
+blocked. ``--write-latency`` emulates backpressure of stdout by sleeping
+on every write to the stream.
+
+Run with::
+
+    python -m benchmarks.log_throughput --records 100000 --write-latency 0.0001
+"""
+
+import argparse
+import os
+import time
+from typing import Any, TextIO
+
+from loguru import logger
+
+from task_manager.log import QueueSink, exception_formatter, record_formatter
+
+
+class SlowStream:
+    """Stream that sleeps on every write."""
+
+    def __init__(self, stream: TextIO, latency: float) -> None:
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, text: str) -> None:
+        """
+        Write the text after a delay.
+
+        :param text: text to write.
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        self.stream.write(text)
+
+    def flush(self) -> None:
+        """Flush the stream."""
+        self.stream.flush()
+
+
+def run(mode: str, records: int, stream: Any, queue_size: int) -> dict[str, Any]:
+    """
+    Log records in the given mode.
+
+    :param mode: ``text`` or ``json``.
+    :param records: number of records to log.
+    :param stream: stream to write into.
+    :param queue_size: size of the queue of the JSON mode.
+    :returns: results of the run.
+    """
+    logger.remove()
+    sink = None
+    if mode == "json":
+        sink = QueueSink(stream, queue_size)
+        logger.add(
+            sink,
+            format=exception_formatter,  # type: ignore
+            colorize=False,
+            diagnose=False,
+        )
+    else:
+        logger.add(stream, format=record_formatter, colorize=True)  # type: ignore
+
+    started = time.perf_counter()
+    for index in range(records):
+        logger.info("Task {} updated", index)
+    logging_time = time.perf_counter() - started
+    logger.remove()
+    total_time = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "records_per_second": round(records / logging_time),
+        "seconds_until_written": round(total_time, 3),
+        "dropped": sink.dropped if sink is not None else 0,
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument(
+        "--write-latency",
+        type=float,
+        default=0.0,
+        help="seconds every write to the stream takes",
+    )
+    parser.add_argument("--queue-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with open(os.devnull, "w") as devnull:  # noqa: PTH123
+        stream = SlowStream(devnull, args.write_latency)
+        for mode in ("text", "json"):
+            print(run(mode, args.records, stream, args.queue_size))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
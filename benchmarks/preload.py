@@ -0,0 +1,174 @@
+"""
+Memory and startup time of gunicorn workers with and without preload.
+
+Starts the server as ``python -m task_manager`` twice, once with every
+worker building the app and once with the app preloaded by the master,
+and reports the time until all workers are ready and memory of every
+worker: RSS, PSS, where shared pages are split between processes,
+and USS, pages private to the worker.
+
+Connections aren't opened until they are used, so neither
+the database nor redis or rabbitmq are required. Linux only,
+memory is read from /proc.
+
+Run with::
+
+    python -m benchmarks.preload --workers 4
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+
+READY_LINE = "Application startup complete"
+
+
+def memory(pid: int) -> dict[str, float]:
+    """
+    Memory of a process.
+
+    :param pid: id of the process.
+    :returns: rss, pss and uss in megabytes.
+    """
+    fields: dict[str, int] = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, value, *_ = line.split()
+        fields[name.rstrip(":")] = int(value)
+    uss = fields["Private_Clean"] + fields["Private_Dirty"]
+    return {
+        "rss": fields["Rss"] / 1024,
+        "pss": fields["Pss"] / 1024,
+        "uss": uss / 1024,
+    }
+
+
+def children(pid: int) -> list[int]:
+    """
+    Processes forked by the master.
+
+    :param pid: id of the master.
+    :returns: ids of workers.
+    """
+    path = Path(f"/proc/{pid}/task/{pid}/children")
+    return [int(child) for child in path.read_text().split()]
+
+
+def run_server(
+    preload: bool,
+    workers: int,
+    port: int,
+    timeout: float,
+) -> dict[str, Any]:
+    """
+    Start the server and measure its workers.
+
+    :param preload: whether the master builds the app.
+    :param workers: number of workers.
+    :param port: port to listen on.
+    :param timeout: seconds to wait for workers.
+    :returns: startup time and memory of workers.
+    """
+    env = {
+        **os.environ,
+        "TASK_MANAGER_PRELOAD_APP": str(preload),
+        "TASK_MANAGER_WORKERS_COUNT": str(workers),
+        "TASK_MANAGER_PORT": str(port),
+        "TASK_MANAGER_RELOAD": "False",
+        "TASK_MANAGER_ACCESS_LOG_MODE": "off",
+    }
+    started = time.perf_counter()
+    server = subprocess.Popen(  # noqa: S603
+        [sys.executable, "-m", "task_manager"],
+        cwd=Path(__file__).parent.parent,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    all_ready = threading.Event()
+    ready_at: Optional[float] = None
+
+    def read_output() -> None:
+        nonlocal ready_at
+        ready = 0
+        assert server.stdout is not None  # noqa: S101
+        for line in server.stdout:
+            if READY_LINE in line:
+                ready += 1
+                if ready == workers:
+                    ready_at = time.perf_counter()
+                    all_ready.set()
+
+    reader = threading.Thread(target=read_output, daemon=True)
+    reader.start()
+    try:
+        if not all_ready.wait(timeout) or ready_at is None:
+            raise RuntimeError("Workers didn't start in time.")
+        # Serve a few requests, so every worker has touched its app.
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            for _ in range(workers * 10):
+                client.get("/api/health").raise_for_status()
+                client.get("/api/openapi.json").raise_for_status()
+        worker_memory = [memory(pid) for pid in children(server.pid)]
+        master_memory = memory(server.pid)
+    finally:
+        server.terminate()
+        server.wait(timeout)
+
+    return {
+        "startup_s": ready_at - started,
+        "master": master_memory,
+        "workers": worker_memory,
+    }
+
+
+def _report(name: str, result: dict[str, Any]) -> None:
+    print(f"{name}: all workers ready in {result['startup_s']:.2f}s")  # noqa: T201
+    print(  # noqa: T201
+        "  master  rss {rss:.1f}MB pss {pss:.1f}MB uss {uss:.1f}MB".format(
+            **result["master"],
+        ),
+    )
+    for metric in ("rss", "pss", "uss"):
+        values = [worker[metric] for worker in result["workers"]]
+        print(  # noqa: T201
+            f"  worker  {metric} median {statistics.median(values):.1f}MB, "
+            f"total {sum(values):.1f}MB",
+        )
+
+
+def main() -> None:
+    """Run the server in both modes and compare them."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    results = {}
+    for preload in (False, True):
+        name = "preload" if preload else "factory"
+        results[name] = run_server(preload, args.workers, args.port, args.timeout)
+        _report(name, results[name])
+
+    for metric in ("pss", "uss"):
+        before, after = (
+            statistics.median(worker[metric] for worker in results[name]["workers"])
+            for name in ("factory", "preload")
+        )
+        print(  # noqa: T201
+            f"Per-worker {metric} saved by preload: {before - after:.1f}MB "
+            f"({(1 - after / before) * 100:.0f}%)",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Startup time of a worker.
+
+Every run starts a fresh interpreter, like a gunicorn worker does
+on boot and recycle, and measures the import of the application,
+the call of the factory and the time until the first request
+is answered, lifespan included. Optional integrations that were
+imported are reported too, none should be if they aren't configured.
+
+Connections aren't opened until they are used, so neither
+the database nor redis or rabbitmq are required.
+
+Run with::
+
+    python -m benchmarks.startup --runs 10
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import ujson
+
+# Median seconds from the start of the import to the first response.
+BUDGET = 3.0
+
+# Imported only if sentry or opentelemetry are configured.
+OPTIONAL_MODULES = (
+    "sentry_sdk",
+    "grpc",
+    "opentelemetry.sdk",
+    "opentelemetry.exporter",
+    "opentelemetry.instrumentation",
+)
+
+METRICS = ("import_ms", "app_ms", "first_request_ms", "total_ms")
+
+
+async def _first_request(app: Any) -> int:
+    from httpx import ASGITransport, AsyncClient
+
+    async with app.router.lifespan_context(app):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(
+            transport=transport,
+            base_url="http://startup",
+        ) as client:
+            response = await client.get(app.url_path_for("health_check"))
+    return response.status_code
+
+
+def measure() -> dict[str, Any]:
+    """
+    Start the application in the current interpreter.
+
+    :returns: timings in milliseconds and imported optional modules.
+    """
+    started = time.perf_counter()
+    from task_manager.web.application import get_app
+
+    imported = time.perf_counter()
+    app = get_app()
+    created = time.perf_counter()
+    status_code = asyncio.run(_first_request(app))
+    answered = time.perf_counter()
+
+    return {
+        "import_ms": round((imported - started) * 1000, 1),
+        "app_ms": round((created - imported) * 1000, 1),
+        "first_request_ms": round((answered - created) * 1000, 1),
+        "total_ms": round((answered - started) * 1000, 1),
+        "status_code": status_code,
+        "modules": len(sys.modules),
+        "optional_modules": [
+            name
+            for name in OPTIONAL_MODULES
+            if any(
+                module == name or module.startswith(f"{name}.")
+                for module in sys.modules
+            )
+        ],
+    }
+
+
+def run_once() -> dict[str, Any]:
+    """
+    Measure startup in a fresh interpreter.
+
+    Sentry and opentelemetry are left unconfigured.
+
+    :returns: results of ``measure``.
+    """
+    env = {
+        **os.environ,
+        "TASK_MANAGER_LOG_LEVEL": "WARNING",
+        "TASK_MANAGER_SENTRY_DSN": "",
+        "TASK_MANAGER_OPENTELEMETRY_ENDPOINT": "",
+    }
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    output = subprocess.run(  # noqa: S603
+        [sys.executable, "-m", "benchmarks.startup", "--child"],
+        capture_output=True,
+        check=True,
+        cwd=Path(__file__).parent.parent,
+        env=env,
+        text=True,
+    ).stdout
+    return ujson.loads(output.splitlines()[-1])
+
+
+def main() -> None:
+    """Run the benchmark and check the budget."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=BUDGET, help="seconds")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(ujson.dumps(measure()))  # noqa: T201
+        return
+
+    runs = [run_once() for _ in range(args.runs)]
+    for metric in METRICS:
+        values = [run[metric] for run in runs]
+        print(  # noqa: T201
+            f"{metric:>16}: median {statistics.median(values):.1f}, "
+            f"min {min(values):.1f}, max {max(values):.1f}",
+        )
+    print(f"{'modules':>16}: {runs[-1]['modules']}")  # noqa: T201
+    print(f"{'optional':>16}: {runs[-1]['optional_modules']}")  # noqa: T201
+
+    total = statistics.median(run["total_ms"] for run in runs) / 1000
+    if total > args.budget:
+        sys.exit(f"Startup took {total:.2f}s, the budget is {args.budget:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+Load test of the task API.
+
+Seeds users and tasks into a dedicated database, then sends
+GET/POST/PATCH/DELETE requests to /api/tasks through the real ASGI app,
+lifespan included, with the given concurrency. Every operation runs as
+a separate phase and reports requests per second, p50/p95/p99 latency
+and SQL statements per request. Results are saved as JSON, so runs
+on different commits can be compared.
+
+Requires a running database, redis and rabbitmq aren't used.
+The database "<TASK_MANAGER_DB_BASE>_bench" is created and dropped by the run.
+
+Run with::
+
+    python -m benchmarks.task_api --concurrency 32 --output before.json
+    python -m benchmarks.task_api --concurrency 32 --compare before.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import math
+import platform
+import random
+import subprocess
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+import ujson
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from task_manager.settings import LogLevel, settings
+
+OPERATIONS = ("list", "get", "create", "update", "delete")
+
+
+@dataclass
+class SeededUser:
+    """User with a token and ids of its tasks."""
+
+    token: str
+    task_ids: list[str]
+    created_ids: list[str] = field(default_factory=list)
+
+
+@dataclass
+class Phase:
+    """Measurements of a single operation."""
+
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    queries: int = 0
+    elapsed: float = 0.0
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Summarize the phase.
+
+        :returns: throughput, latency percentiles and queries per request.
+        """
+        latencies = sorted(self.latencies)
+        requests = len(latencies)
+        return {
+            "requests": requests,
+            "errors": self.errors,
+            "rps": round(requests / self.elapsed, 1) if self.elapsed else 0,
+            "p50_ms": round(_percentile(latencies, 0.5) * 1000, 2),
+            "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+            "queries_per_request": round(self.queries / requests, 2) if requests else 0,
+        }
+
+
+def _percentile(values: list[float], quantile: float) -> float:
+    if not values:
+        return 0.0
+    return values[max(math.ceil(quantile * len(values)) - 1, 0)]
+
+
+async def seed(
+    session_factory: async_sessionmaker[Any],
+    users: int,
+    tasks_per_user: int,
+) -> list[SeededUser]:
+    """
+    Create users with tasks.
+
+    :param session_factory: factory of database sessions.
+    :param users: number of users.
+    :param tasks_per_user: number of tasks of every user.
+    :returns: created users.
+    """
+    from task_manager.db.ids import uuid7
+    from task_manager.db.models.task_model import TaskDBModel
+    from task_manager.db.models.users import (  # type: ignore
+        UserDBModel,
+        get_jwt_strategy,
+    )
+
+    seeded = []
+    async with session_factory() as session:
+        for index in range(users):
+            user = UserDBModel(
+                email=f"bench{index}@example.com",
+                hashed_password="not-used",  # noqa: S106
+                is_active=True,
+            )
+            session.add(user)
+            await session.flush()
+            task_ids = [uuid7() for _ in range(tasks_per_user)]
+            await session.execute(
+                insert(TaskDBModel),
+                [
+                    {
+                        "id": task_id,
+                        "title": f"Task {number}",
+                        "description": "Seeded by the benchmark.",
+                        "completed": number % 2 == 0,
+                        "user_id": user.id,
+                    }
+                    for number, task_id in enumerate(task_ids)
+                ],
+            )
+            token = await get_jwt_strategy().write_token(user)
+            seeded.append(SeededUser(token, [str(task_id) for task_id in task_ids]))
+        await session.commit()
+    return seeded
+
+
+def _request(operation: str, user: SeededUser) -> tuple[str, str, Any]:
+    if operation == "list":
+        return "GET", "/api/tasks/?limit=20", None
+    if operation == "get":
+        return "GET", f"/api/tasks/{random.choice(user.task_ids)}", None  # noqa: S311
+    if operation == "create":
+        return "POST", "/api/tasks/", {"title": "Benchmark", "description": "New"}
+    if operation == "update":
+        task_id = random.choice(user.task_ids)  # noqa: S311
+        return "PATCH", f"/api/tasks/{task_id}", {"completed": True}
+    return "DELETE", f"/api/tasks/{user.created_ids.pop()}", None
+
+
+async def run_phase(
+    client: AsyncClient,
+    engine: AsyncEngine,
+    operation: str,
+    users: list[SeededUser],
+    requests: int,
+    concurrency: int,
+) -> Phase:
+    """
+    Send requests of a single operation.
+
+    :param client: client of the app.
+    :param engine: database engine of the app.
+    :param operation: one of ``OPERATIONS``.
+    :param users: seeded users.
+    :param requests: number of requests.
+    :param concurrency: number of concurrent clients.
+    :returns: measurements of the phase.
+    """
+    phase = Phase()
+    counter = itertools.count()
+
+    def count_query(*args: Any) -> None:
+        phase.queries += 1
+
+    async def worker() -> None:
+        while next(counter) < requests:
+            candidates = users
+            if operation == "delete":
+                candidates = [user for user in users if user.created_ids]
+                if not candidates:
+                    return
+            user = random.choice(candidates)  # noqa: S311
+            method, url, body = _request(operation, user)
+            started = time.perf_counter()
+            response = await client.request(
+                method,
+                url,
+                json=body,
+                headers={"Authorization": f"Bearer {user.token}"},
+            )
+            phase.latencies.append(time.perf_counter() - started)
+            if response.is_error:
+                phase.errors += 1
+            elif operation == "create":
+                user.created_ids.append(response.json()["id"])
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_query)
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        phase.elapsed = time.perf_counter() - started
+        event.remove(engine.sync_engine, "before_cursor_execute", count_query)
+    return phase
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(  # noqa: S603
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any]) -> None:
+    """
+    Print changes of throughput and latency against a previous run.
+
+    :param results: results of this run.
+    :param baseline: results of the previous run.
+    """
+    print(f"Compared with {baseline.get('commit')}:")  # noqa: T201
+    for operation, current in results["operations"].items():
+        previous = baseline["operations"].get(operation)
+        if not previous or not previous["rps"]:
+            continue
+        rps_change = (current["rps"] / previous["rps"] - 1) * 100
+        print(  # noqa: T201
+            f"{operation:>7}: rps {previous['rps']} -> {current['rps']} "
+            f"({rps_change:+.1f}%), "
+            f"p99 {previous['p99_ms']}ms -> {current['p99_ms']}ms, "
+            f"queries {previous['queries_per_request']} -> "
+            f"{current['queries_per_request']}",
+        )
+
+
+async def benchmark(args: argparse.Namespace) -> dict[str, Any]:
+    """
+    Seed the database and run all phases.
+
+    :param args: command line arguments.
+    :returns: results of the run.
+    """
+    from task_manager.db.meta import meta
+    from task_manager.db.models import load_all_models
+    from task_manager.db.utils import create_database, drop_database
+    from task_manager.web.application import get_app
+
+    load_all_models()
+    await create_database()
+    app: FastAPI = get_app()
+    try:
+        async with app.router.lifespan_context(app):
+            engine: AsyncEngine = app.state.db_engine
+            async with engine.begin() as conn:
+                await conn.run_sync(meta.create_all)
+            users = await seed(
+                app.state.db_session_factory,
+                args.users,
+                args.tasks_per_user,
+            )
+            transport = ASGITransport(app=app)  # type: ignore
+            async with AsyncClient(
+                transport=transport,
+                base_url="http://benchmark",
+            ) as client:
+                operations = {}
+                for operation in OPERATIONS:
+                    phase = await run_phase(
+                        client,
+                        engine,
+                        operation,
+                        users,
+                        args.requests,
+                        args.concurrency,
+                    )
+                    operations[operation] = phase.summary()
+                    print(operation, operations[operation])  # noqa: T201
+    finally:
+        if not args.keep_database:
+            await drop_database()
+
+    return {
+        "commit": _commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "concurrency": args.concurrency,
+        "users": args.users,
+        "tasks_per_user": args.tasks_per_user,
+        "operations": operations,
+    }
+
+
+def main() -> None:
+    """Run the benchmark, save and compare results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=1000, help="per operation")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--tasks-per-user", type=int, default=100)
+    parser.add_argument("--output", type=Path, help="file to save results into")
+    parser.add_argument("--compare", type=Path, help="results of a previous run")
+    parser.add_argument("--keep-database", action="store_true")
+    args = parser.parse_args()
+
+    settings.db_base = f"{settings.db_base}_bench"
+    settings.db_echo = False
+    settings.rate_limit_enabled = False
+    settings.log_level = LogLevel.WARNING
+
+    results = asyncio.run(benchmark(args))
+    if args.output is not None:
+        args.output.write_text(ujson.dumps(results, indent=2))
+    if args.compare is not None:
+        compare(results, ujson.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
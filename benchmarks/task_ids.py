@@ -0,0 +1,179 @@
+"""
+Insert throughput and index size of UUIDv4 and UUIDv7 task ids.
+
+Inserts the same number of tasks into two copies of the task table,
+one keyed by random UUIDv4 and one by time-ordered UUIDv7, in batches
+of a single statement and transaction, and reports rows per second
+overall and over the last tenth of the rows, when random keys have
+spread over an index larger than the cache, and sizes of the primary
+key index and the table.
+
+Requires a running database. The database "<TASK_MANAGER_DB_BASE>_ids"
+is created and dropped by the run.
+
+Run with::
+
+    python -m benchmarks.task_ids --rows 1000000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Any, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from task_manager.settings import settings
+
+TABLE_DDL = """
+CREATE TABLE {name} (
+    id uuid PRIMARY KEY,
+    title varchar(200) NOT NULL,
+    description varchar(500) NOT NULL,
+    completed boolean NOT NULL,
+    created_at timestamptz NOT NULL DEFAULT now(),
+    updated_at timestamptz NOT NULL DEFAULT now(),
+    user_id uuid NOT NULL
+)
+"""
+
+
+def generation_rate(generate: Callable[[], uuid.UUID], count: int) -> float:
+    """
+    Ids generated per second.
+
+    :param generate: id generator.
+    :param count: number of ids to generate.
+    :returns: ids per second.
+    """
+    started = time.perf_counter()
+    for _ in range(count):
+        generate()
+    return count / (time.perf_counter() - started)
+
+
+async def insert_rows(
+    engine: AsyncEngine,
+    name: str,
+    generate: Callable[[], uuid.UUID],
+    rows: int,
+    batch_size: int,
+) -> dict[str, Any]:
+    """
+    Insert tasks into a table in batches.
+
+    :param engine: database engine.
+    :param name: name of the table.
+    :param generate: id generator.
+    :param rows: number of tasks.
+    :param batch_size: tasks per statement.
+    :returns: throughput and sizes.
+    """
+    async with engine.begin() as conn:
+        await conn.execute(text(TABLE_DDL.format(name=name)))
+
+    statement = text(
+        f"INSERT INTO {name} (id, title, description, completed, user_id) "  # noqa: S608
+        "SELECT * FROM unnest("
+        "CAST(:ids AS uuid[]), CAST(:titles AS varchar[]), "
+        "CAST(:descriptions AS varchar[]), CAST(:completed AS boolean[]), "
+        "CAST(:user_ids AS uuid[]))",
+    )
+    user_ids = [uuid.uuid4() for _ in range(100)]
+    batch_times = []
+    for start in range(0, rows, batch_size):
+        count = min(batch_size, rows - start)
+        params = {
+            "ids": [generate() for _ in range(count)],
+            "titles": [f"Task {start + index}" for index in range(count)],
+            "descriptions": ["Inserted by the benchmark."] * count,
+            "completed": [index % 2 == 0 for index in range(count)],
+            "user_ids": [user_ids[index % len(user_ids)] for index in range(count)],
+        }
+        started = time.perf_counter()
+        async with engine.begin() as conn:
+            await conn.execute(statement, params)
+        batch_times.append((count, time.perf_counter() - started))
+
+    tail = batch_times[-max(len(batch_times) // 10, 1) :]
+    async with engine.connect() as conn:
+        sizes = await _sizes(conn, name)
+    return {
+        "rows_per_s": round(rows / sum(seconds for _, seconds in batch_times)),
+        "last_tenth_rows_per_s": round(
+            sum(count for count, _ in tail) / sum(seconds for _, seconds in tail),
+        ),
+        **sizes,
+    }
+
+
+async def _sizes(conn: AsyncConnection, name: str) -> dict[str, Any]:
+    result = await conn.execute(
+        text(
+            "SELECT pg_relation_size(:index), pg_relation_size(:table)",
+        ),
+        {"index": f"{name}_pkey", "table": name},
+    )
+    index_bytes, table_bytes = result.one()
+    return {
+        "index_mb": round(index_bytes / 2**20, 1),
+        "table_mb": round(table_bytes / 2**20, 1),
+    }
+
+
+async def benchmark(args: argparse.Namespace) -> dict[str, dict[str, Any]]:
+    """
+    Insert tasks with both kinds of ids.
+
+    :param args: command line arguments.
+    :returns: results of every kind of id.
+    """
+    from task_manager.db.ids import uuid7
+    from task_manager.db.utils import create_database, drop_database
+
+    generators = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+    await create_database()
+    engine = create_async_engine(str(settings.db_url))
+    results = {}
+    try:
+        for kind, generate in generators.items():
+            results[kind] = {
+                "ids_per_s": round(generation_rate(generate, 100_000)),
+                **await insert_rows(
+                    engine,
+                    f"task_{kind}",
+                    generate,
+                    args.rows,
+                    args.batch_size,
+                ),
+            }
+            print(kind, results[kind])  # noqa: T201
+    finally:
+        await engine.dispose()
+        await drop_database()
+    return results
+
+
+def main() -> None:
+    """Run the benchmark and compare both kinds of ids."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    settings.db_base = f"{settings.db_base}_ids"
+    settings.db_echo = False
+
+    results = asyncio.run(benchmark(args))
+    v4, v7 = results["uuid4"], results["uuid7"]
+    for metric in ("rows_per_s", "last_tenth_rows_per_s", "index_mb"):
+        print(  # noqa: T201
+            f"{metric}: uuid4 {v4[metric]} -> uuid7 {v7[metric]} "
+            f"({(v7[metric] / v4[metric] - 1) * 100:+.0f}%)",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Per-request overhead of opentelemetry tracing.
+
+Requests go through an instrumented FastAPI app whose handler opens
+a few child spans, like SQL statements of a real request. Spans are
+exported into an in-memory exporter, so only the cost of creating,
+sampling and processing spans is measured. Every tracing variant is
+compared with an app that isn't instrumented.
+
+Run with::
+
+    python -m benchmarks.tracing_overhead --requests 2000
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Optional
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+
+from task_manager.services.tracing.provider import create_tracer_provider
+from task_manager.settings import settings
+
+VARIANTS: dict[str, dict[str, Any]] = {
+    "sample all": {"opentelemetry_sample_ratio": 1.0},
+    "ratio 0.1": {
+        "opentelemetry_sample_ratio": 0.1,
+        "opentelemetry_sample_errors": False,
+        "opentelemetry_slow_threshold": None,
+    },
+    "ratio 0.1, errors and slow": {
+        "opentelemetry_sample_ratio": 0.1,
+        "opentelemetry_sample_errors": True,
+        "opentelemetry_slow_threshold": 1.0,
+    },
+}
+
+
+def create_app(tracer_provider: Optional[TracerProvider], child_spans: int) -> FastAPI:
+    """
+    Create an app with a single route.
+
+    :param tracer_provider: provider to instrument the app with.
+    :param child_spans: number of spans opened by the handler.
+    :returns: application.
+    """
+    app = FastAPI()
+    provider = tracer_provider or TracerProvider()
+    tracer = provider.get_tracer(__name__)
+
+    @app.get("/api/tasks/")
+    async def get_tasks() -> list[str]:
+        for _ in range(child_spans):
+            if tracer_provider is not None:
+                with tracer.start_as_current_span("SELECT task_manager"):
+                    pass
+        return []
+
+    if tracer_provider is not None:
+        FastAPIInstrumentor().instrument_app(app, tracer_provider=tracer_provider)
+    return app
+
+
+async def run(app: FastAPI, requests: int) -> float:
+    """
+    Send requests to the app.
+
+    :param app: application.
+    :param requests: number of requests.
+    :returns: microseconds per request.
+    """
+    transport = ASGITransport(app=app)  # type: ignore
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        for _ in range(requests // 10):
+            await client.get("/api/tasks/")
+        started = time.perf_counter()
+        for _ in range(requests):
+            await client.get("/api/tasks/")
+        return (time.perf_counter() - started) / requests * 1e6
+
+
+async def main() -> None:
+    """Run the benchmark and print results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--child-spans", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = await run(create_app(None, args.child_spans), args.requests)
+    print({"variant": "off", "us_per_request": round(baseline)})  # noqa: T201
+
+    for name, overrides in VARIANTS.items():
+        for key, value in overrides.items():
+            setattr(settings, key, value)
+        exporter = InMemorySpanExporter()
+        tracer_provider = create_tracer_provider(exporter)
+        app = create_app(tracer_provider, args.child_spans)
+        per_request = await run(app, args.requests)
+        tracer_provider.force_flush()
+        print(  # noqa: T201
+            {
+                "variant": name,
+                "us_per_request": round(per_request),
+                "overhead_us": round(per_request - baseline),
+                "exported_spans": len(exporter.get_finished_spans()),
+            },
+        )
+        tracer_provider.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,19 +1,42 @@
+import os
+import shutil
+
 import uvicorn
 
 from task_manager.gunicorn_runner import GunicornApplication
 from task_manager.settings import settings
 
 
+def set_multiproc_dir() -> None:
+    """
+    Sets mutiproc_dir env variable.
+
+    This function cleans up the multiprocess directory
+    and recreates it. Workers flush their metrics into
+    this directory, so metrics are aggregated across processes.
+    """
+    shutil.rmtree(settings.prometheus_dir, ignore_errors=True)
+    settings.prometheus_dir.mkdir(parents=True, exist_ok=True)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(
+        settings.prometheus_dir.expanduser().absolute(),
+    )
+
+
 def main() -> None:
     """Entrypoint of the application."""
+    set_multiproc_dir()
     if settings.reload:
         uvicorn.run(
             "task_manager.web.application:get_app",
-            workers=settings.workers_count,
+            workers=settings.workers,
             host=settings.host,
             port=settings.port,
             reload=settings.reload,
+            backlog=settings.backlog,
+            timeout_keep_alive=settings.keepalive,
+            timeout_graceful_shutdown=settings.shutdown_timeout,
             log_level=settings.log_level.value.lower(),
+            access_log=settings.uvicorn_access_log,
             factory=True,
         )
     else:
@@ -24,9 +47,15 @@ def main() -> None:
             "task_manager.web.application:get_app",
             host=settings.host,
             port=settings.port,
-            workers=settings.workers_count,
+            workers=settings.workers,
             factory=True,
-            accesslog="-",
+            preload_app=settings.preload_app,
+            max_requests=settings.max_requests,
+            max_requests_jitter=settings.max_requests_jitter,
+            backlog=settings.backlog,
+            keepalive=settings.keepalive,
+            graceful_timeout=settings.graceful_timeout,
+            accesslog="-" if settings.uvicorn_access_log else None,
             loglevel=settings.log_level.value.lower(),
             access_log_format='%r "-" %s "-" %Tf',
         ).run()
@@ -1,12 +1,42 @@
+import datetime
 import uuid
-from typing import List
+from typing import Any, List, cast
 
 from fastapi import Depends
-from sqlalchemy import select
+from sqlalchemy import (
+    Subquery,
+    Table,
+    Uuid,
+    any_,
+    bindparam,
+    delete,
+    func,
+    insert,
+    select,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from task_manager.db.dependencies import get_db_session
+from task_manager.db.models.task_archive_model import TaskArchiveDBModel
 from task_manager.db.models.task_model import TaskDBModel
+from task_manager.db.single_flight import SingleFlight
+
+# Identical concurrent list reads of a worker share a single query.
+task_list_reads = SingleFlight()
+
+
+def _tasks_with_archive() -> Subquery:
+    task = TaskDBModel.__table__
+    archive = TaskArchiveDBModel.__table__
+    # Filters on the union are pushed down into both selects by postgres.
+    return union_all(
+        select(*task.c),
+        select(*(archive.c[column.name] for column in task.c)),
+    ).subquery("task")
 
 
 class TaskDAO:
@@ -38,8 +68,9 @@ class TaskDAO:
             user_id=user_id,
         )
         self.session.add(task_db_model)
+        # Timestamps are returned by the INSERT and sessions don't expire
+        # on commit, so the model is complete without reading it back.
         await self.session.commit()
-        await self.session.refresh(task_db_model)
         return task_db_model
 
     async def get_all_tasks(
@@ -48,13 +79,23 @@ class TaskDAO:
         limit: int = 10,
         page: int = 1,
         completed: bool | None = None,
+        updated_since: datetime.datetime | None = None,
+        include_archived: bool = False,
     ) -> List[TaskDBModel]:
         """
         Get all task models with limit/page pagination.
 
+        Identical concurrent calls are coalesced into one query,
+        the returned models may be shared between callers
+        and must not be modified.
+
         Args:
             user_id (uuid): ID of the user.
             completed (bool): Filter tasks based on completion status.
+            updated_since (datetime): Only tasks changed after this time,
+                oldest change first.
+            include_archived (bool): Read archived tasks too,
+                in order of ids.
             limit (int): Limit of tasks.
             page (int): page of tasks.
 
@@ -62,15 +103,37 @@ class TaskDAO:
             List[TaskDBModel]: Stream of tasks.
         """
 
-        query = select(TaskDBModel).filter_by(user_id=user_id)
+        tasks: Any = TaskDBModel
+        if include_archived:
+            tasks = aliased(TaskDBModel, _tasks_with_archive())
+        query = select(tasks).where(tasks.user_id == user_id)
         if completed is not None:
-            query = query.filter_by(completed=completed)
+            query = query.where(tasks.completed == completed)
+        if updated_since is not None:
+            # Range scan of the (user_id, updated_at) index, in its order,
+            # so pages of changes don't overlap and the last one ends
+            # with the latest change.
+            query = query.where(tasks.updated_at > updated_since).order_by(
+                tasks.updated_at,
+                tasks.id,
+            )
+        elif include_archived:
+            # Pages of the union are only stable in a total order.
+            query = query.order_by(tasks.id)
 
         offset = (page - 1) * limit
-        raw_tasks = await self.session.execute(
-            query.limit(limit).offset(offset),
+
+        async def fetch() -> List[TaskDBModel]:
+            raw_tasks = await self.session.execute(
+                query.limit(limit).offset(offset),
+            )
+            return list(raw_tasks.scalars().fetchall())
+
+        results = await task_list_reads.do(
+            (user_id, limit, page, completed, updated_since, include_archived),
+            fetch,
         )
-        return list(raw_tasks.scalars().fetchall())
+        return list(results)
 
     async def get_task_by_id(
         self,
@@ -125,10 +188,105 @@ class TaskDAO:
         if completed is not None:
             task_db_model.completed = completed
 
+        # updated_at is set by a trigger and returned by the UPDATE.
         await self.session.commit()
-        await self.session.refresh(task_db_model)  # Update the task in the session
         return task_db_model
 
+    async def update_tasks(
+        self,
+        user_id: uuid.UUID,
+        ids: List[uuid.UUID] | None = None,
+        filter_completed: bool | None = None,
+        after: uuid.UUID | None = None,
+        limit: int | None = None,
+        title: str | None = None,
+        description: str | None = None,
+        completed: bool | None = None,
+    ) -> tuple[List[uuid.UUID], bool]:
+        """
+        Update many tasks of a user with a single statement.
+
+        Tasks are selected by ids, by their completion status, or both.
+        Changes are applied like in ``update_task``. Tasks are locked
+        in order of ids. With a limit, only the first of them are updated,
+        so a call locks and returns a bounded number of them.
+
+        Args:
+            user_id (uuid): ID of the user.
+            ids (List[uuid]): IDs of the tasks.
+            filter_completed (bool): Completion status of the tasks.
+            after (uuid): Only tasks with greater IDs.
+            limit (int): Most tasks updated.
+            title (str): New title of the tasks.
+            description (str): New description of the tasks.
+            completed (bool): New completion status of the tasks.
+
+        Returns:
+            tuple[List[uuid], bool]: IDs of updated tasks in their order,
+                and whether more tasks are selected after the last one.
+        """
+
+        values: dict[str, Any] = {}
+        if title:
+            values["title"] = title
+        if description:
+            values["description"] = description
+        if completed is not None:
+            values["completed"] = completed
+
+        def selected(tasks: Any) -> List[Any]:
+            conditions = [tasks.user_id == user_id]
+            if ids is not None:
+                # A single array parameter, the statement doesn't depend
+                # on the number of ids.
+                conditions.append(
+                    tasks.id == any_(bindparam("ids", ids, type_=ARRAY(Uuid))),
+                )
+            if filter_completed is not None:
+                conditions.append(tasks.completed == filter_completed)
+            if after is not None:
+                conditions.append(tasks.id > after)
+            return conditions
+
+        # Rows are locked in order of ids, like the copy into partitioned
+        # tables and other bulk updates do, so they can't deadlock.
+        # A CTE is evaluated once, a rescanned subquery would skip rows
+        # already updated and lock more than the limit.
+        first = aliased(TaskDBModel)
+        locked = (
+            select(first.id)
+            .where(*selected(first))
+            .order_by(first.id)
+            .limit(limit)
+            .with_for_update()
+            .cte("locked")
+        )
+        query = (
+            update(TaskDBModel)
+            .where(
+                TaskDBModel.user_id == user_id,
+                TaskDBModel.id.in_(select(locked.c.id)),
+            )
+            .values(values)
+            .returning(TaskDBModel.id)
+        )
+
+        updated = await self.session.execute(
+            query,
+            execution_options={"synchronize_session": False},
+        )
+        updated_ids = sorted(updated.scalars())
+        more = False
+        if limit is not None and len(updated_ids) == limit:
+            remaining = await self.session.execute(
+                select(TaskDBModel.id)
+                .where(*selected(TaskDBModel), TaskDBModel.id > updated_ids[-1])
+                .limit(1),
+            )
+            more = remaining.first() is not None
+        await self.session.commit()
+        return updated_ids, more
+
     async def delete_task(self, task_db_model: TaskDBModel) -> None:
         """
         Delete task by id.
@@ -143,3 +301,48 @@ class TaskDAO:
 
         await self.session.delete(task_db_model)
         await self.session.commit()
+
+    async def archive_tasks(
+        self,
+        older_than: datetime.timedelta,
+        batch_size: int,
+    ) -> int:
+        """
+        Move a batch of completed tasks into the archive.
+
+        Tasks locked by other transactions are skipped, so concurrent
+        jobs of several workers move different tasks.
+
+        Args:
+            older_than (timedelta): Age of the last change of moved tasks.
+            batch_size (int): Most tasks moved.
+
+        Returns:
+            int: Number of moved tasks.
+        """
+
+        task = cast(Table, TaskDBModel.__table__)
+        archive = cast(Table, TaskArchiveDBModel.__table__)
+        batch = (
+            select(task.c.id, task.c.user_id)
+            .where(task.c.completed, task.c.updated_at < func.now() - older_than)
+            .order_by(task.c.updated_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .cte("batch")
+        )
+        moved = (
+            delete(task)
+            .where(task.c.id == batch.c.id, task.c.user_id == batch.c.user_id)
+            .returning(*task.c)
+            .cte("moved")
+        )
+        columns = [column.name for column in task.c]
+        archived = await self.session.execute(
+            insert(archive)
+            .from_select(columns, select(*(moved.c[name] for name in columns)))
+            .returning(archive.c.id),
+        )
+        count = len(archived.all())
+        await self.session.commit()
+        return count
@@ -1,6 +1,6 @@
 from typing import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from starlette.requests import Request
 
 
@@ -18,3 +18,13 @@ async def get_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]
     finally:
         await session.commit()
         await session.close()
+
+
+def get_db_engine(request: Request) -> AsyncEngine:
+    """
+    Get database engine.
+
+    :param request: current request.
+    :returns: database engine.
+    """
+    return request.app.state.db_engine
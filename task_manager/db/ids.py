@@ -0,0 +1,64 @@
+import os
+import threading
+import time
+import uuid
+from typing import Callable
+
+COUNTER_BITS = 12
+MAX_COUNTER = (1 << COUNTER_BITS) - 1
+RANDOM_BITS = 62
+
+
+class UUIDv7Generator:
+    """
+    Generates time-ordered UUIDv7 (RFC 9562).
+
+    Ids start with the unix time in milliseconds, so rows inserted
+    together land on the same pages of the primary key index, and
+    ids sort by creation time. Ids of the same millisecond are ordered
+    by a 12-bit counter which starts at a random value in the lower
+    half of its range. If it overflows, the timestamp is advanced by
+    a millisecond, and the last timestamp is kept when the clock goes
+    back, so ids of a process never decrease. The remaining 62 bits
+    are random, they keep ids of different processes unique.
+    """
+
+    def __init__(self, clock: Callable[[], int] = time.time_ns) -> None:
+        self.clock = clock
+        self.last_ms = 0
+        self.counter = 0
+        self.lock = threading.Lock()
+
+    def __call__(self) -> uuid.UUID:
+        """
+        Generate an id.
+
+        :returns: new UUIDv7, greater than ids generated before it.
+        """
+        with self.lock:
+            now_ms = self.clock() // 1_000_000
+            if now_ms > self.last_ms:
+                self.last_ms = now_ms
+                self.counter = _random_bits(COUNTER_BITS - 1)
+            elif self.counter < MAX_COUNTER:
+                self.counter += 1
+            else:
+                self.last_ms += 1
+                self.counter = _random_bits(COUNTER_BITS - 1)
+            timestamp, counter = self.last_ms, self.counter
+
+        value = (
+            (timestamp & 0xFFFF_FFFF_FFFF) << 80
+            | 0x7 << 76
+            | counter << 64
+            | 0b10 << 62
+            | _random_bits(RANDOM_BITS)
+        )
+        return uuid.UUID(int=value)
+
+
+def _random_bits(bits: int) -> int:
+    return int.from_bytes(os.urandom(8), "big") >> (64 - bits)
+
+
+uuid7 = UUIDv7Generator()
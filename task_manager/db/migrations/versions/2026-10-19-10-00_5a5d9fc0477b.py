@@ -0,0 +1,119 @@
+"""task timestamps generated by the database
+
+Revision ID: 5a5d9fc0477b
+Revises: a8a677db14f1
+Create Date: 2026-10-19 10:00:00.000000
+
+Changing the type of created_at to timestamptz rewrites the task table
+while holding an ACCESS EXCLUSIVE lock, reads and writes of tasks wait
+until it's done. Adding updated_at doesn't rewrite it, the backfill
+runs afterwards in short batches, each committed on its own,
+and the index is built concurrently.
+
+"""
+
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+
+
+BACKFILL_BATCH_SIZE = 10_000
+
+# revision identifiers, used by Alembic.
+revision = "5a5d9fc0477b"
+down_revision = "a8a677db14f1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Naive timestamps were written with utcnow.
+    op.alter_column(
+        "task",
+        "created_at",
+        type_=sa.DateTime(timezone=True),
+        existing_type=sa.DateTime(),
+        existing_nullable=False,
+        server_default=sa.text("now()"),
+        postgresql_using="created_at AT TIME ZONE 'UTC'",
+    )
+    op.add_column(
+        "task",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    # Existing tasks haven't been changed since they were created, as far as
+    # we know. Backfilled before the trigger exists, so it doesn't overwrite it.
+    with op.get_context().autocommit_block():
+        backfill_updated_at()
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at = now();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+    )
+    op.execute(
+        """
+        CREATE TRIGGER task_set_updated_at BEFORE UPDATE ON task
+        FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*)
+        EXECUTE FUNCTION set_updated_at()
+        """,
+    )
+    # Built without blocking writes to the table.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_task_user_id_updated_at",
+            "task",
+            ["user_id", "updated_at"],
+            postgresql_concurrently=True,
+        )
+
+
+def backfill_updated_at() -> None:
+    """Copy created_at into updated_at in batches of ids."""
+    connection = op.get_bind()
+    after = uuid.UUID(int=0)
+    while True:
+        updated = connection.execute(
+            sa.text(
+                "WITH batch AS ("
+                "SELECT id FROM task WHERE id > :after ORDER BY id LIMIT :batch_size"
+                ") UPDATE task SET updated_at = created_at FROM batch "
+                "WHERE task.id = batch.id RETURNING task.id",
+            ),
+            {"after": after, "batch_size": BACKFILL_BATCH_SIZE},
+        )
+        ids = updated.scalars().all()
+        if len(ids) < BACKFILL_BATCH_SIZE:
+            return
+        after = max(ids)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_task_user_id_updated_at",
+            table_name="task",
+            postgresql_concurrently=True,
+        )
+    op.execute("DROP TRIGGER task_set_updated_at ON task")
+    op.execute("DROP FUNCTION set_updated_at()")
+    op.drop_column("task", "updated_at")
+    op.alter_column(
+        "task",
+        "created_at",
+        type_=sa.DateTime(),
+        existing_type=sa.DateTime(timezone=True),
+        existing_nullable=False,
+        server_default=None,
+        postgresql_using="created_at AT TIME ZONE 'UTC'",
+    )
@@ -0,0 +1,112 @@
+"""archive of completed tasks
+
+Revision ID: c3f1a9d27b64
+Revises: 5a5d9fc0477b
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c3f1a9d27b64"
+down_revision = "5a5d9fc0477b"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "task_archive",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("title", sa.String(length=200), nullable=False),
+        sa.Column("description", sa.String(length=500), nullable=False),
+        sa.Column("completed", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column(
+            "archived_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_task_archive_user_id", "task_archive", ["user_id"])
+    # Built without blocking writes to the task table.
+    with op.get_context().autocommit_block():
+        if task_partitions() is None:
+            op.create_index(
+                "ix_task_completed_updated_at",
+                "task",
+                ["updated_at"],
+                postgresql_where=sa.text("completed"),
+                postgresql_concurrently=True,
+            )
+        else:
+            create_partitioned_index()
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_task_completed_updated_at",
+            table_name="task",
+            # Indexes of partitioned tables can't be dropped concurrently.
+            postgresql_concurrently=task_partitions() is None,
+        )
+    op.drop_index("ix_task_archive_user_id", table_name="task_archive")
+    op.drop_table("task_archive")
+
+
+def task_partitions() -> list[str] | None:
+    """
+    Partitions of the task table.
+
+    The table is partitioned by ``python -m task_manager.db.partitioning``.
+
+    :returns: names of partitions, none if the table isn't partitioned.
+    """
+    conn = op.get_bind()
+    partitioned = conn.execute(
+        sa.text(
+            "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('task')",
+        ),
+    ).scalar()
+    if not partitioned:
+        return None
+    result = conn.execute(
+        sa.text(
+            "SELECT inhrelid::regclass::text FROM pg_inherits "
+            "WHERE inhparent = to_regclass('task') ORDER BY 1",
+        ),
+    )
+    return list(result.scalars())
+
+
+def create_partitioned_index() -> None:
+    """
+    Index the partitioned task table without blocking writes.
+
+    Indexes of partitioned tables can't be built concurrently, so the
+    index is created invalid on the parent only, built concurrently on
+    every partition, and becomes valid once all of them are attached.
+    """
+    op.execute(
+        "CREATE INDEX ix_task_completed_updated_at "
+        "ON ONLY task (updated_at) WHERE completed",
+    )
+    for partition in task_partitions() or []:
+        name = f"ix_{partition}_completed_updated_at"
+        op.create_index(
+            name,
+            partition,
+            ["updated_at"],
+            postgresql_where=sa.text("completed"),
+            postgresql_concurrently=True,
+        )
+        op.execute(f"ALTER INDEX ix_task_completed_updated_at ATTACH PARTITION {name}")
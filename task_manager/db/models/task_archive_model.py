@@ -0,0 +1,27 @@
+import datetime
+import uuid
+
+from sqlalchemy import DateTime, ForeignKey, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql.sqltypes import String
+
+from task_manager.db.base import Base
+
+
+class TaskArchiveDBModel(Base):
+    """Completed tasks moved out of the task table by the archival job."""
+
+    __tablename__ = "task_archive"
+    __table_args__ = (Index("ix_task_archive_user_id", "user_id"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
+    title: Mapped[str] = mapped_column(String(length=200))
+    description: Mapped[str] = mapped_column(String(length=500))
+    completed: Mapped[bool]
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True))
+    updated_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True))
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("user.id"))
+    archived_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
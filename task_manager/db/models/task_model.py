@@ -1,27 +1,85 @@
 import datetime
 import uuid
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import (
+    DDL,
+    DateTime,
+    FetchedValue,
+    ForeignKey,
+    Index,
+    event,
+    func,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql.sqltypes import String
 
 from task_manager.db.base import Base
+from task_manager.db.ids import uuid7
+
+# Keeps updated_at of a row current, updates which change nothing keep it.
+SET_UPDATED_AT_FUNCTION = DDL(
+    """
+    CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+    BEGIN
+        NEW.updated_at = now();
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+)
+SET_UPDATED_AT_TRIGGER = DDL(
+    """
+    CREATE TRIGGER task_set_updated_at BEFORE UPDATE ON task
+    FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*)
+    EXECUTE FUNCTION set_updated_at()
+    """,
+)
 
 
 class TaskDBModel(Base):
     """Model for Task."""
 
     __tablename__ = "task"
+    __table_args__ = (
+        # Changes of a user's tasks are read with a range scan.
+        Index("ix_task_user_id_updated_at", "user_id", "updated_at"),
+        # Completed tasks due for the archive are found without a full scan.
+        Index(
+            "ix_task_completed_updated_at",
+            "updated_at",
+            postgresql_where=text("completed"),
+        ),
+    )
+    # Timestamps generated by the database are returned
+    # by the INSERT or UPDATE itself, instead of another query.
+    # Tasks are identified by user too, so updates and deletes filter
+    # by it and scan a single partition of a table partitioned by user.
+    __mapper_args__ = {  # noqa: RUF012
+        "eager_defaults": True,
+        "primary_key": ["id", "user_id"],
+    }
 
-    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    # Time-ordered, new tasks are appended to the end of the primary key index.
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid7)
     title: Mapped[str] = mapped_column(String(length=200))
     description: Mapped[str] = mapped_column(String(length=500))
     completed: Mapped[bool] = mapped_column(default=False)
     created_at: Mapped[datetime.datetime] = mapped_column(
-        default=datetime.datetime.utcnow,
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        server_onupdate=FetchedValue(),
     )
 
     # Add the foreign key
     user_id: Mapped[uuid] = mapped_column(ForeignKey("user.id"))
     # Add a relationship to the user model (optional, but useful)
     user: Mapped["user"] = relationship("UserDBModel", back_populates="tasks")
+
+
+event.listen(TaskDBModel.__table__, "after_create", SET_UPDATED_AT_FUNCTION)
+event.listen(TaskDBModel.__table__, "after_create", SET_UPDATED_AT_TRIGGER)
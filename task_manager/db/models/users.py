@@ -2,9 +2,18 @@
 from __future__ import annotations
 
 import uuid
+from typing import Any, Optional
 
-from fastapi import Depends
-from fastapi_users import BaseUserManager, FastAPIUsers, UUIDIDMixin, schemas
+import jwt
+from fastapi import Depends, Request
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi_users import (
+    BaseUserManager,
+    FastAPIUsers,
+    UUIDIDMixin,
+    exceptions,
+    schemas,
+)
 from fastapi_users.authentication import (
     AuthenticationBackend,
     BearerTransport,
@@ -12,11 +21,16 @@ from fastapi_users.authentication import (
     JWTStrategy,
 )
 from fastapi_users.db import SQLAlchemyBaseUserTableUUID, SQLAlchemyUserDatabase
+from fastapi_users.jwt import decode_jwt, generate_jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, relationship
 
 from task_manager.db.base import Base
 from task_manager.db.dependencies import get_db_session
+from task_manager.services.passwords.hasher import (
+    OffloadedPasswordHelper,
+    password_helper,
+)
 from task_manager.settings import settings
 
 
@@ -43,6 +57,161 @@ class UserManager(UUIDIDMixin, BaseUserManager[UserDBModel, uuid.UUID]):
 
     reset_password_token_secret = settings.users_secret
     verification_token_secret = settings.users_secret
+    password_helper: OffloadedPasswordHelper
+
+    async def authenticate(
+        self,
+        credentials: OAuth2PasswordRequestForm,
+    ) -> Optional[UserDBModel]:
+        """
+        Authenticate a user by email and password, hashing off the event loop.
+
+        :param credentials: email and password of the user.
+        :returns: the user, or None if credentials are wrong.
+        """
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Hash anyway, so response time doesn't reveal registered emails.
+            await self.password_helper.hash_offloaded(credentials.password)
+            return None
+
+        verified, updated_hash = await self.password_helper.verify_and_update_offloaded(
+            credentials.password,
+            user.hashed_password,
+        )
+        if not verified:
+            return None
+        if updated_hash is not None:
+            await self.user_db.update(user, {"hashed_password": updated_hash})
+        return user
+
+    async def create(
+        self,
+        user_create: schemas.UC,
+        safe: bool = False,
+        request: Optional[Request] = None,
+    ) -> UserDBModel:
+        """
+        Create a user, hashing the password off the event loop.
+
+        :param user_create: user to create.
+        :param safe: whether to ignore privileged fields like is_superuser.
+        :param request: request which triggered the registration.
+        :raises UserAlreadyExists: if the email is already registered.
+        :returns: created user.
+        """
+        await self.validate_password(user_create.password, user_create)
+        if await self.user_db.get_by_email(user_create.email) is not None:
+            raise exceptions.UserAlreadyExists
+
+        user_dict = (
+            user_create.create_update_dict()
+            if safe
+            else user_create.create_update_dict_superuser()
+        )
+        password = user_dict.pop("password")
+        user_dict["hashed_password"] = await self.password_helper.hash_offloaded(
+            password,
+        )
+        created_user = await self.user_db.create(user_dict)
+        await self.on_after_register(created_user, request)
+        return created_user
+
+    async def forgot_password(
+        self,
+        user: UserDBModel,
+        request: Optional[Request] = None,
+    ) -> None:
+        """
+        Start a password reset, hashing the fingerprint off the event loop.
+
+        The token carries a hash of the current password hash,
+        so it's invalid once the password changes.
+
+        :param user: user who forgot the password.
+        :param request: request which started the reset.
+        :raises UserInactive: if the user is inactive.
+        """
+        if not user.is_active:
+            raise exceptions.UserInactive
+        token_data = {
+            "sub": str(user.id),
+            "password_fgpt": await self.password_helper.hash_offloaded(
+                user.hashed_password,
+            ),
+            "aud": self.reset_password_token_audience,
+        }
+        token = generate_jwt(
+            token_data,
+            self.reset_password_token_secret,
+            self.reset_password_token_lifetime_seconds,
+        )
+        await self.on_after_forgot_password(user, token, request)
+
+    async def reset_password(
+        self,
+        token: str,
+        password: str,
+        request: Optional[Request] = None,
+    ) -> UserDBModel:
+        """
+        Reset a password, verifying the token off the event loop.
+
+        :param token: token from the forgot password request.
+        :param password: new password.
+        :param request: request which reset the password.
+        :raises InvalidResetPasswordToken: if the token is invalid or expired.
+        :raises UserInactive: if the user is inactive.
+        :returns: updated user.
+        """
+        try:
+            data = decode_jwt(
+                token,
+                self.reset_password_token_secret,
+                [self.reset_password_token_audience],
+            )
+            user_id = self.parse_id(data["sub"])
+            password_fingerprint = data["password_fgpt"]
+        except (jwt.PyJWTError, KeyError, exceptions.InvalidID):
+            raise exceptions.InvalidResetPasswordToken from None
+
+        user = await self.get(user_id)
+        valid, _ = await self.password_helper.verify_and_update_offloaded(
+            user.hashed_password,
+            password_fingerprint,
+        )
+        if not valid:
+            raise exceptions.InvalidResetPasswordToken
+        if not user.is_active:
+            raise exceptions.UserInactive
+
+        updated_user = await self._update(user, {"password": password})
+        await self.on_after_reset_password(user, request)
+        return updated_user
+
+    async def _update(
+        self,
+        user: UserDBModel,
+        update_dict: dict[str, Any],
+    ) -> UserDBModel:
+        """
+        Update a user, hashing a new password off the event loop.
+
+        Used by updates of the user and by password resets.
+
+        :param user: user to update.
+        :param update_dict: fields to update.
+        :returns: updated user.
+        """
+        update_dict = dict(update_dict)
+        password = update_dict.pop("password", None)
+        if password is not None:
+            await self.validate_password(password, user)
+            update_dict["hashed_password"] = await self.password_helper.hash_offloaded(
+                password,
+            )
+        return await super()._update(user, update_dict)
 
 
 async def get_user_db(
@@ -66,7 +235,7 @@ async def get_user_manager(
     :param user_db: SQLAlchemy user db instance
     :yields: an instance of UserManager.
     """
-    yield UserManager(user_db)
+    yield UserManager(user_db, password_helper)
 
 
 def get_jwt_strategy() -> JWTStrategy:
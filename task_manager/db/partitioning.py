@@ -0,0 +1,281 @@
+"""
+Hash-partition the task table by user, online.
+
+Opt-in for deployments with very large tenants. Creates a copy of the
+task table partitioned by hash of ``user_id``, so queries of a user,
+which all filter by it, scan only that user's partition. The service
+keeps running during the migration:
+
+1. ``task_partitioned`` and its partitions are created, and a trigger
+   on ``task`` applies every later write to the copy as well.
+2. Existing rows are copied in batches, in order of ids. Rows of a
+   batch are locked for share, so concurrent updates and deletes wait
+   for it and are then applied to the copied rows by the trigger.
+3. Both tables are renamed in one short transaction, the old table
+   is kept as ``task_unpartitioned`` until it is dropped by hand.
+
+The primary key of a partitioned table must contain the partition key,
+so it becomes ``(user_id, id)``. Interrupted runs can be restarted,
+rows copied already are skipped.
+
+Run with::
+
+    python -m task_manager.db.partitioning --partitions 16
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from task_manager.settings import settings
+
+MIRROR_FUNCTION = """
+CREATE OR REPLACE FUNCTION mirror_task_to_partitioned() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM task_partitioned
+        WHERE user_id = OLD.user_id AND id = OLD.id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO task_partitioned ({columns}) VALUES ({values});
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+async def task_columns(conn: AsyncConnection) -> list[str]:
+    """
+    Columns of the task table in their order.
+
+    :param conn: database connection.
+    :returns: names of columns.
+    """
+    result = await conn.execute(
+        text(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = 'task' "
+            "ORDER BY ordinal_position",
+        ),
+    )
+    return list(result.scalars())
+
+
+async def is_partitioned(conn: AsyncConnection) -> bool:
+    """
+    Whether the task table is partitioned.
+
+    :param conn: database connection.
+    :returns: true after the swap.
+    """
+    result = await conn.execute(
+        text(
+            "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('task')",
+        ),
+    )
+    return bool(result.scalar())
+
+
+async def prepare(conn: AsyncConnection, partitions: int) -> None:
+    """
+    Create the partitioned copy and start mirroring writes into it.
+
+    Does nothing if the copy exists already.
+
+    :param conn: database connection.
+    :param partitions: number of hash partitions.
+    """
+    if (await conn.execute(text("SELECT to_regclass('task_partitioned')"))).scalar():
+        return
+
+    columns = await task_columns(conn)
+    statements = [
+        "CREATE TABLE task_partitioned (LIKE task INCLUDING DEFAULTS) "
+        "PARTITION BY HASH (user_id)",
+        "ALTER TABLE task_partitioned "
+        "ADD CONSTRAINT task_partitioned_pkey PRIMARY KEY (user_id, id)",
+        "ALTER TABLE task_partitioned ADD CONSTRAINT task_partitioned_user_id_fkey "
+        'FOREIGN KEY (user_id) REFERENCES "user" (id)',
+        *(
+            f"CREATE TABLE task_p{remainder} PARTITION OF task_partitioned "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+            for remainder in range(partitions)
+        ),
+        "CREATE INDEX ix_task_partitioned_user_id_updated_at "
+        "ON task_partitioned (user_id, updated_at)",
+        "CREATE INDEX ix_task_partitioned_completed_updated_at "
+        "ON task_partitioned (updated_at) WHERE completed",
+        "CREATE TRIGGER task_set_updated_at BEFORE UPDATE ON task_partitioned "
+        "FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*) "
+        "EXECUTE FUNCTION set_updated_at()",
+        MIRROR_FUNCTION.format(
+            columns=", ".join(columns),
+            values=", ".join(f"NEW.{column}" for column in columns),
+        ),
+        "CREATE TRIGGER task_mirror_to_partitioned "
+        "AFTER INSERT OR UPDATE OR DELETE ON task "
+        "FOR EACH ROW EXECUTE FUNCTION mirror_task_to_partitioned()",
+    ]
+    for statement in statements:
+        await conn.execute(text(statement))
+
+
+async def last_task_id(conn: AsyncConnection) -> uuid.UUID | None:
+    """
+    Greatest id of the task table.
+
+    Rows inserted after writes are mirrored don't need to be copied,
+    the copy stops at the last id of the table at that time instead of
+    chasing new time-ordered ids.
+
+    :param conn: database connection.
+    :returns: last id, None if there are no tasks.
+    """
+    result = await conn.execute(text("SELECT id FROM task ORDER BY id DESC LIMIT 1"))
+    return result.scalar()
+
+
+async def copy_batch(
+    conn: AsyncConnection,
+    after: uuid.UUID,
+    until: uuid.UUID,
+    batch_size: int,
+) -> uuid.UUID | None:
+    """
+    Copy the next batch of rows into the partitioned table.
+
+    :param conn: database connection.
+    :param after: last id of the previous batch.
+    :param until: last id to copy.
+    :param batch_size: rows per batch.
+    :returns: last id of the batch, None when all rows are copied.
+    """
+    columns = ", ".join(await task_columns(conn))
+    result = await conn.execute(
+        text(
+            f"WITH batch AS ("  # noqa: S608
+            f"SELECT {columns} FROM task WHERE id > :after AND id <= :until "
+            "ORDER BY id LIMIT :batch_size FOR SHARE"
+            f"), copied AS ("
+            f"INSERT INTO task_partitioned ({columns}) SELECT {columns} FROM batch "
+            "ON CONFLICT (user_id, id) DO NOTHING"
+            ") SELECT id FROM batch ORDER BY id DESC LIMIT 1",
+        ),
+        {"after": after, "until": until, "batch_size": batch_size},
+    )
+    return result.scalar()
+
+
+async def swap(conn: AsyncConnection, lock_timeout: str = "5s") -> None:
+    """
+    Replace the task table with the partitioned copy.
+
+    Writes wait for the transaction, it fails instead of queuing
+    them for longer than the lock timeout.
+
+    :param conn: database connection.
+    :param lock_timeout: longest wait for the lock of the task table.
+    """
+    statements = [
+        f"SET LOCAL lock_timeout = '{lock_timeout}'",
+        "LOCK TABLE task IN ACCESS EXCLUSIVE MODE",
+        "DROP TRIGGER task_mirror_to_partitioned ON task",
+        "DROP FUNCTION mirror_task_to_partitioned()",
+        "ALTER TABLE task RENAME TO task_unpartitioned",
+        "ALTER INDEX task_pkey RENAME TO task_unpartitioned_pkey",
+        "ALTER INDEX ix_task_user_id_updated_at "
+        "RENAME TO ix_task_unpartitioned_user_id_updated_at",
+        "ALTER INDEX ix_task_completed_updated_at "
+        "RENAME TO ix_task_unpartitioned_completed_updated_at",
+        "ALTER TABLE task_partitioned RENAME TO task",
+        "ALTER INDEX task_partitioned_pkey RENAME TO task_pkey",
+        "ALTER INDEX ix_task_partitioned_user_id_updated_at "
+        "RENAME TO ix_task_user_id_updated_at",
+        "ALTER INDEX ix_task_partitioned_completed_updated_at "
+        "RENAME TO ix_task_completed_updated_at",
+        "ALTER TABLE task RENAME CONSTRAINT task_partitioned_user_id_fkey "
+        "TO task_user_id_fkey",
+    ]
+    for statement in statements:
+        await conn.execute(text(statement))
+
+
+async def migrate(
+    engine: AsyncEngine,
+    partitions: int,
+    batch_size: int,
+    pause: float,
+    swap_tables: bool = True,
+) -> int:
+    """
+    Run all steps of the migration, each batch in its own transaction.
+
+    :param engine: database engine.
+    :param partitions: number of hash partitions.
+    :param batch_size: rows per batch.
+    :param pause: seconds to sleep between batches, to leave room for the service.
+    :param swap_tables: whether to replace the task table after copying.
+    :returns: number of batches.
+    """
+    async with engine.begin() as conn:
+        if await is_partitioned(conn):
+            return 0
+        await prepare(conn, partitions)
+        until = await last_task_id(conn)
+
+    after = uuid.UUID(int=0) if until is not None else None
+    batches = 0
+    started = time.perf_counter()
+    while after is not None and until is not None:
+        async with engine.begin() as conn:
+            after = await copy_batch(conn, after, until, batch_size)
+        batches += 1
+        if batches % 100 == 0:
+            print(  # noqa: T201
+                f"{batches} batches in {time.perf_counter() - started:.0f}s",
+            )
+        await asyncio.sleep(pause)
+
+    if swap_tables:
+        async with engine.begin() as conn:
+            await swap(conn)
+    return batches
+
+
+def main() -> None:
+    """Partition the task table of the configured database."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--partitions", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--pause", type=float, default=0.05)
+    parser.add_argument(
+        "--no-swap",
+        action="store_true",
+        help="copy rows and keep mirroring writes, without replacing the table",
+    )
+    args = parser.parse_args()
+
+    async def run() -> int:
+        engine = create_async_engine(str(settings.db_url))
+        try:
+            return await migrate(
+                engine,
+                args.partitions,
+                args.batch_size,
+                args.pause,
+                swap_tables=not args.no_swap,
+            )
+        finally:
+            await engine.dispose()
+
+    batches = asyncio.run(run())
+    print(f"done, {batches} batches copied")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
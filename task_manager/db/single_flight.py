@@ -0,0 +1,84 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _LeaderCancelledError(Exception):
+    """The caller running a shared call was cancelled."""
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls.
+
+    While a call for a key is running, callers with the same key
+    await its result instead of starting another call. The result
+    isn't cached: once the call finishes the next caller runs it again.
+    If the caller running it is cancelled, callers which joined it
+    run the function again instead of being cancelled with it.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Future[Any]] = {}
+        self.executed_total = 0
+        self.coalesced_total = 0
+
+    @property
+    def in_flight(self) -> int:
+        """
+        Number of calls running right now.
+
+        :returns: number of running calls.
+        """
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run the function, or join an identical call that is already running.
+
+        :param key: key identifying identical calls.
+        :param func: function to call.
+        :returns: result of the function.
+        """
+        while (future := self._calls.get(key)) is not None:
+            self.coalesced_total += 1
+            try:
+                # Shield, so a cancelled follower doesn't cancel the shared call.
+                return await asyncio.shield(future)
+            except _LeaderCancelledError:
+                # Not coalesced after all, the call runs again.
+                self.coalesced_total -= 1
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.executed_total += 1
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            # Followers run the call again, the cancellation is only ours.
+            future.set_exception(_LeaderCancelledError())
+            future.exception()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark the exception as retrieved in case nobody joined the call.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def stats(self) -> dict[str, int]:
+        """
+        Counters of executed and coalesced calls.
+
+        :returns: statistics of the calls.
+        """
+        return {
+            "in_flight": self.in_flight,
+            "executed_total": self.executed_total,
+            "coalesced_total": self.coalesced_total,
+        }
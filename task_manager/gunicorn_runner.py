@@ -1,9 +1,19 @@
-from typing import Any
+import gc
+from typing import Any, Callable
 
+from fastapi import FastAPI
 from gunicorn.app.base import BaseApplication
 from gunicorn.util import import_app
 from uvicorn.workers import UvicornWorker as BaseUvicornWorker
 
+from task_manager.log import configure_logging
+from task_manager.services.metrics.recorder import (
+    merge_exited,
+    multiprocess_dir,
+    supervisor_metrics,
+)
+from task_manager.settings import settings
+
 try:
     import uvloop  # (Found nested import)
 except ImportError:
@@ -25,9 +35,77 @@ class UvicornWorker(BaseUvicornWorker):
         "lifespan": "on",
         "factory": True,
         "proxy_headers": False,
+        # In other modes requests are logged by the application.
+        "access_log": settings.uvicorn_access_log,
+        # Requests still running are cancelled, so the lifespan shutdown
+        # runs before gunicorn kills the worker after graceful_timeout.
+        "timeout_graceful_shutdown": settings.shutdown_timeout,
     }
 
 
+class PreloadedUvicornWorker(UvicornWorker):
+    """
+    Worker serving the app built by the master.
+
+    Objects of the app are shared with the master copy-on-write,
+    so the garbage collector, disabled by the master, is enabled
+    only after the fork, and logging is configured again, because
+    threads of the master don't exist in the forked worker.
+    """
+
+    CONFIG_KWARGS: dict[str, Any] = {  # noqa: RUF012
+        **UvicornWorker.CONFIG_KWARGS,
+        "factory": False,
+    }
+
+    def init_process(self) -> None:
+        """Prepare the forked worker and run it."""
+        gc.enable()
+        configure_logging()
+        super().init_process()
+
+
+def preload(factory: Callable[[], FastAPI]) -> FastAPI:
+    """
+    Build the app in the master before workers are forked.
+
+    The app doesn't open connections, they are opened in its lifespan
+    by every worker. Objects that exist before the fork are moved out of
+    reach of the garbage collector, so collections in workers don't write
+    to their memory pages and the pages stay shared with the master.
+
+    :param factory: factory of the app.
+    :returns: application.
+    """
+    gc.disable()
+    app = factory()
+    gc.freeze()
+    return app
+
+
+def child_exit(server: Any, worker: Any) -> None:
+    """
+    Count restarts of workers, called by the master.
+
+    Workers exit while the server is running because they reached
+    max_requests, crashed, or were killed after a timeout. Exits
+    during shutdown aren't counted, the master stops listening first.
+    Metrics of the worker are merged with those of other exited workers.
+
+    :param server: gunicorn arbiter.
+    :param worker: exited worker.
+    """
+    directory = multiprocess_dir()
+    if directory is not None:
+        merge_exited(directory, worker.pid)
+    if not server.LISTENERS:
+        return
+    reason = "timeout" if worker.aborted else "exit"
+    supervisor_metrics.increment("task_manager_worker_restarts", reason=reason)
+    if directory is not None:
+        supervisor_metrics.flush(directory)
+
+
 class GunicornApplication(BaseApplication):
     """
     Custom gunicorn application.
@@ -44,10 +122,14 @@ class GunicornApplication(BaseApplication):
         workers: int,
         **kwargs: Any,
     ) -> None:
+        worker_class = UvicornWorker
+        if kwargs.get("preload_app"):
+            worker_class = PreloadedUvicornWorker
         self.options = {
             "bind": f"{host}:{port}",
             "workers": workers,
-            "worker_class": "task_manager.gunicorn_runner.UvicornWorker",
+            "worker_class": f"{__name__}.{worker_class.__name__}",
+            "child_exit": child_exit,
             **kwargs,
         }
         self.app = app
@@ -66,14 +148,18 @@ class GunicornApplication(BaseApplication):
             if key in self.cfg.settings and value is not None:
                 self.cfg.set(key.lower(), value)
 
-    def load(self) -> str:
+    def load(self) -> Any:
         """
         Load actual application.
 
         Gunicorn loads application based on this
-        function's returns. We return python's path to
-        the app's factory.
+        function's returns. We return the app's factory,
+        so every worker builds the app. In preload mode
+        it's called by the master once, before workers are forked.
 
-        :returns: python path to app factory.
+        :returns: app factory, or the app in preload mode.
         """
-        return import_app(self.app)
+        factory = import_app(self.app)
+        if self.cfg.preload_app:
+            return preload(factory)
+        return factory
@@ -1,11 +1,20 @@
 import logging
+import queue
+import random
 import sys
-from typing import Any, Union
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Optional, TextIO, Union
 
+import ujson
 from loguru import logger
 from opentelemetry.trace import INVALID_SPAN, INVALID_SPAN_CONTEXT, get_current_span
 
-from task_manager.settings import settings
+from task_manager.settings import AccessLogMode, LogFormat, settings
+
+if TYPE_CHECKING:
+    from loguru import Message, Record
 
 
 class InterceptHandler(logging.Handler):
@@ -15,33 +24,120 @@ class InterceptHandler(logging.Handler):
     This handler intercepts all log requests and
     passes them to loguru.
 
+    Stdlib records already carry module, function and line
+    of the caller, so instead of walking frames to find the caller
+    the handler copies them into the loguru record. Level names
+    are resolved once per level.
+
     For more info see:
     https://loguru.readthedocs.io/en/stable/overview.html#entirely-compatible-with-standard-logging
     """
 
-    def emit(self, record: logging.LogRecord) -> None:  # pragma: no cover
+    def __init__(self, level: Union[int, str] = logging.NOTSET) -> None:
+        super().__init__(level)
+        self._levels: dict[str, Union[str, int]] = {}
+        self._record: Optional[logging.LogRecord] = None
+        self._logger = logger.patch(self._patch_caller)
+
+    def _patch_caller(self, record: "Record") -> None:
+        # emit is serialized by the handler lock, so _record is the one emitted.
+        caller = self._record
+        if caller is not None:
+            record["name"] = caller.name
+            record["module"] = caller.module
+            record["function"] = caller.funcName
+            record["line"] = caller.lineno
+
+    def emit(self, record: logging.LogRecord) -> None:
         """
         Propagates logs to loguru.
 
         :param record: record to log.
         """
+        level = self._levels.get(record.levelname)
+        if level is None:
+            try:
+                level = logger.level(record.levelname).name
+            except ValueError:
+                level = record.levelno
+            self._levels[record.levelname] = level
+
+        self._record = record
         try:
-            level: Union[str, int] = logger.level(record.levelname).name
-        except ValueError:
-            level = record.levelno
-
-        # Find caller from where originated the logged message
-        frame, depth = logging.currentframe(), 2
-        while frame.f_code.co_filename == logging.__file__:
-            frame = frame.f_back  # type: ignore
-            depth += 1
-
-        logger.opt(depth=depth, exception=record.exc_info).log(
-            level,
-            record.getMessage(),
+            if record.exc_info:
+                self._logger.opt(exception=record.exc_info).log(
+                    level,
+                    record.getMessage(),
+                )
+            else:
+                self._logger.log(level, record.getMessage())
+        finally:
+            self._record = None
+
+
+class AccessLogHandler(logging.Handler):
+    """
+    Writes uvicorn access logs straight to the output.
+
+    Access records skip loguru, so no loguru record is built
+    and no format string is rendered for them. In the JSON mode
+    they are put into the queue of :class:`QueueSink`,
+    otherwise they are written to the stream as plain text.
+    """
+
+    def __init__(self, sink: Optional["QueueSink"], stream: TextIO) -> None:
+        super().__init__()
+        self.sink = sink
+        self.stream = stream
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """
+        Writes the access log.
+
+        :param record: record to log.
+        """
+        trace_id, span_id = trace_context()
+        if self.sink is not None:
+            self.sink.put(
+                (
+                    datetime.fromtimestamp(record.created).astimezone(),
+                    record.levelname,
+                    record.getMessage(),
+                    record.name,
+                    record.funcName,
+                    record.lineno,
+                    trace_id,
+                    span_id,
+                    None,
+                    None,
+                ),
+            )
+            return
+        created = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record.created))
+        self.stream.write(
+            f"{created}.{int(record.msecs):03d} | {record.levelname: <8} "
+            f"| trace_id={trace_id} | span_id={span_id} "
+            f"| {record.name} - {record.getMessage()}\n",
         )
 
 
+class SamplingFilter(logging.Filter):
+    """Passes a random fraction of records."""
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        Decides whether the record is sampled.
+
+        :param record: record to check.
+        :return: whether the record should be logged.
+        """
+        return random.random() < self.rate  # noqa: S311
+
+
 def record_formatter(record: dict[str, Any]) -> str:  # pragma: no cover
     """
     Formats the record.
@@ -61,19 +157,181 @@ def record_formatter(record: dict[str, Any]) -> str:  # pragma: no cover
         "- <level>{message}</level>\n"
     )
 
+    record["extra"]["trace_id"], record["extra"]["span_id"] = trace_context()
+
+    if record["exception"]:
+        log_format = f"{log_format}{{exception}}"
+
+    return log_format
+
+
+def trace_context() -> tuple[Union[str, int], Union[str, int]]:
+    """
+    Ids of the current trace and span.
+
+    :return: trace and span ids, or zeros if there's no current span.
+    """
     span = get_current_span()
-    record["extra"]["span_id"] = 0
-    record["extra"]["trace_id"] = 0
     if span != INVALID_SPAN:
         span_context = span.get_span_context()
         if span_context != INVALID_SPAN_CONTEXT:
-            record["extra"]["span_id"] = format(span_context.span_id, "016x")
-            record["extra"]["trace_id"] = format(span_context.trace_id, "032x")
+            return (
+                format(span_context.trace_id, "032x"),
+                format(span_context.span_id, "016x"),
+            )
+    return 0, 0
 
-    if record["exception"]:
-        log_format = f"{log_format}{{exception}}"
 
-    return log_format
+def exception_formatter(record: dict[str, Any]) -> str:
+    """
+    Formats only the exception of the record.
+
+    :class:`QueueSink` serializes the rest of the record itself.
+
+    :param record: record information.
+    :return: format string.
+    """
+    return "{exception}"
+
+
+class QueueSink:
+    """
+    Loguru sink writing JSON lines from a background thread.
+
+    Logging call only captures fields of the record and puts them
+    into a bounded queue, so a slow stdout never blocks the event loop.
+    Records that don't fit into the queue are dropped and counted,
+    the writer reports the number of dropped records in the output.
+
+    Use it with :func:`exception_formatter`, so loguru formats only
+    tracebacks and nothing is colorized.
+    """
+
+    def __init__(self, stream: TextIO, maxsize: int, batch_size: int = 512) -> None:
+        self.stream = stream
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.written = 0
+        self.dropped = 0
+        self._reported_dropped = 0
+        # SimpleQueue is implemented in C and doesn't take a python lock.
+        self._queue: "queue.SimpleQueue[Optional[tuple[Any, ...]]]" = (
+            queue.SimpleQueue()
+        )
+        self._thread = threading.Thread(
+            target=self._run,
+            name="log-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def write(self, message: "Message") -> None:
+        """
+        Enqueue the record, or drop it if the queue is full.
+
+        :param message: formatted exception with the record attached.
+        """
+        record = message.record
+        trace_id, span_id = trace_context()
+        self.put(
+            (
+                record["time"],
+                record["level"].name,
+                record["message"],
+                record["name"],
+                record["function"],
+                record["line"],
+                trace_id,
+                span_id,
+                record["extra"],
+                str(message),
+            ),
+        )
+
+    def put(self, item: tuple[Any, ...]) -> None:
+        """
+        Enqueue captured fields of a record, or drop them if the queue is full.
+
+        :param item: fields of the record, see :func:`serialize_record`.
+        """
+        if self._queue.qsize() >= self.maxsize:
+            self.dropped += 1
+            return
+        self._queue.put(item)
+
+    def stop(self) -> None:
+        """Write enqueued records and stop the writer."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = [serialize_record(item) for item in batch if item is not None]
+            dropped = self.dropped
+            if dropped != self._reported_dropped:
+                lines.append(_dropped_notice(dropped - self._reported_dropped))
+                self._reported_dropped = dropped
+            self.stream.write("".join(lines))
+            self.stream.flush()
+            self.written += len(lines)
+            if batch[-1] is None:
+                return
+
+
+def serialize_record(item: tuple[Any, ...]) -> str:
+    """
+    Serializes captured record as a JSON line.
+
+    :param item: fields captured by :class:`QueueSink`.
+    :return: JSON line.
+    """
+    (
+        created,
+        level,
+        message,
+        name,
+        function,
+        line,
+        trace_id,
+        span_id,
+        extra,
+        exception,
+    ) = item
+    entry = {
+        "time": created.isoformat(),
+        "level": level,
+        "message": message,
+        "logger": name,
+        "function": function,
+        "line": line,
+        "trace_id": trace_id,
+        "span_id": span_id,
+    }
+    if extra:
+        entry["extra"] = extra
+    if exception:
+        entry["exception"] = exception
+    return ujson.dumps(entry, ensure_ascii=False, default=str) + "\n"
+
+
+def _dropped_notice(count: int) -> str:
+    return (
+        ujson.dumps(
+            {
+                "level": "WARNING",
+                "message": f"{count} log records were dropped, the queue is full.",
+                "logger": __name__,
+                "dropped": count,
+            },
+        )
+        + "\n"
+    )
 
 
 def configure_logging() -> None:  # pragma: no cover
@@ -86,14 +344,39 @@ def configure_logging() -> None:  # pragma: no cover
         if logger_name.startswith("uvicorn."):
             logging.getLogger(logger_name).handlers = []
 
-    # change handler for default uvicorn logger
-    logging.getLogger("uvicorn").handlers = [intercept_handler]
-    logging.getLogger("uvicorn.access").handlers = [intercept_handler]
-
     # set logs output, level and format
     logger.remove()
-    logger.add(
-        sys.stdout,
-        level=settings.log_level.value,
-        format=record_formatter,  # type: ignore
-    )
+    sink = None
+    if settings.log_format == LogFormat.JSON:
+        sink = QueueSink(sys.stdout, settings.log_queue_size)
+        logger.add(
+            sink,
+            level=settings.log_level.value,
+            format=exception_formatter,  # type: ignore
+            colorize=False,
+            diagnose=False,
+        )
+    else:
+        logger.add(
+            sys.stdout,
+            level=settings.log_level.value,
+            format=record_formatter,  # type: ignore
+        )
+
+    # change handler for default uvicorn logger
+    uvicorn_logger = logging.getLogger("uvicorn")
+    uvicorn_logger.handlers = [intercept_handler]
+    uvicorn_logger.propagate = False
+    # Gunicorn workers stop it from propagating, its records would be lost.
+    logging.getLogger("uvicorn.error").propagate = True
+    access_logger = logging.getLogger("uvicorn.access")
+    access_logger.handlers = [intercept_handler]
+    if settings.access_log_direct:
+        access_logger.handlers = [AccessLogHandler(sink, sys.stdout)]
+    if not settings.uvicorn_access_log:
+        # Uvicorn skips access logs if the logger has no handlers.
+        access_logger.handlers = []
+        access_logger.propagate = False
+    access_logger.filters = []
+    if settings.access_log_mode == AccessLogMode.SAMPLED:
+        access_logger.addFilter(SamplingFilter(settings.access_log_sample_rate))
@@ -0,0 +1 @@
+"""Access log service."""
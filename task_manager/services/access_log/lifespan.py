@@ -0,0 +1,40 @@
+import asyncio
+import contextlib
+
+from fastapi import FastAPI
+
+from task_manager.services.access_log.recorder import AggregatedAccessLog
+from task_manager.settings import settings
+
+
+async def _flush_periodically(access_log: AggregatedAccessLog) -> None:
+    while True:
+        await asyncio.sleep(settings.access_log_aggregate_interval)
+        access_log.flush()
+
+
+def init_access_log(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Start flushing per-route aggregates in the aggregate mode.
+
+    :param app: current application.
+    """
+    app.state.access_log_task = None
+    if isinstance(app.state.access_log, AggregatedAccessLog):
+        app.state.access_log_task = asyncio.create_task(
+            _flush_periodically(app.state.access_log),
+        )
+
+
+async def shutdown_access_log(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Stop flushing and write the remaining records.
+
+    :param app: current application.
+    """
+    if app.state.access_log_task is not None:
+        app.state.access_log_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await app.state.access_log_task
+    if app.state.access_log is not None:
+        app.state.access_log.flush()
@@ -0,0 +1,118 @@
+import math
+from typing import Optional
+
+from loguru import logger
+from starlette.types import Scope
+
+from task_manager.settings import AccessLogMode, settings
+
+
+class AccessLog:
+    """Access log fed by :class:`AccessLogMiddleware`."""
+
+    def record(self, scope: Scope, status_code: int, duration: float) -> None:
+        """
+        Record a finished request.
+
+        :param scope: ASGI scope of the request.
+        :param status_code: response status code.
+        :param duration: request duration in seconds.
+        """
+
+    def flush(self) -> None:
+        """Write buffered records."""
+
+
+class ErrorsAccessLog(AccessLog):
+    """Logs only requests that failed with a server error or were slow."""
+
+    def __init__(self, slow_threshold: float) -> None:
+        self.slow_threshold = slow_threshold
+
+    def record(self, scope: Scope, status_code: int, duration: float) -> None:
+        """
+        Log the request if it failed or was slow.
+
+        :param scope: ASGI scope of the request.
+        :param status_code: response status code.
+        :param duration: request duration in seconds.
+        """
+        if status_code < 500 and duration < self.slow_threshold:
+            return
+        client = scope.get("client")
+        logger.log(
+            "ERROR" if status_code >= 500 else "WARNING",
+            '{client} - "{method} {path}" {status_code} {duration_ms:.1f}ms',
+            client=f"{client[0]}:{client[1]}" if client else "-",
+            method=scope["method"],
+            path=scope["path"],
+            status_code=status_code,
+            duration_ms=duration * 1000,
+        )
+
+
+def _percentile(values: list[float], quantile: float) -> float:
+    # Nearest-rank percentile of sorted values.
+    return values[max(math.ceil(quantile * len(values)) - 1, 0)]
+
+
+class AggregatedAccessLog(AccessLog):
+    """
+    Logs per-route aggregates instead of single requests.
+
+    Durations are buffered in memory and every flush logs
+    a line per route with count, errors, p50 and p99.
+    """
+
+    def __init__(self) -> None:
+        self._durations: dict[tuple[str, str], list[float]] = {}
+        self._errors: dict[tuple[str, str], int] = {}
+
+    def record(self, scope: Scope, status_code: int, duration: float) -> None:
+        """
+        Add the request to aggregates of its route.
+
+        :param scope: ASGI scope of the request.
+        :param status_code: response status code.
+        :param duration: request duration in seconds.
+        """
+        route = scope.get("route")
+        key = (scope["method"], route.path if route is not None else "untemplated")
+        durations = self._durations.get(key)
+        if durations is None:
+            durations = self._durations[key] = []
+        durations.append(duration)
+        if status_code >= 500:
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+    def flush(self) -> None:
+        """Log aggregates of every route and start new ones."""
+        durations, self._durations = self._durations, {}
+        errors, self._errors = self._errors, {}
+        for (method, route), values in durations.items():
+            values.sort()
+            logger.info(
+                "{method} {route} count={count} errors={errors} "
+                "p50={p50_ms:.1f}ms p99={p99_ms:.1f}ms",
+                method=method,
+                route=route,
+                count=len(values),
+                errors=errors.get((method, route), 0),
+                p50_ms=_percentile(values, 0.5) * 1000,
+                p99_ms=_percentile(values, 0.99) * 1000,
+            )
+
+
+def build_access_log(mode: AccessLogMode) -> Optional[AccessLog]:
+    """
+    Create access log of the application.
+
+    :param mode: access log mode.
+    :returns: access log, or None if requests are logged by uvicorn
+        or not logged at all.
+    """
+    if mode == AccessLogMode.ERRORS:
+        return ErrorsAccessLog(settings.access_log_slow_threshold)
+    if mode == AccessLogMode.AGGREGATE:
+        return AggregatedAccessLog()
+    return None
@@ -0,0 +1 @@
+"""Archival of completed tasks."""
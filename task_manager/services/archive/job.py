@@ -0,0 +1,98 @@
+import asyncio
+import datetime
+import time
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.pool import Pool, QueuePool
+
+from task_manager.db.dao.task_dao import TaskDAO
+from task_manager.services.drain.coordinator import ShutdownCoordinator
+from task_manager.services.metrics.recorder import RequestMetrics, request_metrics
+
+
+def pool_is_busy(pool: Pool) -> bool:
+    """
+    Whether requests use every connection of the pool.
+
+    :param pool: pool of the database engine.
+    :returns: true if the job would take a connection requests may need.
+    """
+    return isinstance(pool, QueuePool) and pool.checkedout() >= pool.size()
+
+
+class ArchiveJob:
+    """
+    Moves completed tasks into the archive, throttled.
+
+    Tasks are moved in batches, each in its own short transaction.
+    After a batch the job sleeps long enough to spend at most
+    the duty cycle moving tasks, and it doesn't start a batch while
+    requests use every connection of the pool.
+    Batches run through the shutdown coordinator, so a worker shutting
+    down waits for the batch in progress and doesn't start another.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        older_than: datetime.timedelta,
+        batch_size: int,
+        duty_cycle: float,
+        is_busy: Callable[[], bool] = lambda: False,
+        busy_pause: float = 1.0,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        metrics: RequestMetrics = request_metrics,
+        coordinator: Optional[ShutdownCoordinator] = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.older_than = older_than
+        self.batch_size = batch_size
+        self.duty_cycle = duty_cycle
+        self.is_busy = is_busy
+        self.busy_pause = busy_pause
+        self.sleep = sleep
+        self.metrics = metrics
+        self.coordinator = coordinator
+
+    @property
+    def stopping(self) -> bool:
+        """
+        Whether the worker is shutting down.
+
+        :returns: true if no batch may start.
+        """
+        return self.coordinator is not None and self.coordinator.draining
+
+    async def _move_batch(self) -> int:
+        async with self.session_factory() as session:
+            return await TaskDAO(session).archive_tasks(
+                self.older_than,
+                self.batch_size,
+            )
+
+    async def run(self) -> int:
+        """
+        Move tasks until none is due.
+
+        :returns: number of moved tasks.
+        """
+        total = 0
+        while not self.stopping:
+            while self.is_busy():
+                await self.sleep(self.busy_pause)
+            if self.stopping:
+                break
+            started = time.perf_counter()
+            if self.coordinator is None:
+                moved = await self._move_batch()
+            else:
+                moved = await self.coordinator.spawn(self._move_batch())
+            elapsed = time.perf_counter() - started
+            if moved:
+                total += moved
+                self.metrics.increment("task_manager_tasks_archived", moved)
+            if moved < self.batch_size:
+                break
+            await self.sleep(elapsed * (1 - self.duty_cycle) / self.duty_cycle)
+        return total
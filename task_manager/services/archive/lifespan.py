@@ -0,0 +1,51 @@
+import asyncio
+import contextlib
+import datetime
+
+from fastapi import FastAPI
+from loguru import logger
+
+from task_manager.services.archive.job import ArchiveJob, pool_is_busy
+from task_manager.settings import settings
+
+
+async def _archive_periodically(job: ArchiveJob) -> None:
+    while True:
+        await asyncio.sleep(settings.archive_interval)
+        try:
+            moved = await job.run()
+        except Exception:
+            logger.exception("Archival of completed tasks failed.")
+        else:
+            logger.info("Moved {} completed tasks into the archive.", moved)
+
+
+def init_archive(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Start archiving completed tasks of the worker.
+
+    :param app: current application.
+    """
+    app.state.archive_task = None
+    if settings.archive_after_days > 0:
+        job = ArchiveJob(
+            app.state.db_session_factory,
+            older_than=datetime.timedelta(days=settings.archive_after_days),
+            batch_size=settings.archive_batch_size,
+            duty_cycle=settings.archive_duty_cycle,
+            is_busy=lambda: pool_is_busy(app.state.db_engine.pool),
+            coordinator=app.state.shutdown,
+        )
+        app.state.archive_task = asyncio.create_task(_archive_periodically(job))
+
+
+async def shutdown_archive(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Stop archiving, the batch in progress was waited for by draining.
+
+    :param app: current application.
+    """
+    if app.state.archive_task is not None:
+        app.state.archive_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await app.state.archive_task
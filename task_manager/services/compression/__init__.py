@@ -0,0 +1 @@
+"""Response compression service."""
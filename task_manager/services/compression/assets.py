@@ -0,0 +1,224 @@
+import gzip
+import hashlib
+import mimetypes
+import stat
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# Codings in the order they are preferred when a client accepts several.
+PREFERRED_CODINGS = ("br", "gzip")
+# Levels for bodies compressed once, which are served many times.
+MAX_LEVELS = {"gzip": 9, "br": 11}
+# Suffixes of static files compressed at build time.
+SIBLING_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+
+
+def available_codings() -> tuple[str, ...]:
+    """
+    Codings this installation can compress with.
+
+    :returns: names of codings, brotli only if it's installed.
+    """
+    return tuple(
+        coding for coding in PREFERRED_CODINGS if coding != "br" or brotli is not None
+    )
+
+
+def compress(body: bytes, coding: str, level: int) -> bytes:
+    """
+    Compress a body.
+
+    :param body: body to compress.
+    :param coding: ``gzip`` or ``br``.
+    :param level: gzip level from 1 to 9 or brotli quality from 0 to 11.
+    :returns: compressed body.
+    """
+    if coding == "br":
+        return brotli.compress(body, quality=level)
+    # No timestamp, so the same body always compresses to the same bytes.
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def choose_coding(accept_encoding: str, available: Iterable[str]) -> str:
+    """
+    Choose a coding the client accepts.
+
+    :param accept_encoding: value of the Accept-Encoding header.
+    :param available: codings the response is available in.
+    :returns: preferred coding, ``identity`` if none is accepted.
+    """
+    weights: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        weight = 1.0
+        name, _, value = params.strip().partition("=")
+        if name == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip()] = weight
+
+    chosen, best = "identity", 0.0
+    for coding in PREFERRED_CODINGS:
+        if coding not in available:
+            continue
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best:
+            chosen, best = coding, weight
+    return chosen
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Check If-None-Match against an ETag.
+
+    :param if_none_match: value of the If-None-Match header.
+    :param etag: current ETag of the response.
+    :returns: whether the client already has the response.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(",")
+    )
+
+
+class CompressedAsset:
+    """
+    Response body compressed once and served from memory.
+
+    Every coding has its own strong ETag, as its bytes differ,
+    and clients revalidating with a matching ETag get 304 without
+    a body. Codings which don't make the body smaller are dropped.
+    """
+
+    __slots__ = ("bodies", "cache_control", "etags", "media_type")
+
+    def __init__(
+        self,
+        body: bytes,
+        media_type: str,
+        cache_control: str = "no-cache",
+        compressed: Optional[dict[str, bytes]] = None,
+    ) -> None:
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.bodies = {"identity": body}
+        # Codings compressed in advance are used as they are.
+        compressed = dict(compressed or {})
+        for coding in available_codings():
+            if coding not in compressed:
+                compressed[coding] = compress(body, coding, MAX_LEVELS[coding])
+        for coding, data in compressed.items():
+            if len(data) < len(body):
+                self.bodies[coding] = data
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.etags = {
+            coding: f'"{digest}"' if coding == "identity" else f'"{digest}-{coding}"'
+            for coding in self.bodies
+        }
+
+    def response(self, request_headers: Headers) -> Response:
+        """
+        Response in the coding the client prefers.
+
+        :param request_headers: headers of the request.
+        :returns: response with the body, or 304 if the client has it.
+        """
+        coding = choose_coding(
+            request_headers.get("accept-encoding", ""),
+            self.bodies,
+        )
+        headers = {
+            "ETag": self.etags[coding],
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        if etag_matches(request_headers.get("if-none-match", ""), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        return Response(
+            self.bodies[coding],
+            media_type=self.media_type,
+            headers=headers,
+        )
+
+
+class CompressedStaticFiles(StaticFiles):
+    """
+    Static files compressed once and then served from memory.
+
+    Files are compressed on first use, unless ``.gz`` or ``.br``
+    siblings were generated at build time, see ``build.py``.
+    Siblings aren't served on their own. Files are expected
+    not to change while the app is running. Directories
+    and missing files are handled by ``StaticFiles``.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.assets: dict[str, CompressedAsset] = {}
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        """
+        Response with the file at the path.
+
+        :param path: path of the file, relative to the directory.
+        :param scope: ASGI scope.
+        :raises HTTPException: if the method isn't GET or HEAD.
+        :returns: response with the file.
+        """
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+        if path.endswith(tuple(SIBLING_SUFFIXES.values())):
+            raise HTTPException(status_code=404)
+        full_path, stat_result = await anyio.to_thread.run_sync(
+            self.lookup_path,
+            path,
+        )
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+            return await super().get_response(path, scope)
+
+        asset = self.assets.get(full_path)
+        if asset is None:
+            # Compressing a large bundle takes a while, keep it off the loop.
+            asset = await anyio.to_thread.run_sync(self.load, full_path)
+            self.assets[full_path] = asset
+        return asset.response(Headers(scope=scope))
+
+    def load(self, full_path: str) -> CompressedAsset:
+        """
+        Read a file and its siblings, compress it if there are none.
+
+        :param full_path: absolute path of the file.
+        :returns: compressed file.
+        """
+        path = Path(full_path)
+        media_type, _ = mimetypes.guess_type(path.name)
+        body = path.read_bytes()
+        modified = path.stat().st_mtime
+        compressed = {}
+        for coding, suffix in SIBLING_SUFFIXES.items():
+            sibling = path.with_name(path.name + suffix)
+            # Siblings older than the file are left from a previous build.
+            if sibling.is_file() and sibling.stat().st_mtime >= modified:
+                compressed[coding] = sibling.read_bytes()
+        return CompressedAsset(
+            body,
+            media_type or "application/octet-stream",
+            compressed=compressed,
+        )
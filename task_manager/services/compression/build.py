@@ -0,0 +1,61 @@
+"""
+Compress static files at build time.
+
+Writes ``.gz`` and, if brotli is installed, ``.br`` siblings next to
+every static file at the highest levels. The app serves them instead
+of compressing files when they are first requested.
+
+Run with::
+
+    python -m task_manager.services.compression.build
+"""
+
+import argparse
+from pathlib import Path
+
+from task_manager.services.compression.assets import (
+    MAX_LEVELS,
+    SIBLING_SUFFIXES,
+    available_codings,
+    compress,
+)
+
+STATIC_DIR = Path(__file__).parent.parent.parent / "static"
+
+
+def build(directory: Path) -> list[Path]:
+    """
+    Write compressed siblings of files in a directory.
+
+    Siblings which wouldn't be smaller than the file aren't written.
+
+    :param directory: directory with static files.
+    :returns: paths of written siblings.
+    """
+    suffixes = tuple(SIBLING_SUFFIXES.values())
+    written = []
+    for path in sorted(directory.rglob("*")):
+        if not path.is_file() or path.name.endswith(suffixes):
+            continue
+        body = path.read_bytes()
+        for coding in available_codings():
+            data = compress(body, coding, MAX_LEVELS[coding])
+            if len(data) < len(body):
+                sibling = path.with_name(path.name + SIBLING_SUFFIXES[coding])
+                sibling.write_bytes(data)
+                written.append(sibling)
+    return written
+
+
+def main() -> None:
+    """Compress static files of the app."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--directory", type=Path, default=STATIC_DIR)
+    args = parser.parse_args()
+
+    for sibling in build(args.directory):
+        print(f"{sibling}: {sibling.stat().st_size / 1024:.1f}KB")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
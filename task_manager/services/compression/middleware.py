@@ -0,0 +1,222 @@
+import time
+import zlib
+from typing import Any, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from task_manager.services.compression.assets import (
+    available_codings,
+    brotli,
+    choose_coding,
+)
+
+# Content types worth compressing, event streams are sent as they are.
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "+json",
+    "+xml",
+)
+
+# Levels used while the worker is busy.
+FAST_LEVELS = {"gzip": 1, "br": 1}
+
+
+def is_compressible(content_type: str) -> bool:
+    """
+    Check whether responses of a content type are worth compressing.
+
+    :param content_type: value of the Content-Type header.
+    :returns: whether to compress the response.
+    """
+    if content_type.startswith("text/event-stream"):
+        return False
+    return any(part in content_type for part in COMPRESSIBLE_TYPES)
+
+
+class CpuMonitor:
+    """Share of a CPU used by the worker process, resampled every interval."""
+
+    def __init__(self, interval: float = 1.0) -> None:
+        self.interval = interval
+        self.usage = 0.0
+        self._wall = time.monotonic()
+        self._cpu = time.process_time()
+
+    def sample(self) -> float:
+        """
+        Recent CPU usage of the worker.
+
+        :returns: CPU seconds per second over the last interval.
+        """
+        now = time.monotonic()
+        if now - self._wall >= self.interval:
+            cpu = time.process_time()
+            self.usage = (cpu - self._cpu) / (now - self._wall)
+            self._wall, self._cpu = now, cpu
+        return self.usage
+
+
+class _Compressor:
+    """Incremental gzip or brotli compressor."""
+
+    __slots__ = ("coding", "compressor")
+
+    def __init__(self, coding: str, level: int) -> None:
+        self.coding = coding
+        self.compressor: Any
+        if coding == "br":
+            self.compressor = brotli.Compressor(quality=level)
+        else:
+            self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.coding == "br":
+            return self.compressor.process(data)
+        return self.compressor.compress(data)
+
+    def finish(self) -> bytes:
+        if self.coding == "br":
+            return self.compressor.finish()
+        return self.compressor.flush()
+
+
+class _CompressingSend:
+    """Send callable compressing a single response."""
+
+    def __init__(self, send: Send, coding: str, level: int, minimum_size: int) -> None:
+        self.send = send
+        self.coding = coding
+        self.level = level
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if self.passthrough:
+            await self.send(message)
+        elif message["type"] == "http.response.start":
+            # Held back until the first body tells whether to compress.
+            self.start = message
+        elif message["type"] != "http.response.body" or self.start is None:
+            await self.send(message)
+        elif self.compressor is None:
+            await self.send_first(message)
+        else:
+            await self.send_body(message)
+
+    async def send_first(self, message: Message) -> None:
+        start = self.start
+        assert start is not None  # noqa: S101
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(raw=start["headers"])
+        if (
+            "content-encoding" in headers
+            or not is_compressible(headers.get("content-type", ""))
+            or (not more_body and len(body) < self.minimum_size)
+        ):
+            self.passthrough = True
+            await self.send(start)
+            await self.send(message)
+            return
+
+        self.compressor = _Compressor(self.coding, self.level)
+        start["headers"] = headers.raw
+        headers["Content-Encoding"] = self.coding
+        headers.add_vary_header("Accept-Encoding")
+        # Bytes differ from the uncompressed response.
+        etag = headers.get("etag")
+        if etag is not None and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        if more_body:
+            del headers["content-length"]
+            await self.send(start)
+            await self.send_body(message)
+            return
+
+        body = self.compressor.compress(body) + self.compressor.finish()
+        headers["Content-Length"] = str(len(body))
+        await self.send(start)
+        await self.send({"type": "http.response.body", "body": body})
+
+    async def send_body(self, message: Message) -> None:
+        assert self.compressor is not None  # noqa: S101
+        more_body = message.get("more_body", False)
+        data = self.compressor.compress(message.get("body", b""))
+        if not more_body:
+            data += self.compressor.finish()
+        if data or not more_body:
+            await self.send(
+                {"type": "http.response.body", "body": data, "more_body": more_body},
+            )
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with gzip or brotli.
+
+    Responses smaller than ``minimum_size`` aren't worth the CPU and
+    are sent as they are, as are responses which are already encoded,
+    like precompressed static files. While the worker uses more than
+    ``busy_cpu`` of a CPU, the fastest levels are used, trading size
+    for CPU time of other requests.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int,
+        gzip_level: int,
+        brotli_quality: int,
+        busy_cpu: float,
+        monitor: Optional[CpuMonitor] = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": gzip_level, "br": brotli_quality}
+        self.busy_cpu = busy_cpu
+        self.monitor = monitor or CpuMonitor()
+        self.codings = available_codings()
+
+    def level(self, coding: str) -> int:
+        """
+        Compression level for a response.
+
+        :param coding: ``gzip`` or ``br``.
+        :returns: configured level, or the fastest one while busy.
+        """
+        if self.busy_cpu and self.monitor.sample() >= self.busy_cpu:
+            return FAST_LEVELS[coding]
+        return self.levels[coding]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Compress the response if the client accepts it.
+
+        :param scope: ASGI scope.
+        :param receive: ASGI receive callable.
+        :param send: ASGI send callable.
+        """
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        coding = choose_coding(
+            Headers(scope=scope).get("accept-encoding", ""),
+            self.codings,
+        )
+        if coding == "identity":
+            await self.app(scope, receive, send)
+            return
+
+        send_compressed = _CompressingSend(
+            send,
+            coding,
+            self.level(coding),
+            self.minimum_size,
+        )
+        await self.app(scope, receive, send_compressed)
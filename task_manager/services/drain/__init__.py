@@ -0,0 +1 @@
+"""Graceful shutdown of workers."""
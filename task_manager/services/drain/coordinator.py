@@ -0,0 +1,115 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Coroutine, Optional, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+
+@dataclass
+class DrainResult:
+    """Work finished and aborted while a worker was shutting down."""
+
+    requests_drained: int
+    requests_aborted: int
+    requests_rejected: int
+    tasks_drained: int
+    tasks_aborted: int
+    seconds: float
+
+
+class ShutdownCoordinator:
+    """
+    Tracks work of a worker, so shutdown can wait for it.
+
+    Once draining starts, new requests are rejected, while requests
+    in flight and background tasks are waited for until the deadline.
+    Requests are cancelled by the server at the same deadline,
+    background tasks that are still running are cancelled by ``drain``.
+    """
+
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        self.draining = False
+        self.drain_started: Optional[float] = None
+        self.in_flight = 0
+        self.requests_drained = 0
+        self.requests_aborted = 0
+        self.requests_rejected = 0
+        self.tasks_drained = 0
+        self.tasks_aborted = 0
+        self._tasks: set["asyncio.Task[Any]"] = set()
+
+    @property
+    def pending_tasks(self) -> int:
+        """
+        Number of background tasks running right now.
+
+        :returns: number of running tasks.
+        """
+        return len(self._tasks)
+
+    def begin_drain(self) -> None:
+        """Stop accepting requests and start the deadline."""
+        if not self.draining:
+            self.draining = True
+            self.drain_started = time.monotonic()
+
+    def spawn(self, coro: Coroutine[Any, Any, T]) -> "asyncio.Task[T]":
+        """
+        Run work in background, shutdown waits for it.
+
+        Requests in flight may still spawn tasks while the worker drains,
+        they are part of the work being finished.
+
+        :param coro: work to run.
+        :returns: task running the work.
+        """
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: "asyncio.Task[Any]") -> None:
+        self._tasks.discard(task)
+        if task.cancelled():
+            if self.draining:
+                self.tasks_aborted += 1
+            return
+        exception = task.exception()
+        if exception is not None:
+            logger.opt(exception=exception).error("Background task failed.")
+        if self.draining:
+            self.tasks_drained += 1
+
+    async def drain(self, poll_interval: float = 0.05) -> DrainResult:
+        """
+        Wait for requests in flight and background tasks.
+
+        Tasks still running at the deadline are cancelled,
+        requests still in flight are counted as aborted.
+
+        :param poll_interval: seconds between checks for remaining work.
+        :returns: counts of finished and aborted work.
+        """
+        self.begin_drain()
+        started = self.drain_started or time.monotonic()
+        deadline = started + self.timeout
+        while (self.in_flight or self._tasks) and time.monotonic() < deadline:
+            await asyncio.sleep(poll_interval)
+
+        remaining = list(self._tasks)
+        for task in remaining:
+            task.cancel()
+        await asyncio.gather(*remaining, return_exceptions=True)
+
+        return DrainResult(
+            requests_drained=self.requests_drained,
+            requests_aborted=self.requests_aborted + self.in_flight,
+            requests_rejected=self.requests_rejected,
+            tasks_drained=self.tasks_drained,
+            tasks_aborted=self.tasks_aborted,
+            seconds=time.monotonic() - started,
+        )
@@ -0,0 +1,105 @@
+import signal
+import threading
+from typing import Any, Callable, Union
+
+from fastapi import FastAPI
+from loguru import logger
+
+from task_manager.services.drain.coordinator import DrainResult, ShutdownCoordinator
+from task_manager.services.metrics.recorder import request_metrics
+
+SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+SignalHandler = Union[Callable[[int, Any], Any], int, None]
+
+
+def chain_signal_handlers(
+    coordinator: ShutdownCoordinator,
+) -> dict[int, SignalHandler]:
+    """
+    Start draining as soon as the server is asked to stop.
+
+    The server keeps its own handlers, which are called after
+    draining starts, so it still stops listening and waits
+    for connections as usual.
+
+    :param coordinator: coordinator of the worker.
+    :returns: replaced handlers, empty if not called from the main thread.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return {}
+
+    previous: dict[int, SignalHandler] = {}
+    for signum in SIGNALS:
+        handler = signal.getsignal(signum)
+
+        def drain_then_stop(
+            signum: int,
+            frame: Any,
+            handler: SignalHandler = handler,
+        ) -> None:
+            coordinator.begin_drain()
+            if callable(handler):
+                handler(signum, frame)
+            elif handler == signal.SIG_DFL:
+                signal.signal(signum, signal.SIG_DFL)
+                signal.raise_signal(signum)
+
+        previous[signum] = handler
+        signal.signal(signum, drain_then_stop)
+    return previous
+
+
+def report(result: DrainResult) -> None:
+    """
+    Log and count work finished and aborted during shutdown.
+
+    :param result: result of draining.
+    """
+    counts = {
+        ("request", "drained"): result.requests_drained,
+        ("request", "aborted"): result.requests_aborted,
+        ("request", "rejected"): result.requests_rejected,
+        ("task", "drained"): result.tasks_drained,
+        ("task", "aborted"): result.tasks_aborted,
+    }
+    for (kind, outcome), count in counts.items():
+        if count:
+            request_metrics.increment(
+                "task_manager_shutdown_work",
+                count,
+                kind=kind,
+                outcome=outcome,
+            )
+    aborted = result.requests_aborted or result.tasks_aborted
+    log = logger.warning if aborted else logger.info
+    log(
+        "Drained in {:.2f}s: {} requests and {} background tasks finished, "
+        "{} requests and {} tasks aborted, {} requests rejected.",
+        result.seconds,
+        result.requests_drained,
+        result.tasks_drained,
+        result.requests_aborted,
+        result.tasks_aborted,
+        result.requests_rejected,
+    )
+
+
+def init_drain(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Start draining the worker on termination signals.
+
+    :param app: current application.
+    """
+    app.state.drain_signal_handlers = chain_signal_handlers(app.state.shutdown)
+
+
+async def shutdown_drain(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Wait for requests in flight and background tasks, and report them.
+
+    :param app: current application.
+    """
+    report(await app.state.shutdown.drain())
+    for signum, handler in app.state.drain_signal_handlers.items():
+        signal.signal(signum, handler)
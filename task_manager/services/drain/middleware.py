@@ -0,0 +1,56 @@
+import asyncio
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from task_manager.services.drain.coordinator import ShutdownCoordinator
+
+
+class DrainMiddleware:
+    """
+    Counts requests in flight and rejects new ones while the worker drains.
+
+    Rejected requests get 503 with ``Connection: close``, so clients
+    and load balancers retry them on another worker.
+    """
+
+    def __init__(self, app: ASGIApp, coordinator: ShutdownCoordinator) -> None:
+        self.app = app
+        self.coordinator = coordinator
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Handle the request unless the worker is draining.
+
+        :param scope: ASGI scope.
+        :param receive: ASGI receive callable.
+        :param send: ASGI send callable.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        coordinator = self.coordinator
+        if coordinator.draining:
+            coordinator.requests_rejected += 1
+            response = JSONResponse(
+                {"detail": "Server is shutting down."},
+                status_code=503,
+                headers={"Connection": "close", "Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        coordinator.in_flight += 1
+        aborted = False
+        try:
+            await self.app(scope, receive, send)
+        except asyncio.CancelledError:
+            aborted = True
+            raise
+        finally:
+            coordinator.in_flight -= 1
+            if aborted:
+                coordinator.requests_aborted += 1
+            elif coordinator.draining:
+                coordinator.requests_drained += 1
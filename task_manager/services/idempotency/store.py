@@ -0,0 +1,126 @@
+import asyncio
+import hashlib
+import time
+from typing import Optional
+
+import ujson
+from redis.asyncio import ConnectionPool, Redis
+
+from task_manager.settings import settings
+
+
+class IdempotencyError(Exception):
+    """Base error for idempotency keys."""
+
+
+class IdempotencyKeyInProgressError(IdempotencyError):
+    """Request with the same key is still being processed."""
+
+
+class IdempotencyKeyReusedError(IdempotencyError):
+    """Key was already used for a request with a different payload."""
+
+
+def fingerprint(payload: str) -> str:
+    """
+    Fingerprint of a request payload.
+
+    :param payload: serialized request payload.
+    :returns: sha256 hex digest of the payload.
+    """
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Stores responses of unsafe requests by their idempotency key.
+
+    The first request with a key takes a short lock, executes
+    and stores its response for ``ttl`` seconds. Retries get the
+    stored response back, concurrent duplicates wait for the
+    first request to finish instead of executing it again.
+    """
+
+    poll_interval = 0.05
+
+    def __init__(
+        self,
+        redis_pool: ConnectionPool,
+        scope: str,
+        ttl: int = settings.idempotency_ttl,
+        lock_ttl: float = settings.idempotency_lock_ttl,
+        wait_timeout: float = settings.idempotency_wait_timeout,
+    ) -> None:
+        self.redis_pool = redis_pool
+        self.scope = scope
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+
+    def _response_key(self, key: str) -> str:
+        return f"idempotency:{self.scope}:{key}"
+
+    def _lock_key(self, key: str) -> str:
+        return f"idempotency:{self.scope}:{key}:lock"
+
+    async def begin(self, key: str, request_fingerprint: str) -> Optional[str]:
+        """
+        Start processing a request.
+
+        :param key: idempotency key sent by the client.
+        :param request_fingerprint: fingerprint of the request payload.
+        :raises IdempotencyKeyReusedError: if the key was used with another payload.
+        :raises IdempotencyKeyInProgressError: if the first request is not done
+            in ``wait_timeout`` seconds.
+        :returns: stored response body, or None if the request should execute.
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        async with Redis(connection_pool=self.redis_pool) as redis:
+            while True:
+                # The lock is taken before the response is read, so a request
+                # completed in between isn't executed again.
+                async with redis.pipeline(transaction=False) as pipe:
+                    pipe.set(
+                        self._lock_key(key),
+                        request_fingerprint,
+                        nx=True,
+                        px=int(self.lock_ttl * 1000),
+                    )
+                    pipe.get(self._response_key(key))
+                    locked, stored = await pipe.execute()
+                if stored is not None:
+                    if locked:
+                        await redis.delete(self._lock_key(key))
+                    record = ujson.loads(stored)
+                    if record["fingerprint"] != request_fingerprint:
+                        raise IdempotencyKeyReusedError
+                    return record["body"]
+                if locked:
+                    return None
+                if time.monotonic() >= deadline:
+                    raise IdempotencyKeyInProgressError
+                await asyncio.sleep(self.poll_interval)
+
+    async def complete(self, key: str, request_fingerprint: str, body: str) -> None:
+        """
+        Store the response and release the key.
+
+        :param key: idempotency key sent by the client.
+        :param request_fingerprint: fingerprint of the request payload.
+        :param body: serialized response body.
+        """
+        record = ujson.dumps({"fingerprint": request_fingerprint, "body": body})
+        redis = Redis(connection_pool=self.redis_pool)
+        async with redis, redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._response_key(key), record, ex=self.ttl)
+            pipe.delete(self._lock_key(key))
+            await pipe.execute()
+
+    async def abort(self, key: str) -> None:
+        """
+        Release the key without storing a response, so it can be retried.
+
+        :param key: idempotency key sent by the client.
+        """
+        async with Redis(connection_pool=self.redis_pool) as redis:
+            await redis.delete(self._lock_key(key))
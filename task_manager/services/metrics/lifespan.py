@@ -0,0 +1,76 @@
+import asyncio
+import contextlib
+
+from fastapi import FastAPI
+from sqlalchemy.pool import QueuePool
+
+from task_manager.services.metrics.recorder import multiprocess_dir, request_metrics
+from task_manager.services.rabbit.pool import InstrumentedPool
+from task_manager.services.redis.pool import InstrumentedBlockingConnectionPool
+from task_manager.settings import settings
+
+
+def update_pool_gauges(app: FastAPI) -> None:
+    """
+    Set gauges of the database, redis and rabbitmq pools.
+
+    :param app: current application.
+    """
+    engine = getattr(app.state, "db_engine", None)
+    if engine is not None and isinstance(engine.pool, QueuePool):
+        name = "task_manager_db_pool_connections"
+        request_metrics.set_gauge(name, engine.pool.checkedout(), state="in_use")
+        request_metrics.set_gauge(name, engine.pool.checkedin(), state="available")
+        request_metrics.set_gauge(name, engine.pool.overflow(), state="overflow")
+
+    redis_pool = getattr(app.state, "redis_pool", None)
+    if isinstance(redis_pool, InstrumentedBlockingConnectionPool):
+        name = "task_manager_redis_pool_connections"
+        stats = redis_pool.stats()
+        request_metrics.set_gauge(name, stats["in_use"], state="in_use")
+        request_metrics.set_gauge(name, stats["available"], state="available")
+
+    for pool_name in ("rmq_pool", "rmq_channel_pool"):
+        rabbit_pool = getattr(app.state, pool_name, None)
+        if isinstance(rabbit_pool, InstrumentedPool):
+            name = "task_manager_rabbit_pool_items"
+            rabbit_stats = rabbit_pool.stats()
+            for state in ("in_use", "available"):
+                request_metrics.set_gauge(
+                    name,
+                    rabbit_stats[state],
+                    pool=pool_name,
+                    state=state,
+                )
+
+
+async def _flush_periodically(app: FastAPI) -> None:
+    directory = multiprocess_dir()
+    while True:
+        await asyncio.sleep(settings.metrics_flush_interval)
+        update_pool_gauges(app)
+        if directory is not None:
+            request_metrics.flush(directory)
+
+
+def init_metrics(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Start flushing metrics of the worker.
+
+    :param app: current application.
+    """
+    app.state.metrics_task = asyncio.create_task(_flush_periodically(app))
+
+
+async def shutdown_metrics(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Stop flushing metrics and write the final snapshot.
+
+    :param app: current application.
+    """
+    app.state.metrics_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await app.state.metrics_task
+    directory = multiprocess_dir()
+    if directory is not None:
+        request_metrics.flush(directory)
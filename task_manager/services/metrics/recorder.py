@@ -0,0 +1,414 @@
+import bisect
+import contextlib
+import fcntl
+import itertools
+import os
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+import ujson
+from prometheus_client import CollectorRegistry, generate_latest
+from prometheus_client.core import (
+    CounterMetricFamily,
+    GaugeMetricFamily,
+    HistogramMetricFamily,
+    Metric,
+)
+from prometheus_client.registry import Collector
+
+# Counters of exited workers, merged into one snapshot by the gunicorn master.
+EXITED_SNAPSHOT = "requests_exited.json"
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+GAUGES = {
+    "task_manager_db_pool_connections": "Connections of the database pool.",
+    "task_manager_redis_pool_connections": "Connections of the redis pool.",
+    "task_manager_rabbit_pool_items": "Connections and channels of rabbitmq pools.",
+    "task_manager_password_hash_waiting": "Passwords waiting for a thread "
+    "of the hashing pool.",
+}
+
+COUNTERS = {
+    "task_manager_worker_restarts": "Number of gunicorn workers that exited "
+    "while the server was running, by max_requests, a crash or a timeout.",
+    "task_manager_shutdown_work": "Requests and background tasks finished, "
+    "aborted or rejected while workers were shutting down.",
+    "task_manager_password_hashes": "Passwords hashed or verified "
+    "in the hashing pool.",
+    "task_manager_password_hash_queue_seconds": "Seconds passwords waited "
+    "for a thread of the hashing pool, divide by hashes for the mean.",
+    "task_manager_password_hash_seconds": "Seconds spent hashing "
+    "and verifying passwords in the hashing pool.",
+    "task_manager_tasks_archived": "Completed tasks moved into the archive.",
+}
+
+
+class RouteStats:
+    """Request counters of a single route."""
+
+    __slots__ = ("buckets", "duration_sum", "errors", "requests")
+
+    def __init__(self) -> None:
+        self.requests: dict[int, int] = {}
+        self.errors = 0
+        # Non-cumulative counts, the last one is for the +Inf bucket.
+        self.buckets = [0] * (len(DURATION_BUCKETS) + 1)
+        self.duration_sum = 0.0
+
+
+class RequestMetrics:
+    """
+    RED metrics of a worker.
+
+    Requests are aggregated in memory, so recording one is a few
+    dictionary operations. Workers periodically flush a snapshot
+    into a directory shared with other workers, and the scrape merges
+    all snapshots, so metrics are aggregated across gunicorn workers.
+    """
+
+    def __init__(self) -> None:
+        self.routes: dict[tuple[str, str], RouteStats] = {}
+        self.gauges: dict[str, dict[tuple[tuple[str, str], ...], float]] = {}
+        self.counters: dict[str, dict[tuple[tuple[str, str], ...], float]] = {}
+
+    def record(
+        self,
+        method: str,
+        route: str,
+        status_code: int,
+        duration: float,
+    ) -> None:
+        """
+        Record a finished request.
+
+        :param method: HTTP method.
+        :param route: path template of the matched route.
+        :param status_code: response status code.
+        :param duration: request duration in seconds.
+        """
+        key = (method, route)
+        stats = self.routes.get(key)
+        if stats is None:
+            stats = self.routes[key] = RouteStats()
+        stats.requests[status_code] = stats.requests.get(status_code, 0) + 1
+        if status_code >= 500:
+            stats.errors += 1
+        stats.buckets[bisect.bisect_left(DURATION_BUCKETS, duration)] += 1
+        stats.duration_sum += duration
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        """
+        Set value of a gauge.
+
+        :param name: name of the gauge, one of ``GAUGES``.
+        :param value: current value.
+        :param labels: labels of the value.
+        """
+        self.gauges.setdefault(name, {})[tuple(sorted(labels.items()))] = value
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        """
+        Increase value of a counter.
+
+        :param name: name of the counter, one of ``COUNTERS``.
+        :param value: increment.
+        :param labels: labels of the value.
+        """
+        values = self.counters.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        values[key] = values.get(key, 0) + value
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Serializable state of the worker.
+
+        :returns: snapshot of counters and gauges.
+        """
+        return {
+            "pid": os.getpid(),
+            "routes": [
+                {
+                    "method": method,
+                    "route": route,
+                    "requests": {
+                        str(status_code): count
+                        for status_code, count in stats.requests.items()
+                    },
+                    "errors": stats.errors,
+                    "buckets": stats.buckets,
+                    "sum": stats.duration_sum,
+                }
+                for (method, route), stats in self.routes.items()
+            ],
+            "gauges": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for name, values in self.gauges.items()
+                for labels, value in values.items()
+            ],
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for name, values in self.counters.items()
+                for labels, value in values.items()
+            ],
+        }
+
+    def flush(self, directory: Path) -> None:
+        """
+        Write snapshot of the worker into the shared directory.
+
+        :param directory: directory shared by workers.
+        """
+        _write_snapshot(directory / f"requests_{os.getpid()}.json", self.snapshot())
+
+
+def _write_snapshot(target: Path, snapshot: dict[str, Any]) -> None:
+    tmp = target.with_suffix(".tmp")
+    tmp.write_text(ujson.dumps(snapshot))
+    tmp.replace(target)
+
+
+def _read_snapshot(path: Path) -> Optional[dict[str, Any]]:
+    try:
+        return ujson.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+@contextlib.contextmanager
+def _locked(directory: Path, operation: int) -> Iterator[None]:
+    # Scrapes don't see a snapshot of an exited worker twice, or not at all,
+    # while the master merges it.
+    with (directory / "snapshots.lock").open("a") as lock:
+        fcntl.flock(lock, operation)
+        yield
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def load_snapshots(directory: Path) -> list[dict[str, Any]]:
+    """
+    Read snapshots flushed by all workers.
+
+    :param directory: directory shared by workers.
+    :returns: list of snapshots.
+    """
+    with _locked(directory, fcntl.LOCK_SH):
+        paths = list(directory.glob("requests_*.json"))
+        snapshots = [_read_snapshot(path) for path in paths]
+    return [snapshot for snapshot in snapshots if snapshot is not None]
+
+
+def merge_exited(directory: Path, pid: int) -> None:
+    """
+    Merge counters of an exited worker into the snapshot of exited workers.
+
+    The snapshot of the worker is removed, so the directory doesn't grow
+    with recycled workers, and a new worker reusing the pid doesn't
+    overwrite counters of the old one. Gauges of the worker are dropped.
+    Only the gunicorn master calls it, after the worker is reaped.
+
+    :param directory: directory shared by workers.
+    :param pid: pid of the exited worker.
+    """
+    path = directory / f"requests_{pid}.json"
+    exited_path = directory / EXITED_SNAPSHOT
+    with _locked(directory, fcntl.LOCK_EX):
+        snapshot = _read_snapshot(path)
+        if snapshot is None:
+            return
+        exited = _read_snapshot(exited_path)
+        snapshots = [snapshot] if exited is None else [exited, snapshot]
+        _write_snapshot(exited_path, _merge_snapshots(snapshots))
+        path.unlink()
+
+
+class _MergedRoutes:
+    """Route counters summed over snapshots."""
+
+    def __init__(self, snapshots: Iterable[dict[str, Any]]) -> None:
+        self.requests: dict[tuple[str, str, str], int] = {}
+        self.errors: dict[tuple[str, str], int] = {}
+        self.buckets: dict[tuple[str, str], list[int]] = {}
+        self.sums: dict[tuple[str, str], float] = {}
+        for snapshot in snapshots:
+            for route in snapshot["routes"]:
+                self._add(route)
+
+    def _add(self, route: dict[str, Any]) -> None:
+        key = (route["method"], route["route"])
+        for status_code, count in route["requests"].items():
+            status_key = (*key, status_code)
+            self.requests[status_key] = self.requests.get(status_key, 0) + count
+        self.errors[key] = self.errors.get(key, 0) + route["errors"]
+        merged = self.buckets.setdefault(key, [0] * len(route["buckets"]))
+        for index, count in enumerate(route["buckets"]):
+            merged[index] += count
+        self.sums[key] = self.sums.get(key, 0.0) + route["sum"]
+
+
+def _merge_values(
+    snapshots: Iterable[dict[str, Any]],
+    kind: str,
+) -> dict[str, dict[tuple[tuple[str, str], ...], float]]:
+    merged: dict[str, dict[tuple[tuple[str, str], ...], float]] = {}
+    for snapshot in snapshots:
+        for item in snapshot[kind]:
+            values = merged.setdefault(item["name"], {})
+            labels = tuple(sorted(item["labels"].items()))
+            values[labels] = values.get(labels, 0.0) + item["value"]
+    return merged
+
+
+def _merge_snapshots(snapshots: list[dict[str, Any]]) -> dict[str, Any]:
+    routes = _MergedRoutes(snapshots)
+    requests: dict[tuple[str, str], dict[str, int]] = {}
+    for (method, route, status_code), count in routes.requests.items():
+        requests.setdefault((method, route), {})[status_code] = count
+    return {
+        # Not a process, gauges of exited workers aren't kept.
+        "pid": 0,
+        "routes": [
+            {
+                "method": method,
+                "route": route,
+                "requests": requests.get((method, route), {}),
+                "errors": routes.errors[(method, route)],
+                "buckets": buckets,
+                "sum": routes.sums[(method, route)],
+            }
+            for (method, route), buckets in routes.buckets.items()
+        ],
+        "gauges": [],
+        "counters": [
+            {"name": name, "labels": dict(labels), "value": value}
+            for name, values in _merge_values(snapshots, "counters").items()
+            for labels, value in values.items()
+        ],
+    }
+
+
+def _families(
+    family_class: Any,
+    documented: dict[str, str],
+    merged: dict[str, dict[tuple[tuple[str, str], ...], float]],
+) -> Iterable[Metric]:
+    for name, documentation in documented.items():
+        values = merged.get(name, {})
+        label_names = [label for label, _ in next(iter(values), ())]
+        family = family_class(name, documentation, labels=label_names)
+        for label_items, value in values.items():
+            family.add_metric([label for _, label in label_items], value)
+        yield family
+
+
+class SnapshotCollector(Collector):
+    """
+    Merges snapshots of workers into prometheus metrics.
+
+    Counters of exited workers are kept, so totals never decrease.
+    Gauges are reported only for running workers.
+    """
+
+    def __init__(self, snapshots: Iterable[dict[str, Any]]) -> None:
+        self.snapshots = list(snapshots)
+
+    def collect(self) -> Iterable[Metric]:
+        """
+        Collect merged metrics.
+
+        :yields: metric families.
+        """
+        routes = _MergedRoutes(self.snapshots)
+
+        requests_family = CounterMetricFamily(
+            "task_manager_http_requests",
+            "Number of handled HTTP requests.",
+            labels=["method", "route", "status"],
+        )
+        for status_key, count in routes.requests.items():
+            requests_family.add_metric(list(status_key), count)
+        yield requests_family
+
+        errors_family = CounterMetricFamily(
+            "task_manager_http_request_errors",
+            "Number of HTTP requests that failed with a server error.",
+            labels=["method", "route"],
+        )
+        for key, count in routes.errors.items():
+            errors_family.add_metric(list(key), count)
+        yield errors_family
+
+        duration_family = HistogramMetricFamily(
+            "task_manager_http_request_duration_seconds",
+            "Duration of HTTP requests.",
+            labels=["method", "route"],
+        )
+        bounds = [*map(str, DURATION_BUCKETS), "+Inf"]
+        for key, counts in routes.buckets.items():
+            cumulative = itertools.accumulate(counts)
+            duration_family.add_metric(
+                list(key),
+                list(zip(bounds, cumulative)),
+                routes.sums[key],
+            )
+        yield duration_family
+
+        running = [
+            snapshot
+            for snapshot in self.snapshots
+            if snapshot["pid"] and _is_alive(snapshot["pid"])
+        ]
+        yield from _families(
+            GaugeMetricFamily,
+            GAUGES,
+            _merge_values(running, "gauges"),
+        )
+        yield from _families(
+            CounterMetricFamily,
+            COUNTERS,
+            _merge_values(self.snapshots, "counters"),
+        )
+
+
+def multiprocess_dir() -> Optional[Path]:
+    """
+    Directory shared by gunicorn workers.
+
+    :returns: path to the directory, if metrics are aggregated across workers.
+    """
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not directory:
+        return None
+    return Path(directory)
+
+
+def render_latest() -> bytes:
+    """
+    Render metrics in prometheus text format.
+
+    :returns: metrics of all workers, or of the current one
+        if metrics aren't aggregated across workers.
+    """
+    directory = multiprocess_dir()
+    if directory is None:
+        snapshots = [request_metrics.snapshot()]
+    else:
+        request_metrics.flush(directory)
+        snapshots = load_snapshots(directory)
+    registry = CollectorRegistry()
+    registry.register(SnapshotCollector(snapshots))
+    return generate_latest(registry)
+
+
+request_metrics = RequestMetrics()
+# Recorded by the gunicorn master, which doesn't serve requests.
+supervisor_metrics = RequestMetrics()
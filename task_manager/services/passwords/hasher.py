@@ -0,0 +1,145 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from fastapi_users.password import PasswordHelper, PasswordHelperProtocol
+
+from task_manager.services.metrics.recorder import RequestMetrics, request_metrics
+from task_manager.settings import settings
+
+T = TypeVar("T")
+
+
+class OffloadedPasswordHelper(PasswordHelperProtocol):
+    """
+    Hashes and verifies passwords in a bounded thread pool.
+
+    A single argon2 hash takes a few hundred milliseconds of CPU, done
+    on the event loop it stalls every other request of the worker.
+    Argon2 and bcrypt release the GIL while hashing, so threads hash
+    in parallel with the loop, without the cost of sending passwords
+    to another process. At most ``max_workers`` passwords are hashed
+    at once, the rest waits in the queue of the pool.
+
+    Synchronous methods of the protocol hash on the calling thread,
+    they are kept for code paths of fastapi-users which aren't
+    overridden by the user manager.
+    """
+
+    def __init__(
+        self,
+        helper: PasswordHelperProtocol,
+        max_workers: int,
+        metrics: RequestMetrics = request_metrics,
+    ) -> None:
+        self.helper = helper
+        self.max_workers = max_workers
+        self.metrics = metrics
+        self.in_flight = 0
+        # Threads are started on first use, so none are forked
+        # by a master that preloads the app.
+        self.executor = ThreadPoolExecutor(
+            max_workers,
+            thread_name_prefix="password-hash",
+        )
+
+    def verify_and_update(
+        self,
+        plain_password: str,
+        hashed_password: str,
+    ) -> tuple[bool, Optional[str]]:
+        """
+        Verify a password on the calling thread.
+
+        :param plain_password: password to verify.
+        :param hashed_password: stored hash.
+        :returns: whether it matches and a new hash if the old one is outdated.
+        """
+        return self.helper.verify_and_update(plain_password, hashed_password)
+
+    def hash(self, password: str) -> str:
+        """
+        Hash a password on the calling thread.
+
+        :param password: password to hash.
+        :returns: hash of the password.
+        """
+        return self.helper.hash(password)
+
+    def generate(self) -> str:
+        """
+        Generate a random password.
+
+        :returns: new password.
+        """
+        return self.helper.generate()
+
+    async def verify_and_update_offloaded(
+        self,
+        plain_password: str,
+        hashed_password: str,
+    ) -> tuple[bool, Optional[str]]:
+        """
+        Verify a password in the pool.
+
+        :param plain_password: password to verify.
+        :param hashed_password: stored hash.
+        :returns: whether it matches and a new hash if the old one is outdated.
+        """
+        return await self._run(
+            "verify",
+            self.helper.verify_and_update,
+            plain_password,
+            hashed_password,
+        )
+
+    async def hash_offloaded(self, password: str) -> str:
+        """
+        Hash a password in the pool.
+
+        :param password: password to hash.
+        :returns: hash of the password.
+        """
+        return await self._run("hash", self.helper.hash, password)
+
+    async def _run(self, operation: str, func: Callable[..., T], *args: Any) -> T:
+        submitted = time.perf_counter()
+
+        def job() -> tuple[float, T]:
+            return time.perf_counter(), func(*args)
+
+        self._set_in_flight(1)
+        try:
+            loop = asyncio.get_running_loop()
+            started, result = await loop.run_in_executor(self.executor, job)
+        finally:
+            self._set_in_flight(-1)
+
+        # Metrics are recorded on the loop, the recorder isn't thread-safe.
+        finished = time.perf_counter()
+        self.metrics.increment("task_manager_password_hashes", operation=operation)
+        self.metrics.increment(
+            "task_manager_password_hash_queue_seconds",
+            started - submitted,
+            operation=operation,
+        )
+        self.metrics.increment(
+            "task_manager_password_hash_seconds",
+            finished - started,
+            operation=operation,
+        )
+        return result
+
+    def _set_in_flight(self, delta: int) -> None:
+        self.in_flight += delta
+        self.metrics.set_gauge(
+            "task_manager_password_hash_waiting",
+            max(self.in_flight - self.max_workers, 0),
+        )
+
+
+password_helper = OffloadedPasswordHelper(
+    PasswordHelper(),
+    settings.password_hash_workers,
+)
@@ -0,0 +1,47 @@
+import time
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+
+class DBTimer:
+    """Number and duration of SQL statements of a request."""
+
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.seconds = 0.0
+
+
+db_timer: ContextVar[Optional[DBTimer]] = ContextVar("db_timer", default=None)
+
+
+def _before_cursor_execute(conn: Connection, *args: Any) -> None:
+    if db_timer.get() is not None:
+        conn.info.setdefault("profiling_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn: Connection, *args: Any) -> None:
+    timer = db_timer.get()
+    started = conn.info.get("profiling_started")
+    if timer is not None and started:
+        timer.queries += 1
+        timer.seconds += time.perf_counter() - started.pop()
+
+
+def track_db_time() -> None:
+    """
+    Time SQL statements of requests that set :data:`db_timer`.
+
+    Listeners are registered for all engines,
+    only when profiling is enabled.
+    """
+    for name, listener in (
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+    ):
+        if not event.contains(Engine, name, listener):
+            event.listen(Engine, name, listener)
@@ -0,0 +1,146 @@
+import cProfile
+import io
+import pstats
+import random
+import re
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from fastapi_users.db import SQLAlchemyUserDatabase
+from loguru import logger
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from task_manager.db.models.users import (  # type: ignore
+    UserDBModel,
+    UserManager,
+    cookie_transport,
+    get_jwt_strategy,
+)
+from task_manager.services.profiling.db_timer import DBTimer, db_timer, track_db_time
+
+Authorize = Callable[[Scope], Awaitable[bool]]
+
+
+async def is_superuser(scope: Scope) -> bool:
+    """
+    Check that the request is sent by an active superuser.
+
+    :param scope: ASGI scope of the request.
+    :returns: whether the bearer token or the auth cookie belongs to a superuser.
+    """
+    request = Request(scope)
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        token = request.cookies.get(cookie_transport.cookie_name, "")
+    if not token:
+        return False
+    async with request.app.state.db_session_factory() as session:
+        user_manager = UserManager(SQLAlchemyUserDatabase(session, UserDBModel))
+        user = await get_jwt_strategy().read_token(token, user_manager)
+    return user is not None and user.is_active and user.is_superuser
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a sampled subset of requests and requests of superusers.
+
+    Superusers request a profile by sending the profiling header.
+    Requests are profiled with cProfile, one at a time per worker,
+    because the profiler hooks the whole thread. For the same reason
+    the profile includes work of requests running concurrently.
+    DB time is measured per request, and a summary with DB and Python
+    time and the slowest functions is logged for the route. Profiles
+    are also saved into the profile directory, if it is set.
+
+    The middleware is added only if profiling is enabled.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float,
+        header: str,
+        directory: Optional[Path] = None,
+        authorize: Authorize = is_superuser,
+        top: int = 15,
+    ) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+        self.header = header.lower().encode("latin-1")
+        self.directory = directory
+        self.authorize = authorize
+        self.top = top
+        self._busy = False
+        track_db_time()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Handle the request, profiling it if needed.
+
+        :param scope: ASGI scope.
+        :param receive: ASGI receive callable.
+        :param send: ASGI send callable.
+        """
+        if (
+            scope["type"] != "http"
+            or self._busy
+            or not await self._requested(scope)
+            # Another request could start profiling during authorization.
+            or self._busy
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        self._busy = True
+        timer = DBTimer()
+        token = db_timer.set(timer)
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profile.disable()
+            duration = time.perf_counter() - started
+            db_timer.reset(token)
+            self._busy = False
+            self._report(scope, profile, duration, timer)
+
+    async def _requested(self, scope: Scope) -> bool:
+        if self.sample_rate and random.random() < self.sample_rate:  # noqa: S311
+            return True
+        if any(name == self.header for name, _ in scope["headers"]):
+            return await self.authorize(scope)
+        return False
+
+    def _report(
+        self,
+        scope: Scope,
+        profile: cProfile.Profile,
+        duration: float,
+        timer: DBTimer,
+    ) -> None:
+        route = scope.get("route")
+        path = route.path if route is not None else "untemplated"
+        output = io.StringIO()
+        stats = pstats.Stats(profile, stream=output)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        logger.info(
+            "Profiled {method} {route}: total={total_ms:.1f}ms "
+            "db={db_ms:.1f}ms in {db_queries} queries python={python_ms:.1f}ms\n{top}",
+            method=scope["method"],
+            route=path,
+            total_ms=duration * 1000,
+            db_ms=timer.seconds * 1000,
+            db_queries=timer.queries,
+            python_ms=(duration - timer.seconds) * 1000,
+            top=output.getvalue(),
+        )
+        if self.directory is not None:
+            slug = re.sub(r"[^\w]+", "_", path).strip("_")
+            self.directory.mkdir(parents=True, exist_ok=True)
+            stats.dump_stats(
+                self.directory / f"{time.time_ns()}-{scope['method']}-{slug}.prof",
+            )
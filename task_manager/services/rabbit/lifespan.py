@@ -1,8 +1,8 @@
 import aio_pika
 from aio_pika.abc import AbstractChannel, AbstractRobustConnection
-from aio_pika.pool import Pool
 from fastapi import FastAPI
 
+from task_manager.services.rabbit.pool import InstrumentedPool
 from task_manager.settings import settings
 
 
@@ -22,7 +22,7 @@ def init_rabbit(app: FastAPI) -> None:  # pragma: no cover
         return await aio_pika.connect_robust(str(settings.rabbit_url))
 
     # This pool is used to open connections.
-    connection_pool: Pool[AbstractRobustConnection] = Pool(
+    connection_pool: InstrumentedPool[AbstractRobustConnection] = InstrumentedPool(
         get_connection,
         max_size=settings.rabbit_pool_size,
     )
@@ -39,7 +39,7 @@ def init_rabbit(app: FastAPI) -> None:  # pragma: no cover
             return await connection.channel()
 
     # This pool is used to open channels.
-    channel_pool: Pool[aio_pika.Channel] = Pool(
+    channel_pool: InstrumentedPool[aio_pika.Channel] = InstrumentedPool(
         get_channel,
         max_size=settings.rabbit_channel_pool_size,
     )
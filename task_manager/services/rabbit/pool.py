@@ -0,0 +1,55 @@
+import asyncio
+from typing import Any, Optional, TypeVar
+
+from aio_pika.pool import ConstructorType, Pool
+
+T = TypeVar("T")
+
+
+class InstrumentedPool(Pool[T]):
+    """aio-pika pool that counts created and acquired items."""
+
+    def __init__(
+        self,
+        constructor: ConstructorType,
+        *args: Any,
+        max_size: Optional[int] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> None:
+        self.max_size = max_size
+        self.created = 0
+        self.in_use = 0
+
+        async def counting_constructor(*constructor_args: Any) -> Any:
+            item = await constructor(*constructor_args)
+            self.created += 1
+            return item
+
+        super().__init__(counting_constructor, *args, max_size=max_size, loop=loop)
+
+    async def _get(self) -> T:
+        item = await super()._get()
+        self.in_use += 1
+        return item
+
+    def put(self, item: T) -> None:
+        """
+        Return an item to the pool.
+
+        :param item: item to return.
+        """
+        self.in_use -= 1
+        super().put(item)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Current state of the pool.
+
+        :returns: created, in-use and available items.
+        """
+        return {
+            "max_size": self.max_size or 0,
+            "created": self.created,
+            "in_use": self.in_use,
+            "available": self.created - self.in_use,
+        }
@@ -0,0 +1,73 @@
+import math
+
+from fastapi import Depends, HTTPException, Request
+from redis.asyncio import ConnectionPool
+from starlette import status
+
+from task_manager.db.models.users import (  # type: ignore
+    UserDBModel,
+    current_active_user,
+)
+from task_manager.services.rate_limit.limiter import (
+    RateLimitResult,
+    SlidingWindowRateLimiter,
+)
+from task_manager.services.redis.dependency import get_redis_pool
+from task_manager.settings import settings
+
+tasks_limiter = SlidingWindowRateLimiter(
+    scope="tasks",
+    limit=settings.rate_limit_tasks,
+    window=settings.rate_limit_window,
+    lease=settings.rate_limit_lease,
+)
+auth_limiter = SlidingWindowRateLimiter(
+    scope="auth",
+    limit=settings.rate_limit_auth,
+    window=settings.rate_limit_window,
+    lease=settings.rate_limit_lease,
+)
+
+
+def _raise_if_limited(result: RateLimitResult) -> None:
+    if not result.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests.",
+            headers={"Retry-After": str(max(1, math.ceil(result.retry_after)))},
+        )
+
+
+async def rate_limit_user(
+    current_user: UserDBModel = Depends(current_active_user),
+    redis_pool: ConnectionPool = Depends(get_redis_pool),
+) -> None:
+    """
+    Limit requests per authenticated user.
+
+    :param current_user: current user.
+    :param redis_pool: redis connection pool.
+    :raises HTTPException: 429 with ``Retry-After`` if the limit is exceeded.
+    """
+    if not settings.rate_limit_enabled:
+        return
+    _raise_if_limited(await tasks_limiter.hit(redis_pool, str(current_user.id)))
+
+
+async def rate_limit_ip(
+    request: Request,
+    redis_pool: ConnectionPool = Depends(get_redis_pool),
+) -> None:
+    """
+    Limit requests per client address.
+
+    Used for routes where the user is not authenticated yet.
+
+    :param request: current request.
+    :param redis_pool: redis connection pool.
+    :raises HTTPException: 429 with ``Retry-After`` if the limit is exceeded.
+    """
+    if not settings.rate_limit_enabled:
+        return
+    client_host = request.client.host if request.client else "unknown"
+    _raise_if_limited(await auth_limiter.hit(redis_pool, client_host))
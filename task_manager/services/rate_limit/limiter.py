@@ -0,0 +1,148 @@
+import time
+import uuid
+from typing import Any, NamedTuple, Optional
+
+from loguru import logger
+from redis.asyncio import ConnectionPool, Redis
+from redis.exceptions import RedisError
+
+# Sliding window log kept in a sorted set, scored by request time in ms.
+# Grants up to ARGV[4] permits at once and returns
+# {granted permits, milliseconds until the next permit frees up}.
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local wanted = tonumber(ARGV[4])
+local prefix = ARGV[5]
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local granted = math.min(wanted, limit - redis.call('ZCARD', key))
+if granted > 0 then
+    for i = 1, granted do
+        redis.call('ZADD', key, now, prefix .. i)
+    end
+    redis.call('PEXPIRE', key, window)
+    return {granted, 0}
+end
+
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+if oldest[2] == nil then
+    return {0, window}
+end
+return {0, tonumber(oldest[2]) + window - now}
+"""
+
+
+class RateLimitResult(NamedTuple):
+    """Outcome of a rate limit check."""
+
+    allowed: bool
+    retry_after: float = 0.0
+
+
+class _LocalBucket:
+    """Permits leased from redis and not yet used by this worker."""
+
+    __slots__ = ("blocked_until", "expires_at", "tokens")
+
+    def __init__(self) -> None:
+        self.tokens = 0
+        self.expires_at = 0.0
+        self.blocked_until = 0.0
+
+
+class SlidingWindowRateLimiter:
+    """
+    Rate limiter shared by all workers through redis.
+
+    Every identity may perform ``limit`` requests per ``window`` seconds.
+    The window is kept in redis and updated atomically by a lua script,
+    executed with EVALSHA.
+
+    To avoid a round trip for every request, a worker leases up to
+    ``lease`` permits at once and hands them out from an in-process
+    bucket until they run out or leave the window. Rejections are
+    cached in the same bucket until ``Retry-After`` passes.
+    """
+
+    max_local_buckets = 10_000
+
+    def __init__(
+        self,
+        scope: str,
+        limit: int,
+        window: float,
+        lease: int = 1,
+    ) -> None:
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+        self.lease = max(1, min(lease, limit))
+        self._buckets: dict[str, _LocalBucket] = {}
+        self._script: Optional[Any] = None
+
+    def _bucket(self, identity: str, now: float) -> _LocalBucket:
+        bucket = self._buckets.get(identity)
+        if bucket is None:
+            if len(self._buckets) >= self.max_local_buckets:
+                self._buckets = {
+                    key: value
+                    for key, value in self._buckets.items()
+                    if value.expires_at > now or value.blocked_until > now
+                }
+            bucket = self._buckets[identity] = _LocalBucket()
+        return bucket
+
+    async def hit(self, redis_pool: ConnectionPool, identity: str) -> RateLimitResult:
+        """
+        Register a request made by the identity.
+
+        If redis is unavailable requests are let through,
+        so rate limiting never takes the API down.
+
+        :param redis_pool: redis connection pool.
+        :param identity: user id or client address.
+        :returns: whether the request is allowed.
+        """
+        now = time.time()
+        bucket = self._bucket(identity, now)
+        if bucket.blocked_until > now:
+            return RateLimitResult(
+                allowed=False,
+                retry_after=bucket.blocked_until - now,
+            )
+        if bucket.tokens > 0 and bucket.expires_at > now:
+            bucket.tokens -= 1
+            return RateLimitResult(allowed=True)
+
+        now_ms = int(now * 1000)
+        try:
+            async with Redis(connection_pool=redis_pool) as redis:
+                if self._script is None:
+                    self._script = redis.register_script(SLIDING_WINDOW_SCRIPT)
+                granted, retry_after_ms = await self._script(
+                    keys=[f"rate_limit:{self.scope}:{identity}"],
+                    args=[
+                        now_ms,
+                        int(self.window * 1000),
+                        self.limit,
+                        self.lease,
+                        f"{now_ms}:{uuid.uuid4().hex}:",
+                    ],
+                    client=redis,
+                )
+        except RedisError as exc:
+            logger.warning("Rate limiter is unavailable: {}", exc)
+            return RateLimitResult(allowed=True)
+
+        if granted > 0:
+            bucket.tokens = int(granted) - 1
+            bucket.expires_at = now + self.window
+            return RateLimitResult(allowed=True)
+
+        retry_after = int(retry_after_ms) / 1000
+        bucket.tokens = 0
+        bucket.blocked_until = now + retry_after
+        return RateLimitResult(allowed=False, retry_after=retry_after)
@@ -1,6 +1,8 @@
 from fastapi import FastAPI
-from redis.asyncio import ConnectionPool
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
 
+from task_manager.services.redis.pool import InstrumentedBlockingConnectionPool
 from task_manager.settings import settings
 
 
@@ -8,10 +10,21 @@ def init_redis(app: FastAPI) -> None:  # pragma: no cover
     """
     Creates connection pool for redis.
 
+    The pool is bounded by ``redis_max_connections``, requests
+    for a connection wait up to ``redis_pool_timeout`` seconds
+    when the pool is exhausted.
+
     :param app: current fastapi application.
     """
-    app.state.redis_pool = ConnectionPool.from_url(
+    app.state.redis_pool = InstrumentedBlockingConnectionPool.from_url(
         str(settings.redis_url),
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout,
+        socket_timeout=settings.redis_socket_timeout,
+        socket_connect_timeout=settings.redis_socket_connect_timeout,
+        health_check_interval=settings.redis_health_check_interval,
+        retry=Retry(ExponentialBackoff(), settings.redis_retry_attempts),
+        retry_on_timeout=True,
     )
 
 
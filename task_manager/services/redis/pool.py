@@ -0,0 +1,73 @@
+import time
+from typing import Any, Union
+
+from redis.asyncio import BlockingConnectionPool
+from redis.asyncio.connection import AbstractConnection
+
+
+class InstrumentedBlockingConnectionPool(BlockingConnectionPool):
+    """
+    Blocking connection pool that keeps acquisition statistics.
+
+    The pool never opens more than ``max_connections`` connections.
+    When all of them are in use, callers wait up to ``timeout`` seconds
+    for a connection to be released. Time spent waiting is recorded,
+    so the pool footprint of a worker can be inspected at runtime.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.acquired_total = 0
+        self.acquire_errors_total = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    async def get_connection(
+        self,
+        command_name: Any = None,
+        *keys: Any,
+        **options: Any,
+    ) -> AbstractConnection:
+        """
+        Get a connection from the pool and record the time spent waiting.
+
+        :param command_name: name of the command to execute.
+        :param keys: keys of the command.
+        :param options: command options.
+        :raises ConnectionError: if no connection became available in time.
+        :returns: connection from the pool.
+        """
+        started = time.perf_counter()
+        try:
+            connection = await super().get_connection(command_name, *keys, **options)
+        except BaseException:
+            self.acquire_errors_total += 1
+            raise
+        waited = time.perf_counter() - started
+        self.acquired_total += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        return connection
+
+    def stats(self) -> dict[str, Union[int, float]]:
+        """
+        Current state of the pool.
+
+        :returns: connection counts and acquisition wait times.
+        """
+        in_use = len(self._in_use_connections)
+        available = len(self._available_connections)
+        wait_seconds_avg = 0.0
+        if self.acquired_total:
+            wait_seconds_avg = self.wait_seconds_total / self.acquired_total
+        return {
+            "max_connections": self.max_connections,
+            "in_use": in_use,
+            "available": available,
+            "created": in_use + available,
+            "acquired_total": self.acquired_total,
+            "acquire_errors_total": self.acquire_errors_total,
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_avg": wait_seconds_avg,
+            "wait_seconds_max": self.wait_seconds_max,
+        }
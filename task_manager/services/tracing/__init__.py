@@ -0,0 +1 @@
+"""Opentelemetry tracing service."""
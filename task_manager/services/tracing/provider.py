@@ -0,0 +1,59 @@
+from opentelemetry.sdk.resources import (
+    DEPLOYMENT_ENVIRONMENT,
+    SERVICE_NAME,
+    TELEMETRY_SDK_LANGUAGE,
+    Resource,
+)
+from opentelemetry.sdk.trace import SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter
+
+from task_manager.services.tracing.sampling import (
+    TailSamplingSpanProcessor,
+    create_sampler,
+)
+from task_manager.settings import settings
+
+
+def create_tracer_provider(exporter: SpanExporter) -> TracerProvider:
+    """
+    Create tracer provider configured from settings.
+
+    Traces are sampled with a parent-based ratio sampler.
+    If errors or slow requests are always sampled, the rest
+    of traces is recorded and exported only if they failed or were slow.
+
+    :param exporter: exporter of finished spans.
+    :returns: tracer provider.
+    """
+    tail_sampling = (
+        settings.opentelemetry_sample_errors
+        or settings.opentelemetry_slow_threshold is not None
+    ) and settings.opentelemetry_sample_ratio < 1
+    tracer_provider = TracerProvider(
+        resource=Resource(
+            attributes={
+                SERVICE_NAME: "task_manager",
+                TELEMETRY_SDK_LANGUAGE: "python",
+                DEPLOYMENT_ENVIRONMENT: settings.environment,
+            },
+        ),
+        sampler=create_sampler(
+            settings.opentelemetry_sample_ratio,
+            record_unsampled=tail_sampling,
+        ),
+    )
+
+    processor: SpanProcessor = BatchSpanProcessor(
+        exporter,
+        max_queue_size=settings.opentelemetry_max_queue_size,
+        max_export_batch_size=settings.opentelemetry_max_export_batch_size,
+        schedule_delay_millis=settings.opentelemetry_export_interval * 1000,
+    )
+    if tail_sampling:
+        processor = TailSamplingSpanProcessor(
+            processor,
+            sample_errors=settings.opentelemetry_sample_errors,
+            slow_threshold=settings.opentelemetry_slow_threshold,
+        )
+    tracer_provider.add_span_processor(processor)
+    return tracer_provider
@@ -0,0 +1,198 @@
+import threading
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.sdk.trace.sampling import (
+    Decision,
+    ParentBased,
+    Sampler,
+    SamplingResult,
+    StaticSampler,
+    TraceIdRatioBased,
+)
+from opentelemetry.trace import Link, SpanContext, SpanKind, StatusCode, TraceFlags
+from opentelemetry.trace.span import TraceState
+from opentelemetry.util.types import Attributes
+
+
+class RecordingRatioSampler(Sampler):
+    """
+    Samples a ratio of traces and records the rest without exporting them.
+
+    Recorded traces can still be exported by
+    :class:`TailSamplingSpanProcessor` once it's known
+    that they failed or were slow.
+    """
+
+    def __init__(self, ratio: float) -> None:
+        self._ratio = TraceIdRatioBased(ratio)
+
+    def should_sample(
+        self,
+        parent_context: Optional[Context],
+        trace_id: int,
+        name: str,
+        kind: Optional[SpanKind] = None,
+        attributes: Attributes = None,
+        links: Optional[Sequence[Link]] = None,
+        trace_state: Optional[TraceState] = None,
+    ) -> SamplingResult:
+        """
+        Sample the trace or only record it.
+
+        :param parent_context: context of the parent span.
+        :param trace_id: id of the trace.
+        :param name: name of the span.
+        :param kind: kind of the span.
+        :param attributes: attributes of the span.
+        :param links: links of the span.
+        :param trace_state: state of the trace.
+        :returns: sampling decision.
+        """
+        result = self._ratio.should_sample(
+            parent_context,
+            trace_id,
+            name,
+            kind,
+            attributes,
+            links,
+            trace_state,
+        )
+        if result.decision != Decision.DROP:
+            return result
+        return SamplingResult(Decision.RECORD_ONLY, attributes, result.trace_state)
+
+    def get_description(self) -> str:
+        """
+        Description of the sampler.
+
+        :returns: description.
+        """
+        return f"RecordingRatio{{{self._ratio.rate}}}"
+
+
+def create_sampler(ratio: float, record_unsampled: bool) -> Sampler:
+    """
+    Create a parent-based ratio sampler.
+
+    :param ratio: fraction of traces to sample.
+    :param record_unsampled: whether unsampled traces are recorded
+        for :class:`TailSamplingSpanProcessor`.
+    :returns: sampler.
+    """
+    if not record_unsampled:
+        return ParentBased(TraceIdRatioBased(ratio))
+    record_only = StaticSampler(Decision.RECORD_ONLY)
+    return ParentBased(
+        RecordingRatioSampler(ratio),
+        remote_parent_not_sampled=record_only,
+        local_parent_not_sampled=record_only,
+    )
+
+
+def _sampled_copy(span: ReadableSpan) -> ReadableSpan:
+    # Exporting processors skip spans without the sampled flag.
+    context = span.context
+    return ReadableSpan(
+        name=span.name,
+        context=SpanContext(
+            context.trace_id,
+            context.span_id,
+            context.is_remote,
+            TraceFlags(context.trace_flags | TraceFlags.SAMPLED),
+            context.trace_state,
+        ),
+        parent=span.parent,
+        resource=span.resource,
+        attributes=span.attributes,
+        events=span.events,
+        links=span.links,
+        kind=span.kind,
+        status=span.status,
+        start_time=span.start_time,
+        end_time=span.end_time,
+        instrumentation_scope=span.instrumentation_scope,
+    )
+
+
+class TailSamplingSpanProcessor(SpanProcessor):
+    """
+    Exports unsampled traces that failed or were slow.
+
+    Sampled spans are passed to the wrapped processor right away.
+    Spans of recorded-only traces are buffered until the local root
+    span of the trace ends. The whole trace is exported if any of its
+    spans failed or the root took longer than the slow threshold,
+    otherwise it's discarded.
+    """
+
+    def __init__(
+        self,
+        processor: SpanProcessor,
+        sample_errors: bool,
+        slow_threshold: Optional[float],
+        max_traces: int = 1024,
+    ) -> None:
+        self.processor = processor
+        self.sample_errors = sample_errors
+        self.slow_threshold = slow_threshold
+        self.max_traces = max_traces
+        self._traces: OrderedDict[int, list[ReadableSpan]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        """
+        Pass the started span to the wrapped processor.
+
+        :param span: started span.
+        :param parent_context: context of the parent span.
+        """
+        self.processor.on_start(span, parent_context=parent_context)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        """
+        Export the span, buffer it, or decide on the whole trace.
+
+        :param span: ended span.
+        """
+        if span.context.trace_flags.sampled:
+            self.processor.on_end(span)
+            return
+
+        trace_id = span.context.trace_id
+        with self._lock:
+            if span.parent is not None and not span.parent.is_remote:
+                self._traces.setdefault(trace_id, []).append(span)
+                if len(self._traces) > self.max_traces:
+                    self._traces.popitem(last=False)
+                return
+            spans = self._traces.pop(trace_id, [])
+        spans.append(span)
+
+        if self._should_export(span, spans):
+            for buffered in spans:
+                self.processor.on_end(_sampled_copy(buffered))
+
+    def _should_export(self, root: ReadableSpan, spans: list[ReadableSpan]) -> bool:
+        if self.sample_errors and any(
+            span.status.status_code == StatusCode.ERROR for span in spans
+        ):
+            return True
+        if self.slow_threshold is None or root.end_time is None:
+            return False
+        return root.end_time - (root.start_time or 0) >= self.slow_threshold * 1e9
+
+    def shutdown(self) -> None:
+        """Shut down the wrapped processor."""
+        self.processor.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        """
+        Flush the wrapped processor.
+
+        :param timeout_millis: time to wait for the flush.
+        :returns: whether the flush succeeded.
+        """
+        return self.processor.force_flush(timeout_millis)
@@ -1,4 +1,5 @@
 import enum
+import math
 import os
 from pathlib import Path
 from tempfile import gettempdir
@@ -8,6 +9,27 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 from yarl import URL
 
 TEMP_DIR = Path(gettempdir())
+CGROUP_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+
+
+def available_cpus() -> int:
+    """
+    Number of CPUs the process may use.
+
+    Both CPU affinity and the CPU quota of the container are respected.
+
+    :return: number of CPUs.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        quota, period = CGROUP_CPU_MAX.read_text().split()
+        return max(1, min(cpus, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        # No cgroup v2 or no quota, which is written as "max".
+        return cpus
 
 
 class LogLevel(str, enum.Enum):
@@ -21,6 +43,27 @@ class LogLevel(str, enum.Enum):
     FATAL = "FATAL"
 
 
+class LogFormat(str, enum.Enum):
+    """Possible log output formats."""
+
+    TEXT = "text"
+    JSON = "json"
+
+
+class AccessLogMode(str, enum.Enum):
+    """Possible modes of the access log."""
+
+    # Every request is logged by uvicorn.
+    FULL = "full"
+    # A fraction of requests is logged by uvicorn.
+    SAMPLED = "sampled"
+    # Only failed and slow requests are logged.
+    ERRORS = "errors"
+    # Per-route counts and latency percentiles are logged periodically.
+    AGGREGATE = "aggregate"
+    OFF = "off"
+
+
 class Settings(BaseSettings):
     """
     Application settings.
@@ -31,8 +74,26 @@ class Settings(BaseSettings):
 
     host: str = "127.0.0.1"
     port: int = 8000
-    # quantity of workers for uvicorn
+    # quantity of workers for uvicorn, 0 starts a worker per available CPU
     workers_count: int = 1
+    # Build the app in the gunicorn master and fork workers from it,
+    # so they share its memory.
+    preload_app: bool = False
+    # Workers are restarted after this many requests plus a random jitter,
+    # which contains slow memory growth. 0 disables restarts.
+    max_requests: int = 0
+    max_requests_jitter: int = 0
+    # Connections waiting to be accepted.
+    backlog: int = 2048
+    # Seconds an idle keep-alive connection is kept open. Keep it longer than
+    # the idle timeout of the load balancer in front of the server.
+    keepalive: int = 2
+    # Seconds gunicorn waits for workers to exit before they are killed.
+    graceful_timeout: int = 30
+    # Seconds a worker waits for requests in flight and background tasks
+    # on shutdown, the rest is cancelled. Keep it below graceful_timeout,
+    # so workers close their connections and export spans before exiting.
+    shutdown_timeout: int = 20
     # Enable uvicorn reloading
     reload: bool = False
 
@@ -40,7 +101,44 @@ class Settings(BaseSettings):
     environment: str = "dev"
 
     log_level: LogLevel = LogLevel.INFO
+    # JSON lines written by a background thread, meant for production.
+    log_format: LogFormat = LogFormat.TEXT
+    # Records buffered for the background writer, newer ones are dropped when full.
+    log_queue_size: int = 10_000
+    access_log_mode: AccessLogMode = AccessLogMode.FULL
+    # Write uvicorn access logs straight to the output, bypassing loguru.
+    access_log_direct: bool = False
+    # Fraction of requests logged in the sampled mode.
+    access_log_sample_rate: float = 0.1
+    # Requests slower than this many seconds are logged in the errors mode.
+    access_log_slow_threshold: float = 1.0
+    # Seconds between per-route aggregates in the aggregate mode.
+    access_log_aggregate_interval: float = 10.0
+    # Responses compressed with gzip, or brotli if it's installed.
+    compression_enabled: bool = True
+    # Smaller responses are sent as they are, compressing them isn't worth the CPU.
+    compression_minimum_size: int = 1024
+    # Levels used while the worker has spare CPU.
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    # Share of a CPU used by a worker above which responses are compressed
+    # with the fastest levels, so compression doesn't starve requests. 0 disables.
+    compression_busy_cpu: float = 0.8
+    # Completed tasks unchanged for this many days are moved
+    # into the archive table by every worker. 0 disables archival.
+    archive_after_days: int = 30
+    # Seconds between runs of the archival job.
+    archive_interval: float = 3600.0
+    # Tasks moved in a transaction.
+    archive_batch_size: int = 500
+    # Share of time the job spends moving tasks, it sleeps between batches
+    # for the rest, so it doesn't compete with requests for the database.
+    archive_duty_cycle: float = 0.1
     users_secret: str = os.getenv("USERS_SECRET", "")
+    # Threads of a worker hashing and verifying passwords, so at most this
+    # many logins or registrations of a worker hash at once and the rest
+    # waits in the queue, while the event loop keeps serving other requests.
+    password_hash_workers: int = 2
     # Variables for the database
     db_host: str = "localhost"
     db_port: int = 5432
@@ -55,6 +153,16 @@ class Settings(BaseSettings):
     redis_user: Optional[str] = None
     redis_pass: Optional[str] = None
     redis_base: Optional[int] = None
+    # Upper bound of connections opened by a single worker.
+    redis_max_connections: int = 50
+    # Seconds to wait for a free connection before giving up.
+    redis_pool_timeout: float = 5.0
+    redis_socket_timeout: Optional[float] = 5.0
+    redis_socket_connect_timeout: Optional[float] = 5.0
+    # Idle connections are pinged if unused for this many seconds.
+    redis_health_check_interval: int = 30
+    # Retries with exponential backoff for failed commands.
+    redis_retry_attempts: int = 3
 
     # Variables for RabbitMQ
     rabbit_host: str = "task_manager-rmq"
@@ -66,13 +174,82 @@ class Settings(BaseSettings):
     rabbit_pool_size: int = 2
     rabbit_channel_pool_size: int = 10
 
+    # Rate limiting, shared by all workers through redis.
+    rate_limit_enabled: bool = True
+    # Length of the sliding window in seconds.
+    rate_limit_window: float = 60
+    # Requests per window for a single user on task routes.
+    rate_limit_tasks: int = 600
+    # Requests per window for a single client address on auth routes.
+    rate_limit_auth: int = 30
+    # Permits a worker reserves per redis round trip.
+    rate_limit_lease: int = 10
+
+    # Idempotency-Key support for task creation.
+    # Seconds a stored response is replayed for.
+    idempotency_ttl: int = 24 * 60 * 60
+    # Seconds a request holds its key while it is processed.
+    idempotency_lock_ttl: float = 10
+    # Seconds a concurrent duplicate waits for the first response.
+    idempotency_wait_timeout: float = 5
+
     # Sentry's configuration.
     sentry_dsn: Optional[str] = None
     sentry_sample_rate: float = 1.0
 
+    # Seconds results of readiness checks are reused for.
+    readiness_cache_ttl: float = 2.0
+    # Seconds a single readiness check may take.
+    readiness_check_timeout: float = 1.0
+
+    # Profiling of requests, nothing is profiled if disabled.
+    profiling_enabled: bool = False
+    # Fraction of requests profiled.
+    profiling_sample_rate: float = 0.0
+    # Superusers send this header to profile their request.
+    profiling_header: str = "X-Profile"
+    # Directory for pstats dumps of profiles, they're only logged if unset.
+    profiling_dir: Optional[Path] = None
+
+    # Directory shared by gunicorn workers to aggregate metrics.
+    prometheus_dir: Path = TEMP_DIR / "prom"
+    # Seconds between flushes of worker metrics into prometheus_dir.
+    metrics_flush_interval: float = 5.0
+
     # Grpc endpoint for opentelemetry.
     # E.G. http://localhost:4317
     opentelemetry_endpoint: Optional[str] = None
+    # Fraction of traces sampled, child spans follow decision of their parent.
+    opentelemetry_sample_ratio: float = 1.0
+    # Export traces that weren't sampled if any of their spans failed.
+    opentelemetry_sample_errors: bool = True
+    # Export traces that weren't sampled if they took longer than this
+    # many seconds. Both rules record spans of unsampled traces.
+    opentelemetry_slow_threshold: Optional[float] = 1.0
+    # Spans buffered for export, newer ones are dropped when full.
+    opentelemetry_max_queue_size: int = 2048
+    # Spans sent in a single export.
+    opentelemetry_max_export_batch_size: int = 512
+    # Seconds between exports.
+    opentelemetry_export_interval: float = 5.0
+
+    @property
+    def workers(self) -> int:
+        """
+        Number of workers to start.
+
+        :return: workers_count, or the number of available CPUs if it's 0.
+        """
+        return self.workers_count or available_cpus()
+
+    @property
+    def uvicorn_access_log(self) -> bool:
+        """
+        Whether uvicorn logs requests itself.
+
+        :return: true for the full and the sampled access log modes.
+        """
+        return self.access_log_mode in {AccessLogMode.FULL, AccessLogMode.SAMPLED}
 
     @property
     def db_url(self) -> URL:
@@ -5,10 +5,22 @@ from fastapi.openapi.docs import (
     get_swagger_ui_oauth2_redirect_html,
 )
 from fastapi.responses import HTMLResponse
+from starlette.responses import Response
 
 router = APIRouter()
 
 
+@router.get("/openapi.json", include_in_schema=False, name="openapi")
+async def openapi(request: Request) -> Response:
+    """
+    OpenAPI schema, generated once when the app is built.
+
+    :param request: current request.
+    :return: compressed schema, or 304 if the client has it.
+    """
+    return request.app.state.openapi.response(request.headers)
+
+
 @router.get("/docs", include_in_schema=False)
 async def swagger_ui_html(request: Request) -> HTMLResponse:
     """
@@ -0,0 +1,114 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+from aio_pika import Channel
+from aio_pika.pool import Pool
+from redis.asyncio import ConnectionPool, Redis
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from task_manager.settings import settings
+from task_manager.web.api.monitoring.schema import CheckResultDTO
+
+Check = Callable[[], Awaitable[None]]
+
+
+async def check_database(engine: AsyncEngine) -> None:
+    """
+    Check that the database accepts queries.
+
+    The check uses a connection of its own, not the session of the request,
+    so a timed out query isn't committed with the request afterwards.
+
+    :param engine: database engine.
+    """
+    async with engine.connect() as conn:
+        try:
+            await conn.execute(text("SELECT 1"))
+        except asyncio.CancelledError:
+            # State of a connection with a cancelled query is unknown.
+            await conn.invalidate()
+            raise
+
+
+async def check_redis(redis_pool: ConnectionPool) -> None:
+    """
+    Check that redis responds to PING.
+
+    :param redis_pool: redis connection pool.
+    """
+    async with Redis(connection_pool=redis_pool) as redis:
+        await redis.ping()
+
+
+async def check_rabbit(channel_pool: Pool[Channel]) -> None:
+    """
+    Check that a rabbitmq channel can be acquired.
+
+    :param channel_pool: rabbitmq channel pool.
+    :raises ConnectionError: if the acquired channel is closed.
+    """
+    async with channel_pool.acquire() as channel:
+        if channel.is_closed:
+            raise ConnectionError("Channel is closed.")
+
+
+class ReadinessProbe:
+    """
+    Runs dependency checks concurrently and caches their results.
+
+    Results are reused for ``ttl`` seconds and concurrent probes
+    wait for a single round of checks, so the probe rate of a load
+    balancer doesn't translate into load on the backing services.
+    """
+
+    def __init__(
+        self,
+        ttl: float = settings.readiness_cache_ttl,
+        timeout: float = settings.readiness_check_timeout,
+    ) -> None:
+        self.ttl = ttl
+        self.timeout = timeout
+        self._results: dict[str, CheckResultDTO] = {}
+        self._expires_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def _run(self, check: Check) -> CheckResultDTO:
+        started = time.perf_counter()
+        detail: Optional[str] = None
+        try:
+            await asyncio.wait_for(check(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            status, detail = "timeout", f"No response in {self.timeout}s."
+        except Exception as exc:
+            status, detail = "error", repr(exc)
+        else:
+            status = "ok"
+        return CheckResultDTO(
+            status=status,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            detail=detail,
+        )
+
+    async def check(self, checks: dict[str, Check]) -> dict[str, CheckResultDTO]:
+        """
+        Results of the checks, run if the cached ones have expired.
+
+        :param checks: checks to run by name.
+        :returns: results of the checks by name.
+        """
+        if time.monotonic() < self._expires_at:
+            return self._results
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if time.monotonic() < self._expires_at:
+                return self._results
+            results = await asyncio.gather(*map(self._run, checks.values()))
+            self._results = dict(zip(checks, results))
+            self._expires_at = time.monotonic() + self.ttl
+        return self._results
+
+
+readiness_probe = ReadinessProbe()
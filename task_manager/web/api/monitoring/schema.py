@@ -0,0 +1,40 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class RedisPoolStatsDTO(BaseModel):
+    """Connection usage and acquisition wait times of the redis pool."""
+
+    max_connections: int
+    in_use: int
+    available: int
+    created: int
+    acquired_total: int
+    acquire_errors_total: int
+    wait_seconds_total: float
+    wait_seconds_avg: float
+    wait_seconds_max: float
+
+
+class SingleFlightStatsDTO(BaseModel):
+    """Counters of coalesced concurrent reads."""
+
+    in_flight: int
+    executed_total: int
+    coalesced_total: int
+
+
+class CheckResultDTO(BaseModel):
+    """Result of a single dependency check."""
+
+    status: str
+    latency_ms: float
+    detail: Optional[str] = None
+
+
+class ReadinessDTO(BaseModel):
+    """Readiness of the worker to serve requests."""
+
+    ready: bool
+    checks: dict[str, CheckResultDTO]
@@ -1,5 +1,25 @@
-from fastapi import APIRouter
-from starlette.responses import JSONResponse
+from functools import partial
+
+from aio_pika import Channel
+from aio_pika.pool import Pool
+from fastapi import APIRouter, Depends, Request
+from prometheus_client import CONTENT_TYPE_LATEST
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.responses import JSONResponse, Response
+
+from task_manager.db.dao.task_dao import task_list_reads
+from task_manager.db.dependencies import get_db_engine
+from task_manager.services.metrics.lifespan import update_pool_gauges
+from task_manager.services.metrics.recorder import render_latest
+from task_manager.services.rabbit.dependencies import get_rmq_channel_pool
+from task_manager.services.redis.dependency import get_redis_pool
+from task_manager.services.redis.pool import InstrumentedBlockingConnectionPool
+from task_manager.web.api.monitoring import readiness
+from task_manager.web.api.monitoring.schema import (
+    ReadinessDTO,
+    RedisPoolStatsDTO,
+    SingleFlightStatsDTO,
+)
 
 router = APIRouter()
 
@@ -13,3 +33,78 @@ def health_check() -> JSONResponse:
     """
 
     return JSONResponse(status_code=200, content={"message": "Project is healthy"})
+
+
+@router.get(
+    "/ready",
+    response_model=ReadinessDTO,
+    responses={503: {"model": ReadinessDTO}},
+)
+async def readiness_check(
+    engine: AsyncEngine = Depends(get_db_engine),
+    redis_pool: InstrumentedBlockingConnectionPool = Depends(get_redis_pool),
+    channel_pool: Pool[Channel] = Depends(get_rmq_channel_pool),
+) -> JSONResponse:
+    """
+    Checks that the worker can reach its dependencies.
+
+    Database, redis and rabbitmq are checked concurrently, each with
+    its own timeout, and results are cached for a short interval.
+    Unlike ``/health`` it returns 503 if any of them is unavailable.
+
+    :param engine: database engine.
+    :param redis_pool: redis connection pool.
+    :param channel_pool: rabbitmq channel pool.
+    :returns: result of every check.
+    """
+    checks = await readiness.readiness_probe.check(
+        {
+            "database": partial(readiness.check_database, engine),
+            "redis": partial(readiness.check_redis, redis_pool),
+            "rabbitmq": partial(readiness.check_rabbit, channel_pool),
+        },
+    )
+    ready = all(check.status == "ok" for check in checks.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content=ReadinessDTO(ready=ready, checks=checks).model_dump(),
+    )
+
+
+@router.get("/redis-pool", response_model=RedisPoolStatsDTO)
+async def redis_pool_stats(
+    redis_pool: InstrumentedBlockingConnectionPool = Depends(get_redis_pool),
+) -> RedisPoolStatsDTO:
+    """
+    Usage of the redis connection pool in the current worker.
+
+    :param redis_pool: redis connection pool.
+    :returns: in-use/available connections and acquisition wait times.
+    """
+    return RedisPoolStatsDTO.model_validate(redis_pool.stats())
+
+
+@router.get("/task-reads", response_model=SingleFlightStatsDTO)
+async def task_reads_stats() -> SingleFlightStatsDTO:
+    """
+    Coalescing of identical task list reads in the current worker.
+
+    :returns: executed and coalesced read counters.
+    """
+    return SingleFlightStatsDTO.model_validate(task_list_reads.stats())
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(request: Request) -> Response:
+    """
+    Metrics in prometheus text format.
+
+    Request counters and latency histograms are aggregated
+    across all gunicorn workers. Metrics of the worker are recorded
+    on the event loop, so they are rendered there too.
+
+    :param request: current request.
+    :returns: rendered metrics.
+    """
+    update_pool_gauges(request.app)
+    return Response(render_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -2,6 +2,7 @@ from fastapi import Depends
 from fastapi.routing import APIRouter
 
 from task_manager.db.models.users import current_active_user
+from task_manager.services.rate_limit.dependencies import rate_limit_user
 from task_manager.web.api import (
     docs,
     dummy,
@@ -21,7 +22,7 @@ api_router.include_router(
     task.router,
     prefix="/tasks",
     tags=["Tasks"],
-    dependencies=[Depends(current_active_user)],
+    dependencies=[Depends(current_active_user), Depends(rate_limit_user)],
     responses={404: {"description": "Not Found"}},
 )
 api_router.include_router(
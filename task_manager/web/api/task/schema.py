@@ -1,7 +1,11 @@
 import datetime
 import uuid
+from typing import List, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+# Most tasks a bulk update selects by id.
+MAX_BULK_IDS = 1000
 
 
 class TaskPydModelInputDTO(BaseModel):
@@ -29,6 +33,59 @@ class TaskPydModelDTO(TaskPydModelInputDTO):
     id: uuid.UUID
     completed: bool = False
     created_at: datetime.datetime
+    updated_at: datetime.datetime
     user_id: uuid.UUID
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class TaskPydModelFilterDTO(BaseModel):
+    """DTO for selecting tasks of a bulk update by their fields."""
+
+    completed: Optional[bool] = None
+    # Continues a previous update, which had more tasks to update.
+    after: Optional[uuid.UUID] = None
+
+    @model_validator(mode="after")
+    def check_fields(self) -> "TaskPydModelFilterDTO":
+        """
+        Require a field to select tasks by.
+
+        :returns: validated model.
+        :raises ValueError: if the filter would select all tasks.
+        """
+        if self.completed is None:
+            raise ValueError("Filter must select tasks by at least one field.")
+        return self
+
+
+class TaskPydModelBulkUpdateDTO(BaseModel):
+    """DTO for updating many tasks at once."""
+
+    ids: Optional[List[uuid.UUID]] = Field(default=None, max_length=MAX_BULK_IDS)
+    filter: Optional[TaskPydModelFilterDTO] = None
+    changes: TaskPydModelUpdateDTO
+
+    @model_validator(mode="after")
+    def check_selection(self) -> "TaskPydModelBulkUpdateDTO":
+        """
+        Require either ids or a filter, and at least one change.
+
+        :returns: validated model.
+        :raises ValueError: if tasks or changes aren't given.
+        """
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Either ids or filter must be given.")
+        changes = self.changes
+        if not (changes.title or changes.description or changes.completed is not None):
+            raise ValueError("At least one change must be given.")
+        return self
+
+
+class TaskPydModelBulkUpdateResultDTO(BaseModel):
+    """DTO for the result of a bulk update."""
+
+    updated: List[uuid.UUID]
+    not_found: List[uuid.UUID]
+    # More tasks match the filter, continue after the last updated id.
+    more: bool = False
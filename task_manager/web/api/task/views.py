@@ -1,14 +1,26 @@
+import datetime
 import uuid
 from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException
 from fastapi.param_functions import Depends
+from redis.asyncio import ConnectionPool
 from starlette import status
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
 from task_manager.db.dao.task_dao import TaskDAO
 from task_manager.db.models.users import UserDBModel, current_active_user
+from task_manager.services.idempotency.store import (
+    IdempotencyKeyInProgressError,
+    IdempotencyKeyReusedError,
+    IdempotencyStore,
+    fingerprint,
+)
+from task_manager.services.redis.dependency import get_redis_pool
 from task_manager.web.api.task.schema import (
+    MAX_BULK_IDS,
+    TaskPydModelBulkUpdateDTO,
+    TaskPydModelBulkUpdateResultDTO,
     TaskPydModelDTO,
     TaskPydModelInputDTO,
     TaskPydModelUpdateDTO,
@@ -24,6 +36,8 @@ async def get_task_models(
     task_dao: TaskDAO = Depends(),
     current_user: UserDBModel = Depends(current_active_user),
     completed: bool | None = None,
+    updated_since: datetime.datetime | None = None,
+    include_archived: bool = False,
 ) -> List[TaskPydModelDTO]:
     """
     Retrieve all tasks for the current user.
@@ -31,6 +45,9 @@ async def get_task_models(
     - **limit**: The maximum number of tasks to return (default is 10).
     - **page**: The page number to retrieve (default is 1).
     - **completed**: Filter tasks based on completion status (`True` or `False`).
+    - **updated_since**: Only tasks created or changed after this time,
+      oldest change first.
+    - **include_archived**: Include completed tasks moved into the archive.
 
     Returns a list of tasks for the authenticated user.
     """
@@ -40,6 +57,8 @@ async def get_task_models(
         limit=limit,
         page=page,
         completed=completed,
+        updated_since=updated_since,
+        include_archived=include_archived,
     )
     return [TaskPydModelDTO.model_validate(task) for task in tasks]
 
@@ -75,22 +94,103 @@ async def create_task_model(
     new_task_object: TaskPydModelInputDTO,
     task_dao: TaskDAO = Depends(),
     current_user: UserDBModel = Depends(current_active_user),
-) -> TaskPydModelDTO:
+    redis_pool: ConnectionPool = Depends(get_redis_pool),
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
+) -> Response | TaskPydModelDTO:
     """
     Create a new task.
 
     - **title**: The title of the task.
     - **description**: A detailed description of the task.
+    - **Idempotency-Key**: (Optional) Header identifying the request. Retries
+      with the same key return the first response instead of creating a task.
 
     Returns the newly created task.
+    Returns a 409 error if a request with the same key is still in progress
+    and a 422 error if the key was used with a different payload.
     """
 
-    task_db_model = await task_dao.create_task(
+    if idempotency_key is None:
+        task_db_model = await task_dao.create_task(
+            user_id=current_user.id,
+            title=new_task_object.title,
+            description=new_task_object.description,
+        )
+        return TaskPydModelDTO.model_validate(task_db_model)
+
+    store = IdempotencyStore(redis_pool, scope=f"tasks:{current_user.id}")
+    request_fingerprint = fingerprint(new_task_object.model_dump_json())
+    try:
+        body = await store.begin(idempotency_key, request_fingerprint)
+    except IdempotencyKeyReusedError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different payload.",
+        ) from None
+    except IdempotencyKeyInProgressError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is in progress.",
+        ) from None
+
+    if body is None:
+        try:
+            task_db_model = await task_dao.create_task(
+                user_id=current_user.id,
+                title=new_task_object.title,
+                description=new_task_object.description,
+            )
+        except BaseException:
+            await store.abort(idempotency_key)
+            raise
+        body = TaskPydModelDTO.model_validate(task_db_model).model_dump_json()
+        await store.complete(idempotency_key, request_fingerprint, body)
+
+    return Response(
+        content=body,
+        status_code=status.HTTP_201_CREATED,
+        media_type="application/json",
+    )
+
+
+@router.patch("/bulk", response_model=TaskPydModelBulkUpdateResultDTO)
+async def update_task_models(
+    bulk_update: TaskPydModelBulkUpdateDTO,
+    task_dao: TaskDAO = Depends(),
+    current_user: UserDBModel = Depends(current_active_user),
+) -> TaskPydModelBulkUpdateResultDTO:
+    """
+    Update many tasks at once.
+
+    - **ids**: (Optional) UUIDs of the tasks to update, at most 1000.
+    - **filter**: (Optional) Update tasks matching it instead,
+      e.g. `{"completed": false}`, at most 1000 in order of their UUIDs.
+      If `more` is returned, repeat the request with `after` set
+      to the last updated UUID.
+    - **changes**: New title, description or completion status of the tasks.
+
+    Returns the UUIDs of updated tasks, and of the given ones which weren't found.
+    """
+
+    changes = bulk_update.changes
+    task_filter = bulk_update.filter
+    updated, more = await task_dao.update_tasks(
         user_id=current_user.id,
-        title=new_task_object.title,
-        description=new_task_object.description,
+        ids=bulk_update.ids,
+        filter_completed=task_filter.completed if task_filter else None,
+        after=task_filter.after if task_filter else None,
+        limit=MAX_BULK_IDS if task_filter else None,
+        title=changes.title,
+        description=changes.description,
+        completed=changes.completed,
+    )
+    found = set(updated)
+    not_found = [task_id for task_id in bulk_update.ids or [] if task_id not in found]
+    return TaskPydModelBulkUpdateResultDTO(
+        updated=updated,
+        not_found=list(dict.fromkeys(not_found)),
+        more=more,
     )
-    return TaskPydModelDTO.model_validate(task_db_model)
 
 
 @router.patch("/{task_id}", status_code=200, response_model=Optional[TaskPydModelDTO])
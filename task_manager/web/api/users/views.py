@@ -1,4 +1,4 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
 from task_manager.db.models.users import (
     UserCreate,  # type: ignore
@@ -8,6 +8,7 @@ from task_manager.db.models.users import (
     auth_cookie,  # type: ignore
     auth_jwt,  # type: ignore
 )
+from task_manager.services.rate_limit.dependencies import rate_limit_ip
 
 router = APIRouter()
 
@@ -15,18 +16,21 @@ router.include_router(
     api_users.get_register_router(UserRead, UserCreate),
     prefix="/auth",
     tags=["auth"],
+    dependencies=[Depends(rate_limit_ip)],
 )
 
 router.include_router(
     api_users.get_reset_password_router(),
     prefix="/auth",
     tags=["auth"],
+    dependencies=[Depends(rate_limit_ip)],
 )
 
 router.include_router(
     api_users.get_verify_router(UserRead),
     prefix="/auth",
     tags=["auth"],
+    dependencies=[Depends(rate_limit_ip)],
 )
 
 router.include_router(
@@ -38,9 +42,11 @@ router.include_router(
     api_users.get_auth_router(auth_jwt),
     prefix="/auth/jwt",
     tags=["auth"],
+    dependencies=[Depends(rate_limit_ip)],
 )
 router.include_router(
     api_users.get_auth_router(auth_cookie),
     prefix="/auth/cookie",
     tags=["auth"],
+    dependencies=[Depends(rate_limit_ip)],
 )
@@ -1,16 +1,23 @@
+import json
 import logging
 from importlib import metadata
 from pathlib import Path
 
-import sentry_sdk
 from fastapi import FastAPI
 from fastapi.responses import UJSONResponse
-from fastapi.staticfiles import StaticFiles
-from sentry_sdk.integrations.fastapi import FastApiIntegration
-from sentry_sdk.integrations.logging import LoggingIntegration
-from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
 
 from task_manager.log import configure_logging
+from task_manager.services.access_log.middleware import AccessLogMiddleware
+from task_manager.services.access_log.recorder import build_access_log
+from task_manager.services.compression.assets import (
+    CompressedAsset,
+    CompressedStaticFiles,
+)
+from task_manager.services.compression.middleware import CompressionMiddleware
+from task_manager.services.drain.coordinator import ShutdownCoordinator
+from task_manager.services.drain.middleware import DrainMiddleware
+from task_manager.services.metrics.middleware import MetricsMiddleware
+from task_manager.services.profiling.middleware import ProfilingMiddleware
 from task_manager.settings import settings
 from task_manager.web.api.router import api_router
 from task_manager.web.lifespan import lifespan_setup
@@ -18,6 +25,34 @@ from task_manager.web.lifespan import lifespan_setup
 APP_ROOT = Path(__file__).parent.parent
 
 
+def setup_sentry() -> None:  # pragma: no cover
+    """
+    Enables sentry integration.
+
+    Sentry is imported only if it's configured, it takes a while to import.
+    """
+    import sentry_sdk
+    from sentry_sdk.integrations.fastapi import FastApiIntegration
+    from sentry_sdk.integrations.logging import LoggingIntegration
+    from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+
+    sentry_sdk.init(
+        dsn=settings.sentry_dsn,
+        traces_sample_rate=settings.sentry_sample_rate,
+        environment=settings.environment,
+        integrations=[
+            FastApiIntegration(transaction_style="endpoint"),
+            LoggingIntegration(
+                level=logging.getLevelName(
+                    settings.log_level.value,
+                ),
+                event_level=logging.ERROR,
+            ),
+            SqlalchemyIntegration(),
+        ],
+    )
+
+
 def get_app() -> FastAPI:
     """
     Get FastAPI application.
@@ -28,36 +63,64 @@ def get_app() -> FastAPI:
     """
     configure_logging()
     if settings.sentry_dsn:
-        # Enables sentry integration.
-        sentry_sdk.init(
-            dsn=settings.sentry_dsn,
-            traces_sample_rate=settings.sentry_sample_rate,
-            environment=settings.environment,
-            integrations=[
-                FastApiIntegration(transaction_style="endpoint"),
-                LoggingIntegration(
-                    level=logging.getLevelName(
-                        settings.log_level.value,
-                    ),
-                    event_level=logging.ERROR,
-                ),
-                SqlalchemyIntegration(),
-            ],
-        )
+        setup_sentry()
     app = FastAPI(
         title="task_manager",
         version=metadata.version("task_manager"),
         lifespan=lifespan_setup,
         docs_url=None,
         redoc_url=None,
-        openapi_url="/api/openapi.json",
+        # Served by the docs router, see below.
+        openapi_url=None,
         default_response_class=UJSONResponse,
     )
 
+    # Compresses large responses, precompressed ones are sent as they are.
+    if settings.compression_enabled:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_minimum_size,
+            gzip_level=settings.compression_gzip_level,
+            brotli_quality=settings.compression_brotli_quality,
+            busy_cpu=settings.compression_busy_cpu,
+        )
+    # Records count, errors and latency of requests.
+    app.add_middleware(MetricsMiddleware)
+    # Logs failed and slow requests or per-route aggregates
+    # in modes where uvicorn doesn't log requests itself.
+    app.state.access_log = build_access_log(settings.access_log_mode)
+    if app.state.access_log is not None:
+        app.add_middleware(AccessLogMiddleware, access_log=app.state.access_log)
+    # Profiles sampled requests and requests of superusers
+    # that send the profiling header.
+    if settings.profiling_enabled:
+        app.add_middleware(
+            ProfilingMiddleware,
+            sample_rate=settings.profiling_sample_rate,
+            header=settings.profiling_header,
+            directory=settings.profiling_dir,
+        )
+
+    # Rejects new requests once the worker starts shutting down
+    # and lets the lifespan wait for requests in flight.
+    app.state.shutdown = ShutdownCoordinator(settings.shutdown_timeout)
+    app.add_middleware(DrainMiddleware, coordinator=app.state.shutdown)
+
     # Main router for the API.
     app.include_router(router=api_router, prefix="/api")
+    # The schema is generated and compressed once, instead of being
+    # serialised on every request. With preload it's built by the master.
+    app.openapi_url = "/api/openapi.json"
+    app.state.openapi = CompressedAsset(
+        json.dumps(app.openapi(), ensure_ascii=False, separators=(",", ":")).encode(),
+        "application/json",
+    )
     # Adds static directory.
     # This directory is used to access swagger files.
-    app.mount("/static", StaticFiles(directory=APP_ROOT / "static"), name="static")
+    app.mount(
+        "/static",
+        CompressedStaticFiles(directory=APP_ROOT / "static"),
+        name="static",
+    )
 
     return app
@@ -1,23 +1,16 @@
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
 from typing import AsyncGenerator
 
 from fastapi import FastAPI
-from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
-from opentelemetry.instrumentation.aio_pika import AioPikaInstrumentor
-from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-from opentelemetry.instrumentation.redis import RedisInstrumentor
-from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
-from opentelemetry.sdk.resources import (
-    DEPLOYMENT_ENVIRONMENT,
-    SERVICE_NAME,
-    TELEMETRY_SDK_LANGUAGE,
-    Resource,
-)
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.trace import set_tracer_provider
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
+from task_manager.services.access_log.lifespan import (
+    init_access_log,
+    shutdown_access_log,
+)
+from task_manager.services.archive.lifespan import init_archive, shutdown_archive
+from task_manager.services.drain.lifespan import init_drain, shutdown_drain
+from task_manager.services.metrics.lifespan import init_metrics, shutdown_metrics
 from task_manager.services.rabbit.lifespan import init_rabbit, shutdown_rabbit
 from task_manager.services.redis.lifespan import init_redis, shutdown_redis
 from task_manager.settings import settings
@@ -46,32 +39,36 @@ def setup_opentelemetry(app: FastAPI) -> None:  # pragma: no cover
     """
     Enables opentelemetry instrumentation.
 
+    The SDK, the exporter and instrumentors are imported only
+    if tracing is configured, they take a while to import.
+
     :param app: current application.
     """
     if not settings.opentelemetry_endpoint:
         return
 
-    tracer_provider = TracerProvider(
-        resource=Resource(
-            attributes={
-                SERVICE_NAME: "task_manager",
-                TELEMETRY_SDK_LANGUAGE: "python",
-                DEPLOYMENT_ENVIRONMENT: settings.environment,
-            },
-        ),
+    from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import (
+        OTLPSpanExporter,
     )
-
-    tracer_provider.add_span_processor(
-        BatchSpanProcessor(
-            OTLPSpanExporter(
-                endpoint=settings.opentelemetry_endpoint,
-                insecure=True,
-            ),
+    from opentelemetry.instrumentation.aio_pika import AioPikaInstrumentor
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+    from opentelemetry.instrumentation.redis import RedisInstrumentor
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+    from opentelemetry.trace import set_tracer_provider
+
+    from task_manager.services.tracing.provider import create_tracer_provider
+
+    tracer_provider = create_tracer_provider(
+        OTLPSpanExporter(
+            endpoint=settings.opentelemetry_endpoint,
+            insecure=True,
         ),
     )
 
     excluded_endpoints = [
         app.url_path_for("health_check"),
+        app.url_path_for("readiness_check"),
+        app.url_path_for("metrics"),
         app.url_path_for("openapi"),
         app.url_path_for("swagger_ui_html"),
         app.url_path_for("swagger_ui_redirect"),
@@ -95,6 +92,21 @@ def setup_opentelemetry(app: FastAPI) -> None:  # pragma: no cover
     )
 
     set_tracer_provider(tracer_provider=tracer_provider)
+    app.state.tracer_provider = tracer_provider
+
+
+def flush_opentelemetry(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Exports finished spans.
+
+    :param app: current application.
+    """
+    if not settings.opentelemetry_endpoint:
+        return
+
+    app.state.tracer_provider.force_flush(
+        timeout_millis=int(settings.opentelemetry_export_interval * 1000),
+    )
 
 
 def stop_opentelemetry(app: FastAPI) -> None:  # pragma: no cover
@@ -106,10 +118,16 @@ def stop_opentelemetry(app: FastAPI) -> None:  # pragma: no cover
     if not settings.opentelemetry_endpoint:
         return
 
+    from opentelemetry.instrumentation.aio_pika import AioPikaInstrumentor
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+    from opentelemetry.instrumentation.redis import RedisInstrumentor
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+
     FastAPIInstrumentor().uninstrument_app(app)
     RedisInstrumentor().uninstrument()
     SQLAlchemyInstrumentor().uninstrument()
     AioPikaInstrumentor().uninstrument()
+    app.state.tracer_provider.shutdown()
 
 
 @asynccontextmanager
@@ -127,15 +145,28 @@ async def lifespan_setup(
     """
 
     app.middleware_stack = None
-    _setup_db(app)
-    setup_opentelemetry(app)
-    init_redis(app)
-    init_rabbit(app)
-    app.middleware_stack = app.build_middleware_stack()
-
-    yield
-    await app.state.db_engine.dispose()
-
-    await shutdown_redis(app)
-    await shutdown_rabbit(app)
-    stop_opentelemetry(app)
+    # Services are stopped in reverse order of their start,
+    # even if stopping one of them fails.
+    async with AsyncExitStack() as stack:
+        _setup_db(app)
+        stack.push_async_callback(app.state.db_engine.dispose)
+        setup_opentelemetry(app)
+        stack.callback(stop_opentelemetry, app)
+        init_redis(app)
+        stack.push_async_callback(shutdown_redis, app)
+        init_rabbit(app)
+        stack.push_async_callback(shutdown_rabbit, app)
+        init_metrics(app)
+        stack.push_async_callback(shutdown_metrics, app)
+        init_access_log(app)
+        stack.push_async_callback(shutdown_access_log, app)
+        init_archive(app)
+        stack.push_async_callback(shutdown_archive, app)
+        init_drain(app)
+        app.middleware_stack = app.build_middleware_stack()
+
+        yield
+        # Requests in flight and background tasks still use the pools,
+        # spans they produced are exported before pools are closed.
+        await shutdown_drain(app)
+        flush_opentelemetry(app)
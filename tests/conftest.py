@@ -1,5 +1,6 @@
 import uuid
-from typing import Any, AsyncGenerator
+from contextlib import contextmanager
+from typing import Any, AsyncGenerator, Generator, Iterator
 from unittest.mock import Mock
 
 import pytest
@@ -11,6 +12,7 @@ from fakeredis.aioredis import FakeConnection
 from fastapi import FastAPI
 from httpx import AsyncClient
 from redis.asyncio import ConnectionPool
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -19,12 +21,13 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from task_manager.db.dao.user_dao import UserDAO
-from task_manager.db.dependencies import get_db_session
+from task_manager.db.dependencies import get_db_engine, get_db_session
 from task_manager.db.models.users import UserCreate, UserDBModel
 from task_manager.db.utils import create_database, drop_database
 from task_manager.services.rabbit.dependencies import get_rmq_channel_pool
 from task_manager.services.rabbit.lifespan import init_rabbit, shutdown_rabbit
 from task_manager.services.redis.dependency import get_redis_pool
+from task_manager.services.redis.pool import InstrumentedBlockingConnectionPool
 from task_manager.settings import settings
 from task_manager.web.application import get_app
 
@@ -94,6 +97,58 @@ async def dbsession(
         await connection.close()
 
 
+class QueryCounter:
+    """SQL statements executed by the engine during a test."""
+
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+        self.parameters: list[Any] = []
+
+    def __call__(self, *args: Any) -> None:
+        """
+        Record a statement, called by ``before_cursor_execute`` event.
+
+        :param args: connection, cursor, statement, parameters, context
+            and executemany flag.
+        """
+        self.statements.append(args[2])
+        self.parameters.append(args[3])
+
+    @contextmanager
+    def assert_max(self, limit: int) -> Iterator[list[str]]:
+        """
+        Fail if the block executes more statements than the limit.
+
+        :param limit: allowed number of statements.
+        :yields: statements executed within the block.
+        """
+        start = len(self.statements)
+        executed: list[str] = []
+        yield executed
+        executed.extend(self.statements[start:])
+        assert len(executed) <= limit, (
+            f"{len(executed)} statements executed, at most {limit} expected:\n"
+            + "\n".join(executed)
+        )
+
+
+@pytest.fixture
+def query_counter(dbsession: AsyncSession) -> Generator[QueryCounter, None, None]:
+    """
+    Count SQL statements executed through the test session.
+
+    :param dbsession: session used by the app in tests.
+    :yields: counter of statements.
+    """
+    counter = QueryCounter()
+    sync_engine = dbsession.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", counter)
+
+
 @pytest.fixture
 async def test_rmq_pool() -> AsyncGenerator[Channel, None]:
     """
@@ -183,7 +238,12 @@ async def fake_redis_pool() -> AsyncGenerator[ConnectionPool, None]:
     """
     server = FakeServer()
     server.connected = True
-    pool = ConnectionPool(connection_class=FakeConnection, server=server)
+    pool = InstrumentedBlockingConnectionPool(
+        connection_class=FakeConnection,
+        server=server,
+        max_connections=10,
+        timeout=1,
+    )
 
     yield pool
 
@@ -206,6 +266,7 @@ async def test_user(dbsession: AsyncSession) -> UserDBModel:
 
 @pytest.fixture
 async def fastapi_app(
+    _engine: AsyncEngine,
     dbsession: AsyncSession,
     fake_redis_pool: ConnectionPool,
     test_rmq_pool: Pool[Channel],
@@ -216,6 +277,7 @@ async def fastapi_app(
     :return: fastapi app with mocked dependencies.
     """
     application = get_app()
+    application.dependency_overrides[get_db_engine] = lambda: _engine
     application.dependency_overrides[get_db_session] = lambda: dbsession
     application.dependency_overrides[get_redis_pool] = lambda: fake_redis_pool
     application.dependency_overrides[get_rmq_channel_pool] = lambda: test_rmq_pool
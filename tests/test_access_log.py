@@ -0,0 +1,93 @@
+from typing import Any
+
+import pytest
+from loguru import logger
+from starlette.types import Receive, Scope, Send
+
+from task_manager.services.access_log.middleware import AccessLogMiddleware
+from task_manager.services.access_log.recorder import (
+    AggregatedAccessLog,
+    ErrorsAccessLog,
+)
+
+
+@pytest.fixture
+def records() -> Any:
+    """
+    Collects records logged with loguru.
+
+    :yields: list of logged records.
+    """
+    logged: list[dict[str, Any]] = []
+    handler_id = logger.add(lambda message: logged.append(message.record))
+    yield logged
+    logger.remove(handler_id)
+
+
+def _scope(path: str = "/api/tasks/abc") -> Scope:
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "client": ("127.0.0.1", 50000),
+    }
+
+
+def test_errors_mode(records: list[dict[str, Any]]) -> None:
+    """Tests that only failed and slow requests are logged."""
+    access_log = ErrorsAccessLog(slow_threshold=0.5)
+
+    access_log.record(_scope(), 200, 0.01)
+    access_log.record(_scope(), 404, 0.01)
+    access_log.record(_scope(), 503, 0.01)
+    access_log.record(_scope(), 200, 0.7)
+
+    assert [record["level"].name for record in records] == ["ERROR", "WARNING"]
+    assert records[0]["message"] == (
+        '127.0.0.1:50000 - "GET /api/tasks/abc" 503 10.0ms'
+    )
+    assert records[1]["extra"]["duration_ms"] == 700
+
+
+def test_aggregate_mode(records: list[dict[str, Any]]) -> None:
+    """Tests that routes are logged with count and percentiles."""
+    access_log = AggregatedAccessLog()
+    for index in range(1, 101):
+        access_log.record(_scope(), 200 if index > 1 else 500, index / 1000)
+
+    access_log.flush()
+    access_log.flush()
+
+    (record,) = records
+    assert record["extra"]["count"] == 100
+    assert record["extra"]["errors"] == 1
+    assert record["extra"]["route"] == "untemplated"
+    assert record["extra"]["p50_ms"] == pytest.approx(50)
+    assert record["extra"]["p99_ms"] == pytest.approx(99)
+
+
+@pytest.mark.anyio
+async def test_middleware_records_status_and_duration() -> None:
+    """Tests that the middleware passes responses to the access log."""
+    recorded: list[tuple[int, float]] = []
+
+    class AccessLogStub(AggregatedAccessLog):
+        def record(self, scope: Scope, status_code: int, duration: float) -> None:
+            recorded.append((status_code, duration))
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message: Any) -> None:
+        """Discards the message."""
+
+    async def receive() -> Any:
+        """Receives nothing."""
+
+    middleware = AccessLogMiddleware(app, AccessLogStub())
+    await middleware(_scope(), receive, send)
+
+    ((status_code, duration),) = recorded
+    assert status_code == 201
+    assert duration >= 0
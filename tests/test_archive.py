@@ -0,0 +1,173 @@
+import asyncio
+import datetime
+from typing import Any, Coroutine
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette import status
+
+from task_manager.db.dao.task_dao import TaskDAO
+from task_manager.db.models.users import UserDBModel, current_active_user
+from task_manager.services.archive.job import ArchiveJob
+from task_manager.services.drain.coordinator import ShutdownCoordinator
+
+
+class SleepRecorder:
+    """Records pauses of the job instead of sleeping."""
+
+    def __init__(self) -> None:
+        self.pauses: list[float] = []
+
+    async def __call__(self, seconds: float) -> None:
+        """
+        Record a pause.
+
+        :param seconds: requested pause.
+        """
+        self.pauses.append(seconds)
+
+
+async def backdate(dbsession: AsyncSession, titles: list[str], days: int) -> None:
+    """
+    Pretend tasks were last changed days ago.
+
+    :param dbsession: session of the test.
+    :param titles: titles of the tasks.
+    :param days: age of the last change.
+    """
+    await dbsession.execute(
+        text("ALTER TABLE task DISABLE TRIGGER task_set_updated_at"),
+    )
+    await dbsession.execute(
+        text(
+            "UPDATE task SET updated_at = now() - make_interval(days => :days) "
+            "WHERE title = ANY(:titles)",
+        ),
+        {"days": days, "titles": titles},
+    )
+    await dbsession.execute(text("ALTER TABLE task ENABLE TRIGGER task_set_updated_at"))
+
+
+@pytest.mark.anyio
+async def test_old_completed_tasks_are_archived(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    test_user: UserDBModel,
+) -> None:
+    """Tests that only old completed tasks move, and are still listed on request."""
+
+    # Define the override function
+    async def override_current_user() -> UserDBModel:
+        return test_user
+
+    fastapi_app.dependency_overrides[current_active_user] = override_current_user
+
+    task_dao = TaskDAO(dbsession)
+    for title in ("Old done", "Older done", "Recent done", "Old open"):
+        task = await task_dao.create_task(title, "Archival", test_user.id)
+        await task_dao.update_task(task, completed=title != "Old open")
+    await backdate(dbsession, ["Old done", "Older done", "Old open"], days=40)
+
+    sleep = SleepRecorder()
+    job = ArchiveJob(
+        async_sessionmaker(await dbsession.connection(), expire_on_commit=False),
+        older_than=datetime.timedelta(days=30),
+        batch_size=1,
+        duty_cycle=0.5,
+        sleep=sleep,
+    )
+    assert await job.run() == 2
+    # Full batches are followed by a pause, the last one finds nothing.
+    assert len(sleep.pauses) == 2
+    assert all(pause > 0 for pause in sleep.pauses)
+
+    url = fastapi_app.url_path_for("get_task_models")
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert sorted(task["title"] for task in response.json()) == [
+        "Old open",
+        "Recent done",
+    ]
+
+    response = await client.get(url, params={"include_archived": True})
+    assert response.status_code == status.HTTP_200_OK
+    assert sorted(task["title"] for task in response.json()) == [
+        "Old done",
+        "Old open",
+        "Older done",
+        "Recent done",
+    ]
+
+    # Pages span both tables without repeating or skipping tasks.
+    titles = []
+    for page in range(1, 6):
+        response = await client.get(
+            url,
+            params={"include_archived": True, "limit": 1, "page": page},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        titles += [task["title"] for task in response.json()]
+    assert titles == ["Old done", "Older done", "Recent done", "Old open"]
+
+
+@pytest.mark.anyio
+async def test_archival_waits_while_pool_is_busy(dbsession: AsyncSession) -> None:
+    """Tests that batches don't start while requests use every connection."""
+    busy = [True, True, False]
+    sleep = SleepRecorder()
+    job = ArchiveJob(
+        async_sessionmaker(await dbsession.connection(), expire_on_commit=False),
+        older_than=datetime.timedelta(days=30),
+        batch_size=100,
+        duty_cycle=0.1,
+        is_busy=lambda: busy.pop(0),
+        busy_pause=0.5,
+        sleep=sleep,
+    )
+
+    assert await job.run() == 0
+    assert sleep.pauses == [0.5, 0.5]
+
+
+@pytest.mark.anyio
+async def test_archival_stops_when_draining(
+    dbsession: AsyncSession,
+    test_user: UserDBModel,
+) -> None:
+    """Tests that batches run through the coordinator and stop once it drains."""
+    task_dao = TaskDAO(dbsession)
+    for title in ("First done", "Second done"):
+        task = await task_dao.create_task(title, "Archival", test_user.id)
+        await task_dao.update_task(task, completed=True)
+    await backdate(dbsession, ["First done", "Second done"], days=40)
+
+    coordinator = ShutdownCoordinator(timeout=1)
+    spawned: list[Coroutine[Any, Any, int]] = []
+    spawn = coordinator.spawn
+
+    def record_spawn(coro: Coroutine[Any, Any, int]) -> "asyncio.Task[int]":
+        spawned.append(coro)
+        return spawn(coro)
+
+    coordinator.spawn = record_spawn  # type: ignore
+
+    async def sleep(seconds: float) -> None:
+        coordinator.begin_drain()
+
+    job = ArchiveJob(
+        async_sessionmaker(await dbsession.connection(), expire_on_commit=False),
+        older_than=datetime.timedelta(days=30),
+        batch_size=1,
+        duty_cycle=0.5,
+        sleep=sleep,
+        coordinator=coordinator,
+    )
+
+    assert await job.run() == 1
+    assert len(spawned) == 1
+    assert coordinator.pending_tasks == 0
+    assert await job.run() == 0
@@ -0,0 +1,197 @@
+import gzip
+from pathlib import Path
+from typing import AsyncIterator
+
+import pytest
+import ujson
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient, Response
+from starlette import status
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.responses import Response as StarletteResponse
+from starlette.routing import Mount, Route
+
+from task_manager.services.compression.assets import (
+    CompressedStaticFiles,
+    choose_coding,
+)
+from task_manager.services.compression.build import build
+from task_manager.services.compression.middleware import (
+    CompressionMiddleware,
+    CpuMonitor,
+)
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("", "identity"),
+        ("gzip, deflate", "gzip"),
+        ("gzip;q=0, deflate", "identity"),
+        ("*", "gzip"),
+        ("identity, gzip;q=0.5", "gzip"),
+    ],
+)
+def test_choose_coding(accept_encoding: str, expected: str) -> None:
+    """Tests that the coding is negotiated from Accept-Encoding."""
+    assert choose_coding(accept_encoding, {"identity", "gzip"}) == expected
+
+
+@pytest.mark.anyio
+async def test_openapi_is_precompressed(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+) -> None:
+    """Tests that the schema is served compressed with a strong ETag."""
+    url = fastapi_app.url_path_for("openapi")
+
+    plain = await client.get(url, headers={"Accept-Encoding": "identity"})
+    compressed = await client.get(url, headers={"Accept-Encoding": "gzip"})
+
+    assert plain.status_code == status.HTTP_200_OK
+    assert "content-encoding" not in plain.headers
+    assert plain.json() == fastapi_app.openapi()
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert int(compressed.headers["content-length"]) < len(plain.content)
+    assert ujson.loads(compressed.content) == plain.json()
+    assert not compressed.headers["etag"].startswith("W/")
+    assert compressed.headers["etag"] != plain.headers["etag"]
+
+    revalidated = await client.get(
+        url,
+        headers={
+            "Accept-Encoding": "gzip",
+            "If-None-Match": compressed.headers["etag"],
+        },
+    )
+    assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+    assert revalidated.content == b""
+
+
+@pytest.mark.anyio
+async def test_static_docs_are_precompressed(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+) -> None:
+    """Tests that swagger assets are compressed once and revalidated."""
+    url = "/static/docs/swagger-ui.css"
+    raw = await client.get(url, headers={"Accept-Encoding": "gzip"})
+
+    async with client.stream(
+        "GET",
+        url,
+        headers={"Accept-Encoding": "gzip"},
+    ) as response:
+        body = b"".join([chunk async for chunk in response.aiter_raw()])
+
+    assert raw.status_code == status.HTTP_200_OK
+    assert raw.headers["content-type"].startswith("text/css")
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(body) == raw.content
+    assert len(body) < len(raw.content) / 3
+
+    revalidated = await client.get(
+        url,
+        headers={"Accept-Encoding": "gzip", "If-None-Match": raw.headers["etag"]},
+    )
+    assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+
+    missing = await client.get("/static/docs/missing.js")
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+
+class BusyMonitor(CpuMonitor):
+    """Monitor of a worker which is always busy."""
+
+    def sample(self) -> float:
+        """Report a fully used CPU."""
+        return 1.0
+
+
+async def raw_get(client: AsyncClient, url: str) -> tuple[Response, bytes]:
+    """Get a response without decoding its body."""
+    async with client.stream("GET", url, headers={"Accept-Encoding": "gzip"}) as resp:
+        return resp, b"".join([chunk async for chunk in resp.aiter_raw()])
+
+
+@pytest.mark.anyio
+async def test_compression_middleware() -> None:
+    """Tests that only large, not yet encoded responses are compressed."""
+    large = {"items": [{"id": index, "title": "task"} for index in range(200)]}
+
+    async def stream() -> AsyncIterator[bytes]:
+        for _ in range(100):
+            yield b"line of a streamed export\n"
+
+    app = Starlette(
+        routes=[
+            Route("/large", lambda request: JSONResponse(large)),
+            Route("/small", lambda request: JSONResponse({"id": 1})),
+            Route(
+                "/encoded",
+                lambda request: StarletteResponse(
+                    gzip.compress(b"{}" * 1000),
+                    media_type="application/json",
+                    headers={"Content-Encoding": "gzip"},
+                ),
+            ),
+            Route(
+                "/stream",
+                lambda request: StreamingResponse(stream(), media_type="text/csv"),
+            ),
+        ],
+    )
+    middleware = CompressionMiddleware(
+        app,
+        minimum_size=500,
+        gzip_level=6,
+        brotli_quality=4,
+        busy_cpu=0.8,
+    )
+    transport = ASGITransport(app=middleware)  # type: ignore
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response, body = await raw_get(client, "/large")
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) == len(body)
+        assert ujson.loads(gzip.decompress(body)) == large
+
+        response, body = await raw_get(client, "/small")
+        assert "content-encoding" not in response.headers
+        assert ujson.loads(body) == {"id": 1}
+
+        response, body = await raw_get(client, "/encoded")
+        assert gzip.decompress(body) == b"{}" * 1000
+
+        response, body = await raw_get(client, "/stream")
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert gzip.decompress(body) == b"line of a streamed export\n" * 100
+
+    assert middleware.level("gzip") == 6
+    middleware.monitor = BusyMonitor()
+    assert middleware.level("gzip") == 1
+
+
+@pytest.mark.anyio
+async def test_static_files_use_build_siblings(tmp_path: Path) -> None:
+    """Tests that siblings compressed at build time are served as they are."""
+    body = b"body { color: black; }\n" * 200
+    (tmp_path / "site.css").write_bytes(body)
+    assert tmp_path / "site.css.gz" in build(tmp_path)
+    # Replaced by a sibling distinguishable from a runtime compression.
+    sibling = gzip.compress(body, compresslevel=1, mtime=0)
+    (tmp_path / "site.css.gz").write_bytes(sibling)
+
+    app = Starlette(routes=[Mount("/", CompressedStaticFiles(directory=tmp_path))])
+    transport = ASGITransport(app=app)  # type: ignore
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response, served = await raw_get(client, "/site.css")
+        missing = await client.get("/site.css.gz")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/css")
+    assert served == sibling
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,96 @@
+import asyncio
+import signal
+from typing import Any
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from starlette import status
+from starlette.responses import PlainTextResponse
+from starlette.types import Receive, Scope, Send
+
+from task_manager.services.drain.coordinator import ShutdownCoordinator
+from task_manager.services.drain.lifespan import chain_signal_handlers
+from task_manager.services.drain.middleware import DrainMiddleware
+
+
+@pytest.mark.anyio
+async def test_drain_cancels_tasks_after_deadline() -> None:
+    """Tests that finished tasks are drained and the rest is cancelled."""
+    coordinator = ShutdownCoordinator(timeout=0.2)
+    short = coordinator.spawn(asyncio.sleep(0.01))
+    long = coordinator.spawn(asyncio.sleep(10))
+
+    result = await coordinator.drain(poll_interval=0.01)
+
+    assert short.done()
+    assert long.cancelled()
+    assert coordinator.pending_tasks == 0
+    assert result.tasks_drained == 1
+    assert result.tasks_aborted == 1
+    assert 0.2 <= result.seconds < 1
+
+
+@pytest.mark.anyio
+async def test_request_in_flight_is_drained() -> None:
+    """Tests that requests in flight finish and new ones are rejected."""
+    coordinator = ShutdownCoordinator(timeout=1)
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_app(scope: Scope, receive: Receive, send: Send) -> None:
+        started.set()
+        await release.wait()
+        await PlainTextResponse("done")(scope, receive, send)
+
+    transport = ASGITransport(app=DrainMiddleware(slow_app, coordinator))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        in_flight = asyncio.create_task(client.get("/"))
+        await started.wait()
+        coordinator.begin_drain()
+        rejected = await client.get("/")
+        drain = asyncio.create_task(coordinator.drain(poll_interval=0.01))
+        release.set()
+        response = await in_flight
+        result = await drain
+
+    assert response.status_code == status.HTTP_200_OK
+    assert rejected.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert rejected.headers["connection"] == "close"
+    assert result.requests_drained == 1
+    assert result.requests_rejected == 1
+    assert result.requests_aborted == 0
+
+
+@pytest.mark.anyio
+async def test_app_rejects_requests_while_draining(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+) -> None:
+    """Tests that the app stops accepting requests once draining starts."""
+    fastapi_app.state.shutdown.begin_drain()
+
+    response = await client.get(fastapi_app.url_path_for("health_check"))
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert fastapi_app.state.shutdown.requests_rejected == 1
+
+
+def test_signal_starts_draining() -> None:
+    """Tests that draining starts before the server's own handler runs."""
+    coordinator = ShutdownCoordinator(timeout=1)
+    received = []
+
+    def server_handler(signum: int, frame: Any) -> None:
+        received.append((signum, coordinator.draining))
+
+    original = signal.signal(signal.SIGTERM, server_handler)
+    try:
+        previous = chain_signal_handlers(coordinator)
+        signal.getsignal(signal.SIGTERM)(signal.SIGTERM, None)  # type: ignore
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+    finally:
+        signal.signal(signal.SIGTERM, original)
+
+    assert received == [(signal.SIGTERM, True)]
+    assert previous[signal.SIGTERM] is server_handler
@@ -0,0 +1,117 @@
+import gc
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+
+from task_manager import settings as settings_module
+from task_manager.gunicorn_runner import (
+    GunicornApplication,
+    PreloadedUvicornWorker,
+    UvicornWorker,
+    child_exit,
+)
+from task_manager.services.metrics.recorder import RequestMetrics, load_snapshots
+from task_manager.settings import Settings, available_cpus
+from task_manager.web.application import get_app
+
+
+def test_workers_build_app_by_default() -> None:
+    """Tests that every worker calls the factory itself."""
+    application = GunicornApplication(
+        "task_manager.web.application:get_app",
+        host="127.0.0.1",
+        port=8000,
+        workers=2,
+    )
+
+    assert application.load() is get_app
+    assert application.cfg.worker_class is UvicornWorker
+
+
+def test_preload_builds_app_in_master() -> None:
+    """Tests that the app is built once and its objects are frozen."""
+    application = GunicornApplication(
+        "task_manager.web.application:get_app",
+        host="127.0.0.1",
+        port=8000,
+        workers=2,
+        preload_app=True,
+    )
+
+    try:
+        app = application.load()
+        assert isinstance(app, FastAPI)
+        assert app.openapi_schema is not None
+        assert gc.get_freeze_count() > 0
+        assert not gc.isenabled()
+    finally:
+        gc.unfreeze()
+        gc.enable()
+    assert application.cfg.worker_class is PreloadedUvicornWorker
+    assert PreloadedUvicornWorker.CONFIG_KWARGS["factory"] is False
+
+
+def test_recycling_options_are_passed_to_gunicorn() -> None:
+    """Tests that tuning options from settings reach gunicorn config."""
+    application = GunicornApplication(
+        "task_manager.web.application:get_app",
+        host="127.0.0.1",
+        port=8000,
+        workers=2,
+        max_requests=1000,
+        max_requests_jitter=100,
+        backlog=512,
+        keepalive=75,
+        graceful_timeout=20,
+    )
+
+    assert application.cfg.max_requests == 1000
+    assert application.cfg.max_requests_jitter == 100
+    assert application.cfg.backlog == 512
+    assert application.cfg.keepalive == 75
+    assert application.cfg.graceful_timeout == 20
+    assert application.cfg.child_exit is child_exit
+
+
+def test_workers_are_sized_by_cpus(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Tests that the CPU quota of a container limits the number of workers."""
+    cpu_max = tmp_path / "cpu.max"
+    monkeypatch.setattr(settings_module, "CGROUP_CPU_MAX", cpu_max)
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(8)))
+
+    cpu_max.write_text("max 100000\n")
+    assert available_cpus() == 8
+    cpu_max.write_text("150000 100000\n")
+    assert available_cpus() == 2
+
+    assert Settings(workers_count=0).workers == 2
+    assert Settings(workers_count=3).workers == 3
+
+
+def test_worker_restarts_are_counted(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Tests that the master counts restarts, but not exits on shutdown."""
+    metrics = RequestMetrics()
+    monkeypatch.setattr("task_manager.gunicorn_runner.supervisor_metrics", metrics)
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    running = SimpleNamespace(LISTENERS=[object()])
+    stopping = SimpleNamespace(LISTENERS=[])
+
+    child_exit(running, SimpleNamespace(pid=2**22 + 1, aborted=False))
+    child_exit(running, SimpleNamespace(pid=2**22 + 2, aborted=True))
+    child_exit(running, SimpleNamespace(pid=2**22 + 3, aborted=False))
+    child_exit(stopping, SimpleNamespace(pid=2**22 + 4, aborted=False))
+
+    assert metrics.counters["task_manager_worker_restarts"] == {
+        (("reason", "exit"),): 2,
+        (("reason", "timeout"),): 1,
+    }
+    assert load_snapshots(tmp_path) == [metrics.snapshot()]
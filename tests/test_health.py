@@ -1,8 +1,83 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+from unittest.mock import AsyncMock, Mock
+
 import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient
 from starlette import status
 
+from task_manager.db.dependencies import get_db_engine
+from task_manager.services.rabbit.dependencies import get_rmq_channel_pool
+from task_manager.web.api.monitoring import readiness
+from task_manager.web.api.monitoring.readiness import ReadinessProbe
+
+
+class ChannelPoolStub:
+    """Channel pool that counts acquisitions and can be made slow."""
+
+    def __init__(self, delay: float = 0) -> None:
+        self.delay = delay
+        self.acquired = 0
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Mock]:
+        """
+        Acquire an open channel.
+
+        :yields: channel stub.
+        """
+        self.acquired += 1
+        await asyncio.sleep(self.delay)
+        yield Mock(is_closed=False)
+
+
+class EngineStub:
+    """Engine whose queries hang."""
+
+    def __init__(self) -> None:
+        self.connection = Mock(execute=self.execute, invalidate=AsyncMock())
+
+    async def execute(self, statement: Any) -> None:
+        """Never respond."""
+        await asyncio.sleep(10)
+
+    @asynccontextmanager
+    async def connect(self) -> AsyncIterator[Mock]:
+        """
+        Connect to the database.
+
+        :yields: connection stub.
+        """
+        yield self.connection
+
+
+@pytest.fixture
+def channel_pool(fastapi_app: FastAPI) -> ChannelPoolStub:
+    """
+    Replaces the rabbitmq channel pool with a stub.
+
+    :param fastapi_app: current application.
+    :returns: the stub.
+    """
+    pool = ChannelPoolStub()
+    fastapi_app.dependency_overrides[get_rmq_channel_pool] = lambda: pool
+    return pool
+
+
+@pytest.fixture(autouse=True)
+def readiness_probe(monkeypatch: pytest.MonkeyPatch) -> ReadinessProbe:
+    """
+    Replaces the readiness probe, so cached results don't leak between tests.
+
+    :param monkeypatch: pytest monkeypatch.
+    :returns: the new probe.
+    """
+    probe = ReadinessProbe(ttl=60, timeout=0.5)
+    monkeypatch.setattr(readiness, "readiness_probe", probe)
+    return probe
+
 
 @pytest.mark.anyio
 async def test_health(client: AsyncClient, fastapi_app: FastAPI) -> None:
@@ -15,3 +90,58 @@ async def test_health(client: AsyncClient, fastapi_app: FastAPI) -> None:
     url = fastapi_app.url_path_for("health_check")
     response = await client.get(url)
     assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.anyio
+async def test_ready(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+    channel_pool: ChannelPoolStub,
+) -> None:
+    """Tests that all dependencies are reported and results are cached."""
+    url = fastapi_app.url_path_for("readiness_check")
+    responses = await asyncio.gather(*(client.get(url) for _ in range(5)))
+
+    for response in responses:
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert body["ready"]
+        assert set(body["checks"]) == {"database", "redis", "rabbitmq"}
+    assert channel_pool.acquired == 1
+
+
+@pytest.mark.anyio
+async def test_ready_times_out(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+    channel_pool: ChannelPoolStub,
+) -> None:
+    """Tests that a hanging dependency makes the worker not ready."""
+    channel_pool.delay = 10
+    url = fastapi_app.url_path_for("readiness_check")
+
+    response = await client.get(url)
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    checks = response.json()["checks"]
+    assert checks["rabbitmq"]["status"] == "timeout"
+    assert checks["database"]["status"] == "ok"
+    assert checks["redis"]["status"] == "ok"
+
+
+@pytest.mark.anyio
+async def test_ready_database_times_out(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+    channel_pool: ChannelPoolStub,
+) -> None:
+    """Tests that a hanging database check drops its connection."""
+    engine = EngineStub()
+    fastapi_app.dependency_overrides[get_db_engine] = lambda: engine
+    url = fastapi_app.url_path_for("readiness_check")
+
+    response = await client.get(url)
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json()["checks"]["database"]["status"] == "timeout"
+    engine.connection.invalidate.assert_awaited_once()
@@ -0,0 +1,35 @@
+import uuid
+
+from task_manager.db.ids import MAX_COUNTER, UUIDv7Generator, uuid7
+
+
+def test_uuid7_layout() -> None:
+    """Tests version, variant and timestamp of generated ids."""
+    generate = UUIDv7Generator(clock=lambda: 1_700_000_000_123_456_789)
+
+    task_id = generate()
+
+    assert task_id.version == 7
+    assert task_id.variant == uuid.RFC_4122
+    assert task_id.int >> 80 == 1_700_000_000_123
+
+
+def test_uuid7_is_ordered() -> None:
+    """Tests that ids keep increasing within a millisecond."""
+    ids = [uuid7() for _ in range(10_000)]
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_uuid7_survives_overflow_and_clock_going_back() -> None:
+    """Tests that neither counter overflow nor clock skew break the order."""
+    now = [1_700_000_000_000_000_000]
+    generate = UUIDv7Generator(clock=lambda: now[0])
+
+    ids = [generate() for _ in range(MAX_COUNTER + 10)]
+    now[0] -= 5_000_000_000
+    ids += [generate() for _ in range(10)]
+
+    assert ids == sorted(ids)
+    assert ids[-1].int >> 80 > 1_700_000_000_000
@@ -0,0 +1,137 @@
+import io
+import logging
+import sys
+import threading
+from typing import Any
+
+import ujson
+from loguru import logger
+from opentelemetry.sdk.trace import TracerProvider
+
+from task_manager.log import (
+    AccessLogHandler,
+    InterceptHandler,
+    QueueSink,
+    SamplingFilter,
+    exception_formatter,
+)
+
+
+class BlockingStream(io.StringIO):
+    """Stream that blocks writes until it is released."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.writing = threading.Event()
+        self.released = threading.Event()
+
+    def write(self, text: str) -> int:
+        """
+        Write the text once the stream is released.
+
+        :param text: text to write.
+        :returns: number of written characters.
+        """
+        self.writing.set()
+        self.released.wait()
+        return super().write(text)
+
+
+def test_json_lines() -> None:
+    """Tests that records are written as JSON with trace ids."""
+    stream = io.StringIO()
+    sink = QueueSink(stream, maxsize=100)
+    handler_id = logger.add(sink, format=exception_formatter, colorize=False)
+
+    with TracerProvider().get_tracer(__name__).start_as_current_span("test") as span:
+        logger.bind(task="abc").info("Task {} updated", 1)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("Failed")
+    logger.remove(handler_id)
+
+    info, error = map(ujson.loads, stream.getvalue().splitlines())
+    assert info["message"] == "Task 1 updated"
+    assert info["level"] == "INFO"
+    assert info["extra"]["task"] == "abc"
+    assert info["trace_id"] == format(span.get_span_context().trace_id, "032x")
+    assert error["level"] == "ERROR"
+    assert "ValueError: boom" in error["exception"]
+    assert "\x1b[" not in stream.getvalue()
+
+
+def test_records_are_dropped_when_queue_is_full() -> None:
+    """Tests that logging doesn't block on a stuck stream."""
+    stream = BlockingStream()
+    sink = QueueSink(stream, maxsize=2)
+    handler_id = logger.add(sink, format=exception_formatter, colorize=False)
+
+    logger.info("taken by the writer")
+    assert stream.writing.wait(timeout=5)
+    for index in range(4):
+        logger.info("record {}", index)
+    assert sink.dropped == 2
+
+    stream.released.set()
+    logger.remove(handler_id)
+
+    lines = [ujson.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["message"] for line in lines[:3]] == [
+        "taken by the writer",
+        "record 0",
+        "record 1",
+    ]
+    assert lines[-1]["dropped"] == 2
+    assert sink.written == 4
+
+
+def test_intercepted_records_keep_caller() -> None:
+    """Tests that stdlib records keep their caller and level."""
+    records: list[dict[str, Any]] = []
+    handler_id = logger.add(lambda message: records.append(message.record))
+    stdlib_logger = logging.getLogger("tests.intercept")
+    stdlib_logger.handlers = [InterceptHandler()]
+    stdlib_logger.propagate = False
+    stdlib_logger.setLevel(1)
+
+    line = sys._getframe().f_lineno + 1  # noqa: SLF001
+    stdlib_logger.warning("Task %s is late", "abc")
+    stdlib_logger.log(15, "Custom level")
+    logger.remove(handler_id)
+
+    warning, custom = records
+    assert warning["message"] == "Task abc is late"
+    assert warning["level"].name == "WARNING"
+    assert warning["name"] == "tests.intercept"
+    assert warning["function"] == "test_intercepted_records_keep_caller"
+    assert warning["line"] == line
+    assert custom["level"].no == 15
+
+
+def test_access_logs_skip_loguru() -> None:
+    """Tests that access logs are put straight into the JSON queue."""
+    stream = io.StringIO()
+    sink = QueueSink(stream, maxsize=100)
+    access_logger = logging.getLogger("tests.access")
+    access_logger.handlers = [AccessLogHandler(sink, stream)]
+    access_logger.propagate = False
+    access_logger.setLevel(logging.INFO)
+
+    access_logger.info('%s - "%s %s" %d', "127.0.0.1", "GET", "/api/tasks/", 200)
+    sink.stop()
+
+    entry = ujson.loads(stream.getvalue())
+    assert entry["message"] == '127.0.0.1 - "GET /api/tasks/" 200'
+    assert entry["logger"] == "tests.access"
+    assert entry["level"] == "INFO"
+
+
+def test_sampling_filter() -> None:
+    """Tests that only the sampled fraction of records passes."""
+    record = logging.makeLogRecord({"msg": "sampled"})
+    sampled = sum(SamplingFilter(0.25).filter(record) for _ in range(10_000))
+
+    assert 2000 < sampled < 3000
+    assert not SamplingFilter(0).filter(record)
+    assert SamplingFilter(1).filter(record)
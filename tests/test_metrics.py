@@ -0,0 +1,128 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from prometheus_client import CollectorRegistry, generate_latest
+from starlette import status
+
+from task_manager.services.metrics.recorder import (
+    RequestMetrics,
+    SnapshotCollector,
+    load_snapshots,
+    merge_exited,
+)
+
+
+@pytest.mark.anyio
+async def test_metrics_endpoint(fastapi_app: FastAPI, client: AsyncClient) -> None:
+    """
+    Tests that requests are reported with their route template.
+
+    :param fastapi_app: current application.
+    :param client: client for the app.
+    """
+    await client.get(fastapi_app.url_path_for("health_check"))
+    response = await client.get(fastapi_app.url_path_for("metrics"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'task_manager_http_requests_total{method="GET",route="/api/health",'
+        'status="200"}'
+    ) in response.text
+    assert "task_manager_http_request_duration_seconds_bucket" in response.text
+
+
+def test_snapshots_are_merged_across_workers() -> None:
+    """Tests that counters are summed and gauges of exited workers dropped."""
+    live_worker, exited_worker = RequestMetrics(), RequestMetrics()
+    live_worker.record("GET", "/api/tasks/", 200, 0.003)
+    live_worker.set_gauge("task_manager_db_pool_connections", 2, state="in_use")
+    exited_worker.record("GET", "/api/tasks/", 200, 0.2)
+    exited_worker.record("GET", "/api/tasks/", 500, 20)
+    exited_worker.set_gauge("task_manager_db_pool_connections", 5, state="in_use")
+    exited_worker.increment("task_manager_worker_restarts", reason="exit")
+    live_worker.increment("task_manager_worker_restarts", reason="exit")
+    exited_snapshot = exited_worker.snapshot()
+    exited_snapshot["pid"] = 2**22 + 1  # above the default linux pid_max
+
+    registry = CollectorRegistry()
+    registry.register(
+        SnapshotCollector([live_worker.snapshot(), exited_snapshot]),
+    )
+    text = generate_latest(registry).decode()
+
+    assert (
+        'task_manager_http_requests_total{method="GET",route="/api/tasks/",'
+        'status="200"} 2.0'
+    ) in text
+    assert (
+        'task_manager_http_request_errors_total{method="GET",route="/api/tasks/"} 1.0'
+    ) in text
+    assert (
+        'task_manager_http_request_duration_seconds_bucket{le="0.005",'
+        'method="GET",route="/api/tasks/"} 1.0'
+    ) in text
+    assert (
+        'task_manager_http_request_duration_seconds_count{method="GET",'
+        'route="/api/tasks/"} 3.0'
+    ) in text
+    assert 'task_manager_db_pool_connections{state="in_use"} 2.0' in text
+    assert 'task_manager_worker_restarts_total{reason="exit"} 2.0' in text
+
+
+def test_snapshots_flush(tmp_path: Path) -> None:
+    """Tests that a worker snapshot can be written and read back."""
+    metrics = RequestMetrics()
+    metrics.record("POST", "/api/tasks/", 201, 0.01)
+    metrics.flush(tmp_path)
+
+    snapshots = load_snapshots(tmp_path)
+    assert snapshots == [metrics.snapshot()]
+
+
+def test_exited_workers_are_merged(tmp_path: Path) -> None:
+    """Tests that snapshots of exited workers are merged into one."""
+    pids = (2**22 + 1, 2**22 + 2)
+    for pid in pids:
+        worker = RequestMetrics()
+        worker.record("GET", "/api/tasks/", 200, 0.003)
+        worker.set_gauge("task_manager_db_pool_connections", 2, state="in_use")
+        worker.increment("task_manager_tasks_archived", 3)
+        snapshot = worker.snapshot()
+        snapshot["pid"] = pid
+        (tmp_path / f"requests_{pid}.json").write_text(json.dumps(snapshot))
+        merge_exited(tmp_path, pid)
+    merge_exited(tmp_path, pids[0])
+
+    assert [path.name for path in tmp_path.glob("requests_*")] == [
+        "requests_exited.json",
+    ]
+    registry = CollectorRegistry()
+    registry.register(SnapshotCollector(load_snapshots(tmp_path)))
+    text = generate_latest(registry).decode()
+    assert (
+        'task_manager_http_requests_total{method="GET",route="/api/tasks/",'
+        'status="200"} 2.0'
+    ) in text
+    assert (
+        'task_manager_http_request_duration_seconds_bucket{le="0.005",'
+        'method="GET",route="/api/tasks/"} 2.0'
+    ) in text
+    assert "task_manager_tasks_archived_total 6.0" in text
+    assert 'task_manager_db_pool_connections{state="in_use"}' not in text
+
+
+def test_recording_overhead() -> None:
+    """Tests that recording a request costs only a few microseconds."""
+    metrics = RequestMetrics()
+    requests = 100_000
+    started = time.perf_counter()
+    for index in range(requests):
+        metrics.record("GET", "/api/tasks/", 200, index / requests)
+    per_request = (time.perf_counter() - started) / requests
+
+    assert per_request < 5e-6
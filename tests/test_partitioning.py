@@ -0,0 +1,128 @@
+import datetime
+import uuid
+from typing import Any
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from task_manager.db.dao.task_dao import TaskDAO
+from task_manager.db.models.users import UserDBModel
+from task_manager.db.partitioning import (
+    copy_batch,
+    is_partitioned,
+    last_task_id,
+    prepare,
+    swap,
+)
+from tests.conftest import QueryCounter
+
+
+def scanned_relations(plan: Any) -> set[str]:
+    """
+    Relations read or modified by a plan.
+
+    :param plan: node of a plan in JSON format.
+    :returns: names of relations.
+    """
+    relations = set()
+    if isinstance(plan, dict):
+        if "Relation Name" in plan:
+            relations.add(plan["Relation Name"])
+        plan = list(plan.values())
+    if isinstance(plan, list):
+        for node in plan:
+            relations |= scanned_relations(node)
+    return relations
+
+
+async def partition_tasks(conn: AsyncConnection, partitions: int) -> None:
+    """
+    Run all steps of the migration within the test transaction.
+
+    :param conn: connection of the test session.
+    :param partitions: number of hash partitions.
+    """
+    await prepare(conn, partitions)
+    until = await last_task_id(conn)
+    after: uuid.UUID | None = uuid.UUID(int=0)
+    while after is not None and until is not None:
+        after = await copy_batch(conn, after, until, batch_size=2)
+    await swap(conn)
+
+
+@pytest.mark.anyio
+async def test_migration_keeps_tasks_and_mirrors_writes(
+    dbsession: AsyncSession,
+    test_user: UserDBModel,
+) -> None:
+    """Tests that copied rows and writes during the copy survive the swap."""
+    task_dao = TaskDAO(dbsession)
+    tasks = [
+        await task_dao.create_task(f"Task {index}", "Copied", test_user.id)
+        for index in range(5)
+    ]
+    conn = await dbsession.connection()
+
+    await prepare(conn, partitions=4)
+    until = await last_task_id(conn)
+    assert until == tasks[-1].id
+    after = await copy_batch(conn, uuid.UUID(int=0), until, batch_size=2)
+    # Written while the copy is in progress.
+    await task_dao.update_task(tasks[0], completed=True)
+    await task_dao.delete_task(tasks[4])
+    created = await task_dao.create_task("New", "Mirrored", test_user.id)
+    while after is not None:
+        after = await copy_batch(conn, after, until, batch_size=2)
+    await swap(conn)
+
+    assert await is_partitioned(conn)
+    rows = await dbsession.execute(text("SELECT id, completed FROM task ORDER BY id"))
+    assert rows.all() == sorted(
+        [(task.id, task.completed) for task in tasks[:4]] + [(created.id, False)],
+    )
+
+
+@pytest.mark.anyio
+async def test_task_queries_scan_single_partition(
+    dbsession: AsyncSession,
+    test_user: UserDBModel,
+    query_counter: QueryCounter,
+) -> None:
+    """Tests that every statement of the DAO is pruned to the user's partition."""
+    conn = await dbsession.connection()
+    await partition_tasks(conn, partitions=8)
+    task_dao = TaskDAO(dbsession)
+
+    start = len(query_counter.statements)
+    task = await task_dao.create_task("Pruned", "Single partition", test_user.id)
+    await task_dao.get_all_tasks(user_id=test_user.id)
+    await task_dao.get_all_tasks(
+        user_id=test_user.id,
+        completed=False,
+        updated_since=datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc),
+    )
+    found = await task_dao.get_task_by_id(test_user.id, task.id)
+    assert found is not None
+    await task_dao.update_task(found, completed=True)
+    await task_dao.delete_task(found)
+    executed = list(
+        zip(
+            query_counter.statements[start:],
+            query_counter.parameters[start:],
+        ),
+    )
+
+    explained = 0
+    for statement, parameters in executed:
+        if " task" not in statement or statement.startswith("INSERT"):
+            continue
+        result = await conn.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}",
+            tuple(parameters),
+        )
+        relations = scanned_relations(result.scalar()) - {"task"}
+        assert len(relations) == 1, f"{relations} scanned by:\n{statement}"
+        assert relations.pop().startswith("task_p")
+        explained += 1
+    assert explained == 5
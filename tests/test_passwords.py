@@ -0,0 +1,190 @@
+import asyncio
+import statistics
+import threading
+import time
+import uuid
+from typing import Any, Optional
+
+import pytest
+from fastapi import FastAPI
+from fastapi_users.password import PasswordHelper
+from httpx import AsyncClient
+from starlette import status
+
+from task_manager.db.models.users import (  # type: ignore
+    UserDBModel,
+    UserManager,
+    current_active_user,
+    get_user_db,
+)
+from task_manager.services.metrics.recorder import RequestMetrics
+from task_manager.services.passwords.hasher import OffloadedPasswordHelper
+from task_manager.settings import settings
+
+
+class SlowHelper(PasswordHelper):
+    """Password helper tracking how many hashes run at once."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def hash(self, password: str) -> str:
+        """Pretend to hash for 50ms."""
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05)
+        with self.lock:
+            self.running -= 1
+        return "hashed"
+
+
+@pytest.mark.anyio
+async def test_hashing_is_bounded() -> None:
+    """Tests that the pool limits concurrent hashes and records queue time."""
+    helper = SlowHelper()
+    metrics = RequestMetrics()
+    offloaded = OffloadedPasswordHelper(helper, max_workers=2, metrics=metrics)
+
+    results = await asyncio.gather(
+        *(offloaded.hash_offloaded("password") for _ in range(6)),
+    )
+
+    assert results == ["hashed"] * 6
+    assert helper.max_running == 2
+    assert offloaded.in_flight == 0
+    counters = metrics.counters
+    assert counters["task_manager_password_hashes"][(("operation", "hash"),)] == 6
+    # Four hashes waited for one or two rounds of 50ms.
+    queued = counters["task_manager_password_hash_queue_seconds"]
+    assert queued[(("operation", "hash"),)] >= 0.2
+    assert metrics.gauges["task_manager_password_hash_waiting"][()] == 0
+
+
+class UserDatabaseStub:
+    """User database which doesn't share the test session between logins."""
+
+    def __init__(self, user: UserDBModel) -> None:
+        self.user = user
+
+    async def get_by_email(self, email: str) -> Optional[UserDBModel]:
+        """Return the only user."""
+        return self.user
+
+    async def update(self, user: UserDBModel, update_dict: dict[str, Any]) -> Any:
+        """Skip updates of the password hash."""
+        return user
+
+
+@pytest.mark.anyio
+async def test_task_latency_is_flat_during_logins(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    test_user: UserDBModel,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests that logins don't block the event loop for task requests."""
+    # Concurrent logins from one address would lease the whole auth window.
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    login_user = UserDBModel(
+        email="login@example.com",
+        hashed_password=PasswordHelper().hash("password"),
+        is_active=True,
+    )
+
+    async def override_current_user() -> UserDBModel:
+        return test_user
+
+    fastapi_app.dependency_overrides[current_active_user] = override_current_user
+    fastapi_app.dependency_overrides[get_user_db] = lambda: UserDatabaseStub(
+        login_user,
+    )
+    tasks_url = fastapi_app.url_path_for("get_task_models")
+    login_url = fastapi_app.url_path_for("auth:jwt.login")
+
+    async def task_latencies(count: int) -> list[float]:
+        latencies = []
+        for _ in range(count):
+            started = time.perf_counter()
+            response = await client.get(tasks_url)
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == status.HTTP_200_OK
+        return latencies
+
+    await task_latencies(3)
+    idle = statistics.median(await task_latencies(10))
+
+    logins = [
+        asyncio.create_task(
+            client.post(
+                login_url,
+                data={"username": "login@example.com", "password": "password"},
+            ),
+        )
+        for _ in range(10)
+    ]
+    # Let every login reach its hash before measuring.
+    await asyncio.sleep(0.05)
+    busy = statistics.median(await task_latencies(10))
+    in_flight = sum(not login.done() for login in logins)
+    responses = await asyncio.gather(*logins)
+
+    assert all(response.status_code == status.HTTP_200_OK for response in responses)
+    # Logins were still hashing while tasks were measured.
+    assert in_flight
+    # Each hash takes hundreds of milliseconds, on the loop it would
+    # add at least one of them to every task request. Hashing threads
+    # still compete for the CPU with the loop, hence the margin.
+    assert busy < idle * 3 + 0.1
+
+
+@pytest.mark.anyio
+async def test_password_reset_hashes_in_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Tests that anonymous password resets don't hash on the event loop."""
+    metrics = RequestMetrics()
+    helper = OffloadedPasswordHelper(PasswordHelper(), max_workers=1, metrics=metrics)
+
+    def on_loop(*args: Any) -> Any:
+        raise AssertionError("hashed on the event loop")
+
+    monkeypatch.setattr(helper, "hash", on_loop)
+    monkeypatch.setattr(helper, "verify_and_update", on_loop)
+    user = UserDBModel(
+        id=uuid.uuid4(),
+        email="reset@example.com",
+        hashed_password=PasswordHelper().hash("old password"),
+        is_active=True,
+    )
+    updates: list[dict[str, Any]] = []
+
+    class ResetDatabaseStub(UserDatabaseStub):
+        async def get(self, user_id: uuid.UUID) -> UserDBModel:
+            return self.user
+
+        async def update(self, user: UserDBModel, update_dict: dict[str, Any]) -> Any:
+            updates.append(update_dict)
+            return user
+
+    tokens: list[str] = []
+
+    async def on_after_forgot_password(user: Any, token: str, request: Any) -> None:
+        tokens.append(token)
+
+    manager = UserManager(ResetDatabaseStub(user), helper)
+    monkeypatch.setattr(manager, "on_after_forgot_password", on_after_forgot_password)
+    await manager.forgot_password(user)
+    await manager.reset_password(tokens[0], "new password")
+
+    (update,) = updates
+    verified, _ = PasswordHelper().verify_and_update(
+        "new password",
+        update["hashed_password"],
+    )
+    assert verified
+    assert metrics.counters["task_manager_password_hashes"] == {
+        (("operation", "hash"),): 2,
+        (("operation", "verify"),): 1,
+    }
@@ -0,0 +1,102 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette import status
+
+from task_manager.db.dao.user_dao import UserDAO
+from task_manager.db.models.users import (  # type: ignore
+    UserCreate,
+    UserDBModel,
+    current_active_user,
+    get_jwt_strategy,
+)
+from task_manager.services.profiling.middleware import ProfilingMiddleware
+
+
+@pytest.fixture
+def profiles() -> Any:
+    """
+    Collects logged profiling summaries.
+
+    :yields: list of logged summaries.
+    """
+    logged: list[dict[str, Any]] = []
+    handler_id = logger.add(
+        lambda message: logged.append(message.record["extra"]),
+        filter="task_manager.services.profiling",
+    )
+    yield logged
+    logger.remove(handler_id)
+
+
+@pytest.mark.anyio
+async def test_sampled_requests_are_profiled(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    test_user: UserDBModel,
+    profiles: list[dict[str, Any]],
+    tmp_path: Path,
+) -> None:
+    """Tests that profiles split DB and Python time and are saved."""
+
+    async def override_current_user() -> UserDBModel:
+        return test_user
+
+    fastapi_app.dependency_overrides[current_active_user] = override_current_user
+    fastapi_app.add_middleware(
+        ProfilingMiddleware,
+        sample_rate=1,
+        header="X-Profile",
+        directory=tmp_path,
+    )
+
+    response = await client.get(fastapi_app.url_path_for("get_task_models"))
+    assert response.status_code == status.HTTP_200_OK
+
+    (profile,) = profiles
+    assert profile["route"] == "/api/tasks/"
+    assert profile["db_queries"] >= 1
+    assert 0 < profile["db_ms"] < profile["total_ms"]
+    assert "cumulative" in profile["top"]
+    assert len(list(tmp_path.glob("*-GET-api_tasks.prof"))) == 1
+
+
+@pytest.mark.anyio
+async def test_profiling_header_requires_superuser(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    test_user: UserDBModel,
+    profiles: list[dict[str, Any]],
+) -> None:
+    """Tests that only superusers can request a profile."""
+    fastapi_app.state.db_session_factory = async_sessionmaker(
+        dbsession.bind,
+        expire_on_commit=False,
+    )
+    superuser = await UserDAO(dbsession).create_user(
+        UserCreate(
+            email="admin@example.com",
+            password="adminpassword",  # noqa: S106
+            is_superuser=True,
+        ),
+    )
+    fastapi_app.add_middleware(ProfilingMiddleware, sample_rate=0, header="X-Profile")
+    url = fastapi_app.url_path_for("health_check")
+
+    for user in (test_user, superuser):
+        token = await get_jwt_strategy().write_token(user)
+        response = await client.get(
+            url,
+            headers={"X-Profile": "1", "Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+    await client.get(url)
+
+    (profile,) = profiles
+    assert profile["route"] == "/api/health"
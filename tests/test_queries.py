@@ -0,0 +1,163 @@
+from typing import Any
+
+import pytest
+from fastapi import FastAPI
+from fastapi_users.password import PasswordHelper
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from task_manager.db.dao.task_dao import TaskDAO
+from task_manager.db.models.users import (  # type: ignore
+    UserDBModel,
+    get_jwt_strategy,
+)
+from tests.conftest import QueryCounter
+
+# Statements per request, the user lookup of authentication included.
+# Raise a limit only together with the change that needs another query.
+MAX_QUERIES = {
+    "list": 2,
+    "get": 2,
+    "create": 2,
+    "update": 3,
+    "delete": 3,
+    "login": 1,
+    "register": 3,
+    "me": 1,
+}
+
+
+@pytest.fixture
+async def auth_headers(test_user: UserDBModel) -> dict[str, str]:
+    """
+    Headers authenticating the test user without overriding dependencies.
+
+    :param test_user: user to authenticate.
+    :returns: headers with a bearer token.
+    """
+    token = await get_jwt_strategy().write_token(test_user)
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+async def task_id(dbsession: AsyncSession, test_user: UserDBModel) -> str:
+    """
+    Create a task of the test user.
+
+    :param dbsession: database session.
+    :param test_user: owner of the task.
+    :returns: id of the task.
+    """
+    task = await TaskDAO(dbsession).create_task(
+        title="Task",
+        description="Description",
+        user_id=test_user.id,
+    )
+    return str(task.id)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    ("operation", "method", "route", "body", "expected_status"),
+    [
+        ("list", "GET", "get_task_models", None, status.HTTP_200_OK),
+        ("get", "GET", "get_task_model_by_id", None, status.HTTP_200_OK),
+        (
+            "create",
+            "POST",
+            "create_task_model",
+            {"title": "New", "description": "New"},
+            status.HTTP_201_CREATED,
+        ),
+        (
+            "update",
+            "PATCH",
+            "update_task_model",
+            {"completed": True},
+            status.HTTP_200_OK,
+        ),
+        ("delete", "DELETE", "delete_task_model", None, status.HTTP_204_NO_CONTENT),
+    ],
+)
+async def test_task_routes_queries(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    query_counter: QueryCounter,
+    auth_headers: dict[str, str],
+    task_id: str,
+    operation: str,
+    method: str,
+    route: str,
+    body: Any,
+    expected_status: int,
+) -> None:
+    """Tests that task routes don't execute more statements than expected."""
+    path_params = {} if operation in {"list", "create"} else {"task_id": task_id}
+    url = fastapi_app.url_path_for(route, **path_params)
+
+    with query_counter.assert_max(MAX_QUERIES[operation]):
+        response = await client.request(method, url, json=body, headers=auth_headers)
+
+    assert response.status_code == expected_status
+
+
+@pytest.mark.anyio
+async def test_login_queries(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    query_counter: QueryCounter,
+) -> None:
+    """Tests that a successful login looks up the user only once."""
+    dbsession.add(
+        UserDBModel(
+            email="login@example.com",
+            hashed_password=PasswordHelper().hash("password"),
+            is_active=True,
+        ),
+    )
+    await dbsession.commit()
+    url = fastapi_app.url_path_for("auth:jwt.login")
+
+    with query_counter.assert_max(MAX_QUERIES["login"]):
+        response = await client.post(
+            url,
+            data={"username": "login@example.com", "password": "password"},
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.anyio
+async def test_register_queries(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    query_counter: QueryCounter,
+) -> None:
+    """Tests that registration checks the email, inserts and reads the user."""
+    url = fastapi_app.url_path_for("register:register")
+
+    with query_counter.assert_max(MAX_QUERIES["register"]):
+        response = await client.post(
+            url,
+            json={"email": "new@example.com", "password": "password"},
+        )
+
+    assert response.status_code == status.HTTP_201_CREATED
+
+
+@pytest.mark.anyio
+async def test_current_user_queries(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    query_counter: QueryCounter,
+    auth_headers: dict[str, str],
+) -> None:
+    """Tests that reading the current user only authenticates the request."""
+    url = fastapi_app.url_path_for("users:current_user")
+
+    with query_counter.assert_max(MAX_QUERIES["me"]):
+        response = await client.get(url, headers=auth_headers)
+
+    assert response.status_code == status.HTTP_200_OK
@@ -0,0 +1,99 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from task_manager.db.models.users import UserDBModel, current_active_user
+from task_manager.services.rate_limit import dependencies
+from task_manager.services.rate_limit.limiter import SlidingWindowRateLimiter
+from task_manager.services.redis.pool import InstrumentedBlockingConnectionPool
+
+
+@pytest.mark.anyio
+async def test_limit_is_shared_between_workers(
+    fake_redis_pool: InstrumentedBlockingConnectionPool,
+) -> None:
+    """Tests that limiters in different workers share one window."""
+    first_worker = SlidingWindowRateLimiter("test", limit=3, window=60)
+    second_worker = SlidingWindowRateLimiter("test", limit=3, window=60)
+
+    assert (await first_worker.hit(fake_redis_pool, "user")).allowed
+    assert (await second_worker.hit(fake_redis_pool, "user")).allowed
+    assert (await first_worker.hit(fake_redis_pool, "user")).allowed
+
+    result = await second_worker.hit(fake_redis_pool, "user")
+    assert not result.allowed
+    assert 0 < result.retry_after <= 60
+    assert (await first_worker.hit(fake_redis_pool, "another-user")).allowed
+
+
+@pytest.mark.anyio
+async def test_leased_permits_skip_redis(
+    fake_redis_pool: InstrumentedBlockingConnectionPool,
+) -> None:
+    """Tests that only one request per lease reaches redis."""
+    limiter = SlidingWindowRateLimiter("test", limit=20, window=60, lease=5)
+    # The first lease also loads the script into redis.
+    assert (await limiter.hit(fake_redis_pool, "user")).allowed
+    round_trips = fake_redis_pool.stats()["acquired_total"]
+
+    for _ in range(19):
+        assert (await limiter.hit(fake_redis_pool, "user")).allowed
+    assert fake_redis_pool.stats()["acquired_total"] == round_trips + 3
+
+    assert not (await limiter.hit(fake_redis_pool, "user")).allowed
+    assert not (await limiter.hit(fake_redis_pool, "user")).allowed
+    # The second rejection is answered from the local bucket.
+    assert fake_redis_pool.stats()["acquired_total"] == round_trips + 4
+
+
+@pytest.mark.anyio
+async def test_task_routes_are_limited_per_user(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    test_user: UserDBModel,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests that task routes respond with 429 and Retry-After."""
+
+    async def override_current_user() -> UserDBModel:
+        return test_user
+
+    fastapi_app.dependency_overrides[current_active_user] = override_current_user
+    monkeypatch.setattr(
+        dependencies,
+        "tasks_limiter",
+        SlidingWindowRateLimiter("tasks", limit=2, window=60),
+    )
+
+    url = fastapi_app.url_path_for("get_task_models")
+    for _ in range(2):
+        response = await client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert 1 <= int(response.headers["Retry-After"]) <= 60
+
+
+@pytest.mark.anyio
+async def test_auth_routes_are_limited_per_ip(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Tests that login attempts are limited per client address."""
+    monkeypatch.setattr(
+        dependencies,
+        "auth_limiter",
+        SlidingWindowRateLimiter("auth", limit=1, window=60),
+    )
+
+    url = fastapi_app.url_path_for("auth:jwt.login")
+    credentials = {"username": "nobody@example.com", "password": "wrong"}
+    response = await client.post(url, data=credentials)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = await client.post(url, data=credentials)
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert "Retry-After" in response.headers
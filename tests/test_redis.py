@@ -4,6 +4,7 @@ import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient
 from redis.asyncio import ConnectionPool, Redis
+from redis.exceptions import ConnectionError as RedisConnectionError
 from starlette import status
 
 
@@ -55,3 +56,52 @@ async def test_getting_value(
     assert response.status_code == status.HTTP_200_OK
     assert response.json()["key"] == test_key
     assert response.json()["value"] == test_val
+
+
+@pytest.mark.anyio
+async def test_redis_pool_stats(
+    fastapi_app: FastAPI,
+    fake_redis_pool: ConnectionPool,
+    client: AsyncClient,
+) -> None:
+    """
+    Tests that pool usage is reported by the monitoring endpoint.
+
+    :param fastapi_app: current application fixture.
+    :param fake_redis_pool: fake redis pool.
+    :param client: client fixture.
+    """
+    async with Redis(connection_pool=fake_redis_pool) as redis:
+        await redis.set(uuid.uuid4().hex, uuid.uuid4().hex)
+    url = fastapi_app.url_path_for("redis_pool_stats")
+    response = await client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    stats = response.json()
+    assert stats["max_connections"] == 10
+    assert stats["in_use"] == 0
+    assert stats["available"] == 1
+    assert stats["acquired_total"] == 1
+
+
+@pytest.mark.anyio
+async def test_redis_pool_is_bounded(fake_redis_pool: ConnectionPool) -> None:
+    """
+    Tests that the pool waits instead of opening extra connections.
+
+    :param fake_redis_pool: fake redis pool.
+    """
+    fake_redis_pool.timeout = 0.05
+    connections = [
+        await fake_redis_pool.get_connection("PING")
+        for _ in range(fake_redis_pool.max_connections)
+    ]
+
+    with pytest.raises(RedisConnectionError):
+        await fake_redis_pool.get_connection("PING")
+
+    for connection in connections:
+        await fake_redis_pool.release(connection)
+    stats = fake_redis_pool.stats()
+    assert stats["created"] == fake_redis_pool.max_connections
+    assert stats["acquire_errors_total"] == 1
@@ -0,0 +1,10 @@
+from benchmarks.startup import BUDGET, run_once
+
+
+def test_startup_within_budget() -> None:
+    """Tests that a worker starts quickly without unconfigured integrations."""
+    result = run_once()
+
+    assert result["status_code"] == 200
+    assert result["optional_modules"] == []
+    assert result["total_ms"] / 1000 <= BUDGET
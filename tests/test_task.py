@@ -1,13 +1,19 @@
+import asyncio
+import datetime
 import uuid
 
 import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from task_manager.db.dao.task_dao import TaskDAO
+from task_manager.db.dao.task_dao import TaskDAO, task_list_reads
 from task_manager.db.models.users import UserDBModel, current_active_user
+from task_manager.db.single_flight import SingleFlight
+from task_manager.web.api.task import views
+from tests.conftest import QueryCounter
 
 
 @pytest.mark.anyio
@@ -206,6 +212,136 @@ async def test_update_task_not_found(
     assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
+@pytest.mark.anyio
+async def test_bulk_update_tasks(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    test_user: UserDBModel,
+    query_counter: QueryCounter,
+) -> None:
+    """Test completing many tasks with one statement and reporting missing ones."""
+
+    # Define the override function
+    async def override_current_user() -> UserDBModel:
+        return test_user
+
+    fastapi_app.dependency_overrides[current_active_user] = override_current_user
+
+    task_dao = TaskDAO(dbsession)
+    first, second, _ = [
+        await task_dao.create_task(f"Task {index}", "Bulk", test_user.id)
+        for index in range(3)
+    ]
+    missing = uuid.uuid4()
+
+    url = fastapi_app.url_path_for("update_task_models")
+    with query_counter.assert_max(1) as statements:
+        response = await client.patch(
+            url,
+            json={
+                "ids": [str(first.id), str(missing), str(second.id)],
+                "changes": {"completed": True},
+            },
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert sorted(response.json()["updated"]) == sorted([str(first.id), str(second.id)])
+    assert response.json()["not_found"] == [str(missing)]
+    assert "ANY" in statements[0]
+    assert "ORDER BY task_1.id" in statements[0]
+    assert "FOR UPDATE" in statements[0]
+    completed = await dbsession.execute(
+        text("SELECT id FROM task WHERE completed ORDER BY id"),
+    )
+    assert completed.scalars().all() == [first.id, second.id]
+
+
+@pytest.mark.anyio
+async def test_bulk_update_tasks_by_filter(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    test_user: UserDBModel,
+) -> None:
+    """Test completing all open tasks, and rejecting requests without tasks."""
+
+    # Define the override function
+    async def override_current_user() -> UserDBModel:
+        return test_user
+
+    fastapi_app.dependency_overrides[current_active_user] = override_current_user
+
+    task_dao = TaskDAO(dbsession)
+    for index in range(3):
+        await task_dao.create_task(f"Task {index}", "Bulk", test_user.id)
+
+    url = fastapi_app.url_path_for("update_task_models")
+    response = await client.patch(
+        url,
+        json={"filter": {"completed": False}, "changes": {"completed": True}},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()["updated"]) == 3
+    assert response.json()["not_found"] == []
+    response = await client.get(
+        fastapi_app.url_path_for("get_task_models"),
+        params={"completed": False},
+    )
+    assert response.json() == []
+
+    response = await client.patch(url, json={"changes": {"completed": True}})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.anyio
+async def test_bulk_update_by_filter_is_limited(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    test_user: UserDBModel,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that filters update a bounded number of tasks and can be continued."""
+
+    # Define the override function
+    async def override_current_user() -> UserDBModel:
+        return test_user
+
+    fastapi_app.dependency_overrides[current_active_user] = override_current_user
+    monkeypatch.setattr(views, "MAX_BULK_IDS", 2)
+
+    task_dao = TaskDAO(dbsession)
+    tasks = [
+        await task_dao.create_task(f"Task {index}", "Bulk", test_user.id)
+        for index in range(3)
+    ]
+
+    url = fastapi_app.url_path_for("update_task_models")
+    # Renamed tasks still match the filter, the next request continues after them.
+    bulk_update = {"filter": {"completed": False}, "changes": {"title": "Renamed"}}
+    response = await client.patch(url, json=bulk_update)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["updated"] == [str(tasks[0].id), str(tasks[1].id)]
+    assert response.json()["more"] is True
+
+    bulk_update["filter"]["after"] = response.json()["updated"][-1]
+    response = await client.patch(url, json=bulk_update)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["updated"] == [str(tasks[2].id)]
+    assert response.json()["more"] is False
+
+    # An empty filter would select every task of the user.
+    response = await client.patch(
+        url,
+        json={"filter": {}, "changes": {"completed": True}},
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
 @pytest.mark.anyio
 async def test_delete_task(
     fastapi_app: FastAPI,
@@ -266,3 +402,234 @@ async def test_delete_task_not_found(
 
     # Verify a 404 Not Found response
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.anyio
+async def test_create_task_with_idempotency_key(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    test_user: UserDBModel,
+) -> None:
+    """Test that retries with the same Idempotency-Key create one task."""
+
+    # Define the override function
+    async def override_current_user() -> UserDBModel:
+        return test_user
+
+    fastapi_app.dependency_overrides[current_active_user] = override_current_user
+
+    url = fastapi_app.url_path_for("create_task_model")
+    payload = {"title": "Idempotent", "description": "Created once"}
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+    first, second = await asyncio.gather(
+        client.post(url, json=payload, headers=headers),
+        client.post(url, json=payload, headers=headers),
+    )
+    retry = await client.post(url, json=payload, headers=headers)
+
+    assert first.status_code == status.HTTP_201_CREATED
+    assert second.status_code == status.HTTP_201_CREATED
+    assert retry.status_code == status.HTTP_201_CREATED
+    assert first.json() == second.json() == retry.json()
+
+    tasks = await TaskDAO(dbsession).get_all_tasks(user_id=test_user.id)
+    assert len(tasks) == 1
+
+
+@pytest.mark.anyio
+async def test_create_task_idempotency_key_reused(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    test_user: UserDBModel,
+) -> None:
+    """Test that an Idempotency-Key can't be reused for another payload."""
+
+    # Define the override function
+    async def override_current_user() -> UserDBModel:
+        return test_user
+
+    fastapi_app.dependency_overrides[current_active_user] = override_current_user
+
+    url = fastapi_app.url_path_for("create_task_model")
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+    response = await client.post(
+        url,
+        json={"title": "First", "description": "First"},
+        headers=headers,
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+    response = await client.post(
+        url,
+        json={"title": "Second", "description": "Second"},
+        headers=headers,
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.anyio
+async def test_concurrent_identical_reads_are_coalesced(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    test_user: UserDBModel,
+    query_counter: QueryCounter,
+) -> None:
+    """Test that identical concurrent task list reads share one query."""
+
+    # Define the override function
+    async def override_current_user() -> UserDBModel:
+        return test_user
+
+    fastapi_app.dependency_overrides[current_active_user] = override_current_user
+
+    task_dao = TaskDAO(dbsession)
+    await task_dao.create_task(
+        title="Shared",
+        description="Read by every request",
+        user_id=test_user.id,
+    )
+
+    coalesced_before = task_list_reads.coalesced_total
+    requests = 20
+    url = fastapi_app.url_path_for("get_task_models")
+    with query_counter.assert_max(requests) as statements:
+        responses = await asyncio.gather(
+            *(client.get(url, params={"limit": 5}) for _ in range(requests)),
+        )
+
+    assert all(response.status_code == status.HTTP_200_OK for response in responses)
+    assert all(len(response.json()) == 1 for response in responses)
+    task_queries = [sql for sql in statements if "FROM task" in sql]
+    coalesced = task_list_reads.coalesced_total - coalesced_before
+    assert coalesced > 0
+    assert len(task_queries) == requests - coalesced
+
+
+@pytest.mark.anyio
+async def test_cancelled_read_doesnt_cancel_coalesced_reads() -> None:
+    """Test that callers which joined a cancelled call run it themselves."""
+    reads = SingleFlight()
+    started = asyncio.Event()
+    calls = []
+
+    async def read(caller: str) -> str:
+        calls.append(caller)
+        started.set()
+        await asyncio.sleep(0.05)
+        return caller
+
+    leader = asyncio.create_task(reads.do("tasks", lambda: read("leader")))
+    await started.wait()
+    follower = asyncio.create_task(reads.do("tasks", lambda: read("follower")))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "follower"
+    assert leader.cancelled()
+    assert calls == ["leader", "follower"]
+    assert reads.stats() == {"in_flight": 0, "executed_total": 2, "coalesced_total": 0}
+
+
+@pytest.mark.anyio
+async def test_timestamps_are_generated_by_database(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    test_user: UserDBModel,
+    query_counter: QueryCounter,
+) -> None:
+    """Test that timestamps come back from the statements that set them."""
+
+    # Define the override function
+    async def override_current_user() -> UserDBModel:
+        return test_user
+
+    fastapi_app.dependency_overrides[current_active_user] = override_current_user
+
+    task_dao = TaskDAO(dbsession)
+    with query_counter.assert_max(1) as statements:
+        changed = await task_dao.create_task(
+            title="Changed",
+            description="Updated after the sync",
+            user_id=test_user.id,
+        )
+    assert "RETURNING" in statements[0]
+    assert changed.created_at.tzinfo is not None
+    assert changed.updated_at == changed.created_at
+    await task_dao.create_task(
+        title="Unchanged",
+        description="Not updated after the sync",
+        user_id=test_user.id,
+    )
+
+    # Both tasks were last changed a day ago, the test runs in one transaction,
+    # where now() doesn't move.
+    await dbsession.execute(
+        text("ALTER TABLE task DISABLE TRIGGER task_set_updated_at"),
+    )
+    await dbsession.execute(
+        text(
+            "UPDATE task SET created_at = now() - interval '1 day', "
+            "updated_at = now() - interval '1 day'",
+        ),
+    )
+    await dbsession.execute(text("ALTER TABLE task ENABLE TRIGGER task_set_updated_at"))
+    await dbsession.refresh(changed)
+
+    with query_counter.assert_max(1) as statements:
+        await task_dao.update_task(changed, completed=True)
+    assert "RETURNING" in statements[0]
+    assert changed.updated_at > changed.created_at
+
+    url = fastapi_app.url_path_for("get_task_models")
+    since = changed.updated_at - datetime.timedelta(hours=1)
+    response = await client.get(url, params={"updated_since": since.isoformat()})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [task["title"] for task in response.json()] == ["Changed"]
+
+
+@pytest.mark.anyio
+async def test_changes_are_paged_in_order(
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    dbsession: AsyncSession,
+    test_user: UserDBModel,
+) -> None:
+    """Test that pages of changes follow each other without gaps or repeats."""
+
+    # Define the override function
+    async def override_current_user() -> UserDBModel:
+        return test_user
+
+    fastapi_app.dependency_overrides[current_active_user] = override_current_user
+
+    task_dao = TaskDAO(dbsession)
+    for index in range(5):
+        await task_dao.create_task(f"Task {index}", "Changed", test_user.id)
+    # Tasks created later were changed earlier, and two share the same time.
+    await dbsession.execute(
+        text("ALTER TABLE task DISABLE TRIGGER task_set_updated_at"),
+    )
+    await dbsession.execute(
+        text(
+            "UPDATE task SET updated_at = now() - make_interval("
+            "mins => CAST(substr(title, 6) AS int) / 2)",
+        ),
+    )
+    await dbsession.execute(text("ALTER TABLE task ENABLE TRIGGER task_set_updated_at"))
+
+    url = fastapi_app.url_path_for("get_task_models")
+    since = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=1)
+    titles = []
+    for page in range(1, 4):
+        response = await client.get(
+            url,
+            params={"updated_since": since.isoformat(), "limit": 2, "page": page},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        titles += [task["title"] for task in response.json()]
+
+    assert titles == ["Task 4", "Task 2", "Task 3", "Task 0", "Task 1"]
@@ -0,0 +1,65 @@
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from opentelemetry.trace import Status, StatusCode
+
+from task_manager.services.tracing.sampling import (
+    TailSamplingSpanProcessor,
+    create_sampler,
+)
+
+
+def _tracer_provider(
+    exporter: InMemorySpanExporter,
+    record_unsampled: bool,
+) -> TracerProvider:
+    tracer_provider = TracerProvider(sampler=create_sampler(0, record_unsampled))
+    tracer_provider.add_span_processor(
+        TailSamplingSpanProcessor(
+            SimpleSpanProcessor(exporter),
+            sample_errors=True,
+            slow_threshold=1,
+        ),
+    )
+    return tracer_provider
+
+
+def test_failed_and_slow_traces_are_exported() -> None:
+    """Tests that unsampled traces are exported if they failed or were slow."""
+    exporter = InMemorySpanExporter()
+    tracer = _tracer_provider(exporter, record_unsampled=True).get_tracer(__name__)
+
+    request = tracer.start_as_current_span("fast request")
+    with request, tracer.start_as_current_span("query"):
+        pass
+    assert not exporter.get_finished_spans()
+
+    request = tracer.start_as_current_span("failed request")
+    with request, tracer.start_as_current_span("query") as query:
+        query.set_status(Status(StatusCode.ERROR))
+    assert [span.name for span in exporter.get_finished_spans()] == [
+        "query",
+        "failed request",
+    ]
+    assert all(
+        span.context.trace_flags.sampled for span in exporter.get_finished_spans()
+    )
+
+    exporter.clear()
+    slow_request = tracer.start_span("slow request", start_time=0)
+    slow_request.end(end_time=2 * 10**9)
+    assert [span.name for span in exporter.get_finished_spans()] == ["slow request"]
+
+
+def test_unsampled_spans_are_not_recorded() -> None:
+    """Tests that spans are dropped right away without tail rules."""
+    exporter = InMemorySpanExporter()
+    tracer = _tracer_provider(exporter, record_unsampled=False).get_tracer(__name__)
+
+    with tracer.start_as_current_span("failed request") as span:
+        span.set_status(Status(StatusCode.ERROR))
+
+    assert not span.is_recording()
+    assert not exporter.get_finished_spans()